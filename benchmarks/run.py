@@ -0,0 +1,236 @@
+# benchmarks/run.py
+"""
+Benchmark suite: times every pipeline stage on synthetic data of growing size.
+
+    python -m benchmarks.run                               # default sizes, prints a table
+    python -m benchmarks.run --sizes 1000 1000000 10000000 --out today.json
+    python -m benchmarks.run --compare base.json today.json --threshold 0.2
+
+Stages (each timed on its own, plus "end_to_end" chaining them):
+    nlp_to_dsl, nlp_to_dsl_batch,           per rule sentence (rows = rules)
+    nl_to_json, nl_to_json_reference, parse_dsl
+    generate_signals, compiled_signals      per bar
+    chunked_signals                         per bar, out-of-core (see chunked)
+    run_backtest, run_backtest_vectorized   per bar
+
+Each record holds the best wall time over `repeat` runs, rows/sec and the
+peak traced allocation of one extra run under tracemalloc (NumPy and pandas
+buffers are traced).  Results are written as JSON so two runs can be
+compared; `compare` flags stages that got slower (or hungrier) than the
+threshold allows.  chunked_signals also carries its slowdown against
+compiled_signals on the same bars; a run where it exceeds
+MAX_CHUNKED_SLOWDOWN exits with status 1.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.nlp_to_dsl import nlp_to_dsl
+from src.nlp_batch import nlp_to_dsl_batch, clear_nl_cache
+from src.nl_json import nl_to_json, nl_to_json_reference
+from src.parser import parse_dsl
+from src.codegen import generate_signals
+from src.compiler import compile_script
+from src.chunked import generate_signals_chunked
+from src.backtest import run_backtest, run_backtest_vectorized
+from benchmarks.synthetic import make_ohlcv, make_rules
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+TEXT_STAGES = ["nlp_to_dsl", "nlp_to_dsl_batch", "nl_to_json", "nl_to_json_reference", "parse_dsl"]
+BAR_STAGES = ["generate_signals", "compiled_signals", "chunked_signals", "run_backtest", "run_backtest_vectorized",
+              "end_to_end"]
+STAGES = TEXT_STAGES + BAR_STAGES
+
+# the row-by-row reference backtest is O(n) .loc lookups; above this it is skipped
+LOOP_LIMIT = 100_000
+N_RULES = 2_000
+# chunked evaluation resumes sma from pandas' exact kernel state, bar by bar
+# in Python, so it trails the in-memory pass; it must stay within this factor
+MAX_CHUNKED_SLOWDOWN = 10.0
+
+DSL = """
+ENTRY: close crosses_above sma(close,20) AND volume > 1000000
+EXIT: rsi(close,14) > 70 OR close < sma(close,50)
+"""
+NL = "Buy when price closes above the 20-day moving average and volume is above 1M."
+
+
+# -------------------------------
+# MEASUREMENT
+# -------------------------------
+def measure(fn: Callable[[], Any], repeat: int = 3) -> Dict[str, float]:
+    """Best-of-`repeat` wall time, then one traced run for peak allocation."""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def _stage_fn(stage: str, df: Optional[pd.DataFrame], rules: List[str],
+              loop_limit: int = LOOP_LIMIT) -> Callable[[], Any]:
+    if stage == "nlp_to_dsl":
+        return lambda: [nlp_to_dsl(r) for r in rules]
+    if stage == "nlp_to_dsl_batch":
+        # cold memo on every run: only repeats within the corpus are served from it
+        return lambda: (clear_nl_cache(), nlp_to_dsl_batch(rules))
+    if stage == "nl_to_json":
+        return lambda: [nl_to_json(r) for r in rules]
+    if stage == "nl_to_json_reference":
+        return lambda: [nl_to_json_reference(r) for r in rules]
+    if stage == "parse_dsl":
+        dsls = [nlp_to_dsl(r) for r in rules]
+        return lambda: [parse_dsl(d, use_cache=False) for d in dsls]
+
+    ast = parse_dsl(DSL)
+    if stage == "generate_signals":
+        return lambda: generate_signals(ast, df)
+    if stage == "compiled_signals":
+        compiled = compile_script(ast)
+        return lambda: compiled(df)
+    if stage == "chunked_signals":
+        compiled = compile_script(ast)
+        return lambda: list(generate_signals_chunked(compiled, df))
+    signals = generate_signals(ast, df)
+    if stage == "run_backtest":
+        return lambda: run_backtest(df, signals)
+    if stage == "run_backtest_vectorized":
+        return lambda: run_backtest_vectorized(df, signals)
+    if stage == "end_to_end":
+        backtest = run_backtest if len(df) <= loop_limit else run_backtest_vectorized
+        return lambda: backtest(df, generate_signals(parse_dsl(nlp_to_dsl(NL), use_cache=False), df))
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def run_suite(sizes: Sequence[int] = DEFAULT_SIZES, stages: Sequence[str] = STAGES,
+              repeat: int = 3, seed: int = 0, n_rules: int = N_RULES,
+              loop_limit: int = LOOP_LIMIT, log: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Run the selected stages and return {"meta": ..., "results": [record, ...]}."""
+    results = []
+
+    def record(stage, rows, m, **extra):
+        rec = {"stage": stage, "rows": rows, "seconds": m["seconds"],
+               "rows_per_sec": rows / m["seconds"] if m["seconds"] > 0 else float("inf"),
+               "peak_bytes": m["peak_bytes"], **extra}
+        results.append(rec)
+        if log:
+            log(format_record(rec))
+
+    rules = make_rules(n_rules)
+    for stage in (s for s in stages if s in TEXT_STAGES):
+        record(stage, len(rules), measure(_stage_fn(stage, None, rules), repeat))
+
+    bar_stages = [s for s in stages if s in BAR_STAGES]
+    for n in (sizes if bar_stages else ()):
+        df = make_ohlcv(n, seed)
+        for stage in bar_stages:
+            if stage == "run_backtest" and n > loop_limit:
+                results.append({"stage": stage, "rows": n, "skipped": f"more than {loop_limit} bars"})
+                continue
+            # the slow stages get a single run on the largest inputs
+            reps = repeat if n <= 100_000 else 1
+            record(stage, n, measure(_stage_fn(stage, df, rules, loop_limit), reps))
+        timed = {r["stage"]: r for r in results if r["rows"] == n and "seconds" in r}
+        if "chunked_signals" in timed and "compiled_signals" in timed:
+            slowdown = timed["chunked_signals"]["seconds"] / timed["compiled_signals"]["seconds"]
+            timed["chunked_signals"].update(slowdown=slowdown, guard_exceeded=slowdown > MAX_CHUNKED_SLOWDOWN)
+        del df
+
+    return {"meta": environment(seed=seed, repeat=repeat), "results": results}
+
+
+def environment(**extra) -> Dict[str, Any]:
+    return {"python": sys.version.split()[0], "numpy": np.__version__, "pandas": pd.__version__,
+            "platform": platform.platform(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), **extra}
+
+
+# -------------------------------
+# REPORTING
+# -------------------------------
+def format_record(rec: Dict[str, Any]) -> str:
+    if "skipped" in rec:
+        return f"{rec['stage']:<24}{rec['rows']:>11,}  skipped ({rec['skipped']})"
+    return (f"{rec['stage']:<24}{rec['rows']:>11,}  {rec['seconds'] * 1e3:>11.2f} ms"
+            f"  {rec['rows_per_sec']:>14,.0f} rows/s  {rec['peak_bytes'] / 2**20:>9.1f} MiB")
+
+
+def save_results(report: Dict[str, Any], path: str):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.2,
+            memory_threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    One row per (stage, rows) present in both reports, with time and memory
+    ratios new/base and a `regression` flag when a ratio exceeds 1 + threshold.
+    """
+    memory_threshold = threshold if memory_threshold is None else memory_threshold
+    old = {(r["stage"], r["rows"]): r for r in base["results"] if "skipped" not in r}
+    rows = []
+    for r in new["results"]:
+        b = old.get((r["stage"], r["rows"]))
+        if b is None or "skipped" in r:
+            continue
+        time_ratio = r["seconds"] / b["seconds"] if b["seconds"] else float("inf")
+        mem_ratio = r["peak_bytes"] / b["peak_bytes"] if b["peak_bytes"] else 1.0
+        rows.append({"stage": r["stage"], "rows": r["rows"],
+                     "time_ratio": time_ratio, "memory_ratio": mem_ratio,
+                     "regression": time_ratio > 1 + threshold or mem_ratio > 1 + memory_threshold})
+    return rows
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="bar counts to run")
+    ap.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--loop-limit", type=int, default=LOOP_LIMIT,
+                    help="largest size the row-by-row run_backtest is timed on")
+    ap.add_argument("--out", help="write the JSON report here")
+    ap.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two saved reports")
+    ap.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, e.g. 0.2 = 20%%")
+    args = ap.parse_args(argv)
+
+    if args.compare:
+        rows = compare(load_results(args.compare[0]), load_results(args.compare[1]), args.threshold)
+        for r in rows:
+            flag = "REGRESSION" if r["regression"] else ""
+            print(f"{r['stage']:<24}{r['rows']:>11,}  time x{r['time_ratio']:.2f}  mem x{r['memory_ratio']:.2f}  {flag}")
+        return 1 if any(r["regression"] for r in rows) else 0
+
+    report = run_suite(args.sizes, args.stages, args.repeat, args.seed, loop_limit=args.loop_limit, log=print)
+    if args.out:
+        save_results(report, args.out)
+    exceeded = [r for r in report["results"] if r.get("guard_exceeded")]
+    for r in exceeded:
+        print(f"{r['stage']:<24}{r['rows']:>11,}  x{r['slowdown']:.1f} slower than compiled_signals "
+              f"(limit x{MAX_CHUNKED_SLOWDOWN:g})")
+    return 1 if exceeded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
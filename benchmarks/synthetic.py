@@ -0,0 +1,73 @@
+# benchmarks/synthetic.py
+"""
+Deterministic synthetic inputs for the benchmark suite.
+
+make_ohlcv(n, seed) returns the same bars for the same (n, seed) on every
+machine, from 1k up to 10M+ bars; generation is vectorized and done in blocks
+so building a large frame never needs more than the frame itself plus one
+block of temporaries.  Shorter histories are prefixes of longer ones.  make_rules(n) cycles a small set of rule sentences
+that nlp_to_dsl / nl_to_json both understand.
+"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+BLOCK = 1_000_000
+
+
+def make_ohlcv(n_bars: int, seed: int = 0, start: str = "2000-01-03", freq: str = "min",
+               price: float = 100.0) -> pd.DataFrame:
+    """Geometric random-walk OHLCV bars; identical output for identical arguments."""
+    close = np.empty(n_bars)
+    open_ = np.empty(n_bars)
+    high = np.empty(n_bars)
+    low = np.empty(n_bars)
+    volume = np.empty(n_bars, dtype=np.int64)
+
+    last = np.log(price)
+    for lo in range(0, n_bars, BLOCK):
+        hi = min(lo + BLOCK, n_bars)
+        # one generator per (block, series): a shorter history is a prefix of a longer one
+        returns, spreads, volumes = (np.random.default_rng([seed, lo // BLOCK, k]) for k in range(3))
+        m = hi - lo
+        log_close = last + np.cumsum(returns.normal(0, 0.001, m))
+        c = np.exp(log_close)
+        o = np.empty(m)
+        o[0] = np.exp(last)
+        o[1:] = c[:-1]
+        spread = np.abs(spreads.normal(0, 0.0005, m)) * c
+        close[lo:hi] = c
+        open_[lo:hi] = o
+        high[lo:hi] = np.maximum(o, c) + spread
+        low[lo:hi] = np.minimum(o, c) - spread
+        volume[lo:hi] = volumes.integers(100_000, 2_000_000, m)
+        last = log_close[-1]
+
+    index = pd.date_range(start, periods=n_bars, freq=freq)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume},
+                        index=index)
+
+
+RULES = [
+    "Buy when price closes above the 20-day moving average and volume is above 1M.",
+    "Buy when close is above the 50-day moving average. Exit when RSI(14) is below 30.",
+    "Enter when close is above 100 and volume is above 500k.",
+    "Buy when price is above 50",
+    "Buy when the 10 day sma is above the 30 day sma. Sell when price drops below the 30 day sma.",
+    "Long when rsi(14) is below 30. Exit when rsi(14) is above 70.",
+    "Buy when close is above the 200-day moving average and volume is above 2.5 million.",
+    "Enter when price goes below 20. Close when price is above 25.",
+]
+
+
+def make_rules(n: int) -> List[str]:
+    """`n` rule sentences, cycling RULES with varying window lengths and thresholds."""
+    out = []
+    for i in range(n):
+        rule = RULES[i % len(RULES)]
+        k = i // len(RULES)
+        if k:
+            rule = rule.replace("20", str(20 + k % 30)).replace("500k", f"{500 + k % 400}k")
+        out.append(rule)
+    return out
@@ -1,23 +1,35 @@
 # src/ast_nodes.py
+import json
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+# bumped whenever the key()/bytes layout changes
+FORMAT_VERSION = 2
+
 @dataclass
 class ASTNode:
     def to_dict(self) -> Dict[str, Any]:
         raise NotImplementedError
 
+    def key(self) -> tuple:
+        """Structural key: equal subtrees give equal (hashable) keys."""
+        raise NotImplementedError
+
 @dataclass
 class FieldNode(ASTNode):
     name: str
     def to_dict(self):
         return {"type": "field", "name": self.name}
+    def key(self):
+        return ("field", self.name.lower())
 
 @dataclass
 class NumberNode(ASTNode):
     value: float
     def to_dict(self):
         return {"type": "number", "value": self.value}
+    def key(self):
+        return ("number", self.value)
 
 @dataclass
 class FunctionNode(ASTNode):
@@ -25,6 +37,8 @@ class FunctionNode(ASTNode):
     args: list
     def to_dict(self):
         return {"type": "function", "name": self.name.lower(), "args": [a.to_dict() if isinstance(a, ASTNode) else a for a in self.args]}
+    def key(self):
+        return ("function", self.name.lower(), tuple(a.key() if isinstance(a, ASTNode) else a for a in self.args))
 
 @dataclass
 class CompareNode(ASTNode):
@@ -33,6 +47,8 @@ class CompareNode(ASTNode):
     right: ASTNode
     def to_dict(self):
         return {"type": "compare", "left": self.left.to_dict(), "op": self.op, "right": self.right.to_dict()}
+    def key(self):
+        return ("compare", self.op, self.left.key(), self.right.key())
 
 @dataclass
 class BoolNode(ASTNode):
@@ -41,6 +57,8 @@ class BoolNode(ASTNode):
     right: ASTNode
     def to_dict(self):
         return {"type": "bool", "op": self.op, "left": self.left.to_dict(), "right": self.right.to_dict()}
+    def key(self):
+        return ("bool", self.op, self.left.key(), self.right.key())
 
 @dataclass
 class CrossNode(ASTNode):
@@ -49,6 +67,17 @@ class CrossNode(ASTNode):
     right: ASTNode
     def to_dict(self):
         return {"type": "cross", "dir": self.dir.lower(), "left": self.left.to_dict(), "right": self.right.to_dict()}
+    def key(self):
+        return ("cross", self.dir.lower(), self.left.key(), self.right.key())
+
+@dataclass
+class TimeframeNode(ASTNode):
+    timeframe: str  # canonical, e.g. "5m", "1h", "1d" (see parser.normalize_timeframe)
+    expr: ASTNode
+    def to_dict(self):
+        return {"type": "timeframe", "timeframe": self.timeframe, "expr": self.expr.to_dict()}
+    def key(self):
+        return ("timeframe", self.timeframe, self.expr.key())
 
 @dataclass
 class ScriptAST:
@@ -57,3 +86,83 @@ class ScriptAST:
     def to_dict(self):
         return {"entry": self.entry.to_dict() if self.entry else None,
                 "exit": self.exit.to_dict() if self.exit else None}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "ScriptAST":
+        return cls(entry=node_from_dict(d.get("entry")), exit=node_from_dict(d.get("exit")))
+
+    def key(self) -> tuple:
+        return (self.entry.key() if self.entry else None,
+                self.exit.key() if self.exit else None)
+
+    @classmethod
+    def from_key(cls, key: tuple) -> "ScriptAST":
+        return cls(entry=node_from_key(key[0]), exit=node_from_key(key[1]))
+
+    def to_bytes(self) -> bytes:
+        """Compact, interpreter-independent form (JSON of the structural key); see from_bytes."""
+        return json.dumps([FORMAT_VERSION, self.key()], separators=(",", ":")).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ScriptAST":
+        try:
+            version, key = json.loads(data)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Unreadable AST bytes: {e}") from None
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported AST format version {version}")
+        return cls.from_key(key_from_json(key))
+
+
+def key_from_json(value):
+    """A structural key read back from JSON: its lists become tuples again."""
+    if isinstance(value, list):
+        return tuple(key_from_json(v) for v in value)
+    return value
+
+
+def node_from_dict(d):
+    """Inverse of ASTNode.to_dict (None passes through)."""
+    if d is None:
+        return None
+    t = d["type"]
+    if t == "field":
+        return FieldNode(name=d["name"])
+    if t == "number":
+        return NumberNode(value=d["value"])
+    if t == "function":
+        return FunctionNode(name=d["name"], args=[node_from_dict(a) if isinstance(a, dict) else a for a in d["args"]])
+    if t == "compare":
+        return CompareNode(left=node_from_dict(d["left"]), op=d["op"], right=node_from_dict(d["right"]))
+    if t == "bool":
+        return BoolNode(op=d["op"], left=node_from_dict(d["left"]), right=node_from_dict(d["right"]))
+    if t == "cross":
+        return CrossNode(dir=d["dir"], left=node_from_dict(d["left"]), right=node_from_dict(d["right"]))
+    if t == "timeframe":
+        return TimeframeNode(timeframe=d["timeframe"], expr=node_from_dict(d["expr"]))
+    raise ValueError(f"Unknown node type {t!r}")
+
+
+def node_from_key(key):
+    """Inverse of ASTNode.key (None passes through)."""
+    if key is None:
+        return None
+    t = key[0]
+    if t == "field":
+        return FieldNode(name=key[1])
+    if t == "number":
+        return NumberNode(value=key[1])
+    if t == "function":
+        return FunctionNode(name=key[1], args=[node_from_key(a) if isinstance(a, tuple) else a for a in key[2]])
+    if t == "compare":
+        return CompareNode(left=node_from_key(key[2]), op=key[1], right=node_from_key(key[3]))
+    if t == "bool":
+        return BoolNode(op=key[1], left=node_from_key(key[2]), right=node_from_key(key[3]))
+    if t == "cross":
+        return CrossNode(dir=key[1], left=node_from_key(key[2]), right=node_from_key(key[3]))
+    if t == "timeframe":
+        return TimeframeNode(timeframe=key[1], expr=node_from_key(key[2]))
+    raise ValueError(f"Unknown node type {t!r}")
+
+# indicator calls (sma/ema/rsi) are represented as function nodes
+IndicatorNode = FunctionNode
@@ -1,8 +1,14 @@
 # src/backtest.py
-from typing import Dict, Any, List
-import pandas as pd
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Dict, Any, Tuple
 import numpy as np
 
+if TYPE_CHECKING:
+    # only needed for annotations; keeps `import src.backtest` free of pandas
+    import pandas as pd
+
 def run_backtest(df: pd.DataFrame, signals: pd.DataFrame) -> Dict[str, Any]:
     """
     Very simple backtest:
@@ -68,3 +74,278 @@ def run_backtest(df: pd.DataFrame, signals: pd.DataFrame) -> Dict[str, Any]:
         "equity_curve": equity_curve,
         "trades": trades
     }
+
+
+# -------------------------------
+# VECTORIZED ENGINE
+# -------------------------------
+def position_state(entry: np.ndarray, exit_: np.ndarray) -> np.ndarray:
+    """
+    In-position flag after each bar for the long-only machine used by run_backtest:
+    an entry-only bar opens (or keeps) the position, an exit-only bar closes it,
+    and a bar flagged both ways flips whatever the previous state was.
+    2-D (bars x symbols) flags are handled column by column.
+    """
+    n = len(entry)
+    both = entry & exit_
+    only_entry = entry & ~exit_
+    definite = only_entry | (exit_ & ~entry)
+    bars = np.arange(n).reshape((n,) + (1,) * (np.ndim(entry) - 1))
+    # most recent bar that set the state outright (-1 before the first one)
+    last = np.maximum.accumulate(np.where(definite, bars, -1), axis=0)
+    seen = last >= 0
+    last = np.maximum(last, 0)
+    base = np.take_along_axis(only_entry, last, axis=0) & seen
+    # both-flagged bars since then toggle the state
+    toggles = np.cumsum(both, axis=0)
+    since = toggles - np.where(seen, np.take_along_axis(toggles, last, axis=0), 0)
+    return base ^ (since & 1).astype(bool)
+
+
+@dataclass
+class BacktestResult:
+    """
+    Columnar backtest result: one array per trade field plus the equity curve.
+
+    entry_idx / exit_idx are bar positions.  The realized equity curve has one
+    value per bar, plus a last value when a position still open at the end is
+    closed on the final bar (as in run_backtest).  `close` is the price series
+    the trades were taken on (used by the mark-to-market metrics).
+    """
+    entry_idx: np.ndarray
+    exit_idx: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    pnl: np.ndarray
+    equity_curve: np.ndarray
+    close: np.ndarray
+    index: Any = None
+
+    # ---- run_backtest metrics ----
+    @property
+    def n_bars(self) -> int:
+        return len(self.close)
+
+    @property
+    def number_of_trades(self) -> int:
+        return len(self.pnl)
+
+    @property
+    def total_return(self) -> float:
+        return float(self.equity_curve[-1]) if len(self.equity_curve) else 0.0
+
+    @property
+    def max_drawdown(self) -> float:
+        eq = self.equity_curve if len(self.equity_curve) else np.array([0.0])
+        return float((eq - np.maximum.accumulate(eq)).min())
+
+    # ---- analytics ----
+    def win_rate(self) -> float:
+        """Share of trades with a positive pnl."""
+        return float(np.count_nonzero(self.pnl > 0) / len(self.pnl)) if len(self.pnl) else 0.0
+
+    def _held(self) -> np.ndarray:
+        """held[i]: a position is open from the close of bar i-1 to the close of bar i."""
+        marks = np.zeros(self.n_bars + 1, dtype=np.int64)
+        np.add.at(marks, self.entry_idx + 1, 1)
+        np.add.at(marks, self.exit_idx + 1, -1)
+        return np.cumsum(marks[:-1]) > 0
+
+    def exposure(self) -> float:
+        """Share of bar-to-bar intervals spent in a position."""
+        if self.n_bars < 2:
+            return 0.0
+        return float(np.sum(self.exit_idx - self.entry_idx) / (self.n_bars - 1))
+
+    def bar_returns(self) -> np.ndarray:
+        """Close-to-close return of every bar while in a position, 0 elsewhere (bar 0 is 0)."""
+        close = self.close.astype(float)
+        out = np.zeros(self.n_bars)
+        if self.n_bars > 1:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[1:] = np.where(self._held()[1:], close[1:] / close[:-1] - 1.0, 0.0)
+        return out
+
+    def sharpe(self, periods_per_year: int = 252) -> float:
+        """Annualized Sharpe ratio of bar_returns (zero risk-free rate)."""
+        r = self.bar_returns()[1:]
+        sd = r.std(ddof=1) if len(r) > 1 else 0.0
+        return float(r.mean() / sd * np.sqrt(periods_per_year)) if sd > 0 else 0.0
+
+    def excursions(self, high: np.ndarray = None, low: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (MAE, MFE) of every trade: the lowest low and highest high from its entry
+        bar to its exit bar, relative to the entry price (closes when high/low are
+        not given).  One segment reduction per side, no per-trade loop.
+        """
+        if not len(self.pnl):
+            return np.zeros(0), np.zeros(0)
+        high = self.close if high is None else high
+        low = self.close if low is None else low
+        # segments [entry, exit] interleaved with the gaps between trades; gaps are dropped
+        bounds = np.column_stack((self.entry_idx, self.exit_idx + 1)).ravel()
+        top = np.fmax.reduceat(np.append(np.asarray(high, dtype=float), np.nan), bounds)[::2]
+        bottom = np.fmin.reduceat(np.append(np.asarray(low, dtype=float), np.nan), bounds)[::2]
+        return bottom - self.entry_price, top - self.entry_price
+
+    def metrics(self, periods_per_year: int = 252) -> Dict[str, Any]:
+        return {
+            "total_return": self.total_return,
+            "max_drawdown": self.max_drawdown,
+            "number_of_trades": self.number_of_trades,
+            "win_rate": self.win_rate(),
+            "exposure": self.exposure(),
+            "sharpe": self.sharpe(periods_per_year),
+        }
+
+    # ---- conversion and export ----
+    def trade_columns(self) -> Dict[str, np.ndarray]:
+        return {"entry_idx": self.entry_idx, "exit_idx": self.exit_idx, "entry_price": self.entry_price,
+                "exit_price": self.exit_price, "pnl": self.pnl}
+
+    def to_dict(self, curve: str = "list") -> Dict[str, Any]:
+        """The run_backtest result dict (trades as a list of dicts)."""
+        index = np.arange(self.n_bars) if self.index is None else self.index
+        trades = [{"entry_date": index[i], "exit_date": index[j],
+                   "entry_price": float(ep), "exit_price": float(xp), "pnl": float(p)}
+                  for i, j, ep, xp, p in zip(self.entry_idx, self.exit_idx, self.entry_price, self.exit_price, self.pnl)]
+        return {
+            "total_return": self.total_return,
+            "max_drawdown": self.max_drawdown,
+            "number_of_trades": self.number_of_trades,
+            "equity_curve": self.equity_curve if curve == "array" else self.equity_curve.tolist(),
+            "trades": trades
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """Trades as a DataFrame (with entry/exit dates when the result has an index)."""
+        import pandas as pd
+        columns = self.trade_columns()
+        if self.index is not None:
+            columns = {"entry_date": self.index[self.entry_idx], "exit_date": self.index[self.exit_idx], **columns}
+        return pd.DataFrame(columns)
+
+    def to_arrow(self):
+        """Trades as a pyarrow Table (the arrays are handed over without a copy where possible)."""
+        import pyarrow as pa
+        return pa.table(self.trade_columns())
+
+    def to_parquet(self, path):
+        """Write the trades to a Parquet file (requires pyarrow)."""
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), str(path))
+
+    def save(self, root):
+        """
+        One .npy file per array under `root` (the column store layout), so load()
+        can memory-map them back.  The index is not saved; pass it to load().
+        """
+        from pathlib import Path
+        from src.columnar_store import _atomic_save
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        arrays = {**self.trade_columns(), "equity_curve": self.equity_curve, "close": self.close}
+        for name, values in arrays.items():
+            _atomic_save(root / f"{name}.npy", np.ascontiguousarray(values))
+
+    @classmethod
+    def load(cls, root, index=None, mmap: bool = True) -> "BacktestResult":
+        from pathlib import Path
+        root = Path(root)
+        arrays = {f.name: np.load(root / f"{f.name}.npy", mmap_mode="r" if mmap else None)
+                  for f in fields(cls) if f.name != "index"}
+        return cls(**arrays, index=index)
+
+
+def backtest_columnar(close: np.ndarray, entry: np.ndarray, exit_: np.ndarray, index=None) -> BacktestResult:
+    """Long-only backtest of run_backtest, returned as a columnar BacktestResult."""
+    close = np.asarray(close)
+    entry = np.asarray(entry, dtype=bool)
+    exit_ = np.asarray(exit_, dtype=bool)
+    n = len(close)
+
+    pos = position_state(entry, exit_)
+    prev = np.concatenate(([False], pos[:-1]))
+    entry_idx = np.flatnonzero(pos & ~prev)
+    exit_idx = np.flatnonzero(prev & ~pos)
+
+    # realized pnl lands on the exit bar
+    bar_pnl = np.zeros(n, dtype=float)
+    closed_pnl = close[exit_idx].astype(float) - close[entry_idx[:len(exit_idx)]].astype(float)
+    bar_pnl[exit_idx] = closed_pnl
+    equity = np.cumsum(bar_pnl)
+
+    # if still in position at end, close at last price
+    if len(entry_idx) > len(exit_idx):
+        exit_idx = np.append(exit_idx, n - 1)
+        last_pnl = float(close[-1]) - float(close[entry_idx[-1]])
+        equity = np.append(equity, (equity[-1] if n else 0.0) + last_pnl)
+
+    entry_price = close[entry_idx].astype(float)
+    exit_price = close[exit_idx].astype(float)
+    return BacktestResult(entry_idx, exit_idx, entry_price, exit_price, exit_price - entry_price,
+                          equity, close, index)
+
+
+def run_backtest_arrays(close: np.ndarray, entry: np.ndarray, exit_: np.ndarray, index=None,
+                        curve: str = "list") -> Dict[str, Any]:
+    """
+    Array version of run_backtest: same metrics and trade log, no per-bar Python loop.
+    `index` supplies the trade dates (bar positions are used when omitted).
+    curve="array" returns the equity curve as a float64 ndarray instead of a list.
+    Use backtest_columnar to skip building the list of trade dicts.
+    """
+    return backtest_columnar(close, entry, exit_, index).to_dict(curve)
+
+
+def run_backtest_vectorized(df: pd.DataFrame, signals: pd.DataFrame) -> Dict[str, Any]:
+    """Drop-in replacement for run_backtest built on run_backtest_arrays."""
+    if not signals.index.equals(df.index):
+        signals = signals.reindex(df.index, fill_value=False)
+    return run_backtest_arrays(df["close"].to_numpy(),
+                               signals["entry"].to_numpy(dtype=bool),
+                               signals["exit"].to_numpy(dtype=bool),
+                               df.index)
+
+
+# -------------------------------
+# PANEL ENGINE
+# -------------------------------
+def run_backtest_panel(close: np.ndarray, entry: np.ndarray, exit_: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    run_backtest_arrays over a (bars, symbols) panel, every symbol in one pass.
+    Returns per-symbol arrays of total_return, max_drawdown and number_of_trades,
+    equal to the run_backtest_arrays metrics of each column.
+    """
+    price = np.asarray(close).astype(float)
+    entry = np.asarray(entry, dtype=bool)
+    exit_ = np.asarray(exit_, dtype=bool)
+    n, m = price.shape
+    if n == 0:
+        return {"total_return": np.zeros(m), "max_drawdown": np.zeros(m),
+                "number_of_trades": np.zeros(m, dtype=np.int64)}
+
+    pos = position_state(entry, exit_)
+    prev = np.zeros_like(pos)
+    prev[1:] = pos[:-1]
+    starts = pos & ~prev
+    exits = prev & ~pos
+
+    # entry bar of the trade open at (or just closed on) each bar
+    opened = np.maximum.accumulate(np.where(starts, np.arange(n)[:, None], 0), axis=0)
+    entry_price = np.take_along_axis(price, opened, axis=0)
+    # realized pnl lands on the exit bar
+    equity = np.cumsum(np.where(exits, price - entry_price, 0.0), axis=0)
+
+    # if still in position at end, close at last price
+    still_open = pos[-1]
+    final = np.where(still_open, equity[-1] + (price[-1] - entry_price[-1]), equity[-1])
+    running_max = np.maximum.accumulate(equity, axis=0)
+    drawdown = (equity - running_max).min(axis=0)
+    final_drawdown = np.where(still_open, final - np.maximum(running_max[-1], final), 0.0)
+
+    return {
+        "total_return": final,
+        "max_drawdown": np.minimum(drawdown, final_drawdown),
+        "number_of_trades": starts.sum(axis=0),
+    }
@@ -0,0 +1,184 @@
+# src/batch.py
+"""
+Universe-scale batch runner: many DSL scripts x many symbols on a process pool.
+
+Scripts are parsed once in the parent and shipped to every worker through the
+pool initializer, where they are compiled once per process.  Tasks carry only
+a symbol name and a chunk of strategy ids; each worker loads the symbol's
+history from a data source itself, so no DataFrame is pickled per task.
+An in-memory {symbol: DataFrame} mapping is published to shared memory by
+default (see run_universe), because the pickled mapping would otherwise be
+copied whole into every worker.  Result rows are yielded as chunks finish.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+import pandas as pd
+
+from src.parser import parse_dsl
+from src.compiler import compile_script
+from src.backtest import backtest_columnar
+
+
+# -------------------------------
+# DATA SOURCES
+# -------------------------------
+class DirectorySource:
+    """One OHLCV file per symbol: <root>/<SYMBOL>.csv (or .parquet)."""
+
+    def __init__(self, root: Union[str, Path], suffix: str = ".csv"):
+        self.root = Path(root)
+        self.suffix = suffix
+
+    def symbols(self) -> List[str]:
+        return sorted(p.stem for p in self.root.glob(f"*{self.suffix}"))
+
+    def version(self, symbol: str) -> Optional[int]:
+        """Modification time of the symbol's file (ns), None if it does not exist."""
+        try:
+            return (self.root / f"{symbol}{self.suffix}").stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def load(self, symbol: str) -> pd.DataFrame:
+        path = self.root / f"{symbol}{self.suffix}"
+        if self.suffix == ".parquet":
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path, index_col=0, parse_dates=True, float_precision="round_trip")
+        df.attrs["symbol"] = symbol       # keys the resampled-bar cache (see timeframes)
+        return df
+
+
+class MappingSource:
+    """
+    In-memory {symbol: DataFrame}.  Handed to a pool as is, it is pickled
+    whole into every worker's initializer: each worker holds a private copy of
+    the universe, whichever symbols it runs.
+    """
+
+    def __init__(self, frames: Mapping[str, pd.DataFrame]):
+        self.frames = dict(frames)
+
+    def symbols(self) -> List[str]:
+        return list(self.frames)
+
+    def load(self, symbol: str) -> pd.DataFrame:
+        return self.frames[symbol]
+
+
+def as_source(data):
+    """Accept a source object, a directory path or a {symbol: DataFrame} mapping."""
+    if hasattr(data, "load") and hasattr(data, "symbols"):
+        return data
+    if isinstance(data, (str, Path)):
+        return DirectorySource(data)
+    if isinstance(data, Mapping):
+        return MappingSource(data)
+    raise TypeError(f"Unsupported data source: {type(data).__name__}")
+
+
+# -------------------------------
+# WORKER SIDE
+# -------------------------------
+_worker: Dict[str, Any] = {}
+
+def _init_worker(asts, source):
+    _worker["compiled"] = [compile_script(ast) for ast in asts]
+    _worker["source"] = source
+    _worker["loaded"] = (None, None)
+
+def _load(symbol: str) -> pd.DataFrame:
+    # consecutive chunks of one symbol often land on the same worker
+    cached_symbol, df = _worker["loaded"]
+    if cached_symbol != symbol:
+        df = _worker["source"].load(symbol)
+        _worker["loaded"] = (symbol, df)
+    return df
+
+def _run_chunk(symbol: str, strategy_ids: Sequence[int], keep_trades: bool = False) -> List[Dict[str, Any]]:
+    df = _load(symbol)
+    close = df["close"].to_numpy()
+    rows = []
+    for sid in strategy_ids:
+        entry, exit_ = _worker["compiled"][sid].evaluate(df)
+        res = backtest_columnar(close, entry, exit_, df.index)
+        row = {"symbol": symbol, "strategy": sid,
+               "total_return": res.total_return,
+               "max_drawdown": res.max_drawdown,
+               "number_of_trades": res.number_of_trades}
+        if keep_trades:
+            row["trades"] = res.to_dict()["trades"]
+        rows.append(row)
+    return rows
+
+
+# -------------------------------
+# DRIVER
+# -------------------------------
+def make_tasks(symbols: Sequence[str], n_strategies: int, chunk_size: int):
+    """(symbol, strategy-id chunk) pairs; a task never spans two symbols, so each load is reused."""
+    for symbol in symbols:
+        for start in range(0, n_strategies, chunk_size):
+            yield symbol, tuple(range(start, min(start + chunk_size, n_strategies)))
+
+
+def run_universe(scripts: Sequence[str], data, symbols: Optional[Sequence[str]] = None,
+                 max_workers: Optional[int] = None, chunk_size: int = 16,
+                 keep_trades: bool = False, shared_memory: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Backtest every script against every symbol and yield one result row per pair
+    as soon as its chunk completes (completion order, not submission order).
+
+    `data` is a directory of per-symbol files, a {symbol: DataFrame} mapping or any
+    object with `symbols()` / `load(symbol)`.  `max_workers=0` runs in-process.
+    With `shared_memory=True` every symbol is loaded once up front and published
+    to shared memory (see shared_data), and workers read it there without copies:
+    one copy of the universe in total instead of one per worker.  The default
+    (None) does so for mappings, falling back to per-worker copies when a frame
+    has columns that cannot be shared; other sources are loaded by the workers.
+    """
+    asts = [parse_dsl(s, optimize=True) for s in scripts]
+    source = as_source(data)
+    symbols = list(symbols) if symbols is not None else source.symbols()
+
+    auto = shared_memory is None
+    if auto:
+        shared_memory = isinstance(source, MappingSource)
+    if shared_memory and max_workers != 0:
+        from src.shared_data import SharedFrames
+        with SharedFrames() as plane:
+            try:
+                shared = plane.publish_source(source, symbols)
+            except TypeError:
+                if not auto:
+                    raise
+                shared = None         # e.g. a text column: hand the mapping over as is
+            if shared is not None:
+                yield from run_universe(scripts, shared, symbols, max_workers, chunk_size, keep_trades, False)
+                return
+    tasks = make_tasks(symbols, len(asts), max(1, chunk_size))
+
+    if max_workers == 0:
+        _init_worker(asts, source)
+        for symbol, ids in tasks:
+            yield from _run_chunk(symbol, ids, keep_trades)
+        return
+
+    max_workers = max_workers or os.cpu_count() or 1
+    # keep a bounded window of chunks in flight so huge universes stream with flat memory
+    window = max_workers * 4
+    with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(asts, source)) as pool:
+        pending = set()
+        for symbol, ids in tasks:
+            pending.add(pool.submit(_run_chunk, symbol, ids, keep_trades))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield from fut.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield from fut.result()
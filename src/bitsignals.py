@@ -0,0 +1,309 @@
+# src/bitsignals.py
+"""
+Bit-packed boolean signals: 64 bars per uint64 word, 8 per byte.
+
+    a = BitSignal.from_bool(close > 100)
+    (a & b) | ~c, a.shift(), a.count(), a.first()
+    signals = generate_signals(ast, df, packed=True)       # PackedSignals
+
+Bar i is bit i % 64 of word i // 64 (little-endian bit order: the words are
+np.packbits(..., bitorder="little") viewed as uint64).  Bits past the last
+bar are always zero, so count() and equals() never need a mask.
+
+With packed=True, generate_signals keeps every CompareNode, BoolNode and
+CrossNode result in this form.  Comparisons are packed block by block as
+they are computed.  AND / OR / NOT and the one-bar shift of a crossover run
+on whole words, and an AND already False everywhere (or an OR already True
+everywhere) skips its right-hand side by testing the words.  Value nodes
+(fields, indicators, timeframes) go through codegen.eval_node as before and
+share its memo entries.  The signals are identical to the unpacked ones.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from src.ast_nodes import ScriptAST, CompareNode, BoolNode, CrossNode
+from src.codegen import EvalMemo, eval_node
+
+BLOCK = 1 << 16           # bars compared per block (a multiple of 64)
+
+_COMPARE = {">": np.greater, "<": np.less, ">=": np.greater_equal,
+            "<=": np.less_equal, "==": np.equal, "!=": np.not_equal}
+_popcount = getattr(np, "bitwise_count", None)     # NumPy >= 2.0
+
+
+def _n_words(n: int) -> int:
+    return (n + 63) // 64
+
+
+def _mask_tail(words: np.ndarray, n: int) -> np.ndarray:
+    if n % 64:
+        words[-1] &= np.uint64((1 << (n % 64)) - 1)
+    return words
+
+
+class BitSignal:
+    """A boolean series of `length` bars stored as packed uint64 words."""
+    __slots__ = ("words", "length")
+
+    def __init__(self, words: np.ndarray, length: int):
+        self.words = words
+        self.length = length
+
+    # ---- construction ----
+    @classmethod
+    def full(cls, n: int, value: bool) -> "BitSignal":
+        words = np.full(_n_words(n), np.iinfo(np.uint64).max if value else 0, dtype="<u8")
+        return cls(_mask_tail(words, n), n)
+
+    @classmethod
+    def from_bool(cls, values) -> "BitSignal":
+        values = np.asarray(values, dtype=bool)
+        words = np.zeros(_n_words(len(values)), dtype="<u8")
+        packed = np.packbits(values, bitorder="little")
+        words.view(np.uint8)[:len(packed)] = packed
+        return cls(words, len(values))
+
+    @classmethod
+    def from_indices(cls, positions, n: int) -> "BitSignal":
+        """True exactly at `positions`."""
+        positions = np.asarray(positions, dtype=np.int64)
+        words = np.zeros(_n_words(n), dtype="<u8")
+        np.bitwise_or.at(words, positions // 64, np.left_shift(np.uint64(1), (positions % 64).astype(np.uint64)))
+        return cls(words, n)
+
+    @classmethod
+    def compare(cls, left, right, op: str, n: int) -> "BitSignal":
+        """`left op right` on arrays (or scalars) of n bars, packed BLOCK bars at a time."""
+        fn = _COMPARE[op]
+        words = np.zeros(_n_words(n), dtype="<u8")
+        out = words.view(np.uint8)
+        for start in range(0, n, BLOCK):
+            stop = min(start + BLOCK, n)
+            block = fn(left[start:stop] if np.ndim(left) else left,
+                       right[start:stop] if np.ndim(right) else right)
+            out[start // 8:(stop + 7) // 8] = np.packbits(block, bitorder="little")
+        return cls(words, n)
+
+    def to_bool(self) -> np.ndarray:
+        return np.unpackbits(self.words.view(np.uint8), count=self.length, bitorder="little").view(bool)
+
+    # ---- algebra ----
+    def __and__(self, other: "BitSignal") -> "BitSignal":
+        return BitSignal(self.words & other.words, self.length)
+
+    def __or__(self, other: "BitSignal") -> "BitSignal":
+        return BitSignal(self.words | other.words, self.length)
+
+    def __xor__(self, other: "BitSignal") -> "BitSignal":
+        return BitSignal(self.words ^ other.words, self.length)
+
+    def __invert__(self) -> "BitSignal":
+        return BitSignal(_mask_tail(~self.words, self.length), self.length)
+
+    def shift(self, fill: bool = False) -> "BitSignal":
+        """Previous bar's value at every bar (bar i gets bar i-1; bar 0 gets `fill`)."""
+        words = self.words
+        if not len(words):
+            return BitSignal(words.copy(), self.length)
+        carry = np.empty_like(words)
+        carry[0] = 1 if fill else 0
+        carry[1:] = words[:-1] >> np.uint64(63)
+        return BitSignal(_mask_tail((words << np.uint64(1)) | carry, self.length), self.length)
+
+    # ---- reductions ----
+    def count(self) -> int:
+        """Number of True bars (popcount)."""
+        if _popcount is not None:
+            return int(_popcount(self.words).sum(dtype=np.int64))
+        return int(np.unpackbits(self.words.view(np.uint8)).sum(dtype=np.int64))
+
+    def any(self) -> bool:
+        return bool(self.words.any())
+
+    def all(self) -> bool:
+        return self.count() == self.length
+
+    def first(self) -> int:
+        """Position of the first True bar, -1 if there is none."""
+        nonzero = np.flatnonzero(self.words)
+        if not len(nonzero):
+            return -1
+        word = int(self.words[nonzero[0]])
+        return int(nonzero[0]) * 64 + (word & -word).bit_length() - 1
+
+    def indices(self) -> np.ndarray:
+        """Positions of the True bars; only non-zero words are expanded."""
+        nonzero = np.flatnonzero(self.words)
+        bits = np.unpackbits(self.words[nonzero].view(np.uint8), bitorder="little").reshape(-1, 64)
+        rows, cols = np.nonzero(bits)
+        return nonzero[rows] * 64 + cols
+
+    def equals(self, other: "BitSignal") -> bool:
+        return self.length == other.length and np.array_equal(self.words, other.words)
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def nbytes(self) -> int:
+        return self.words.nbytes
+
+    def __repr__(self):
+        return f"BitSignal(length={self.length}, true={self.count()})"
+
+
+@dataclass
+class PackedSignals:
+    """Entry/exit flags as BitSignals."""
+    entry: BitSignal
+    exit: BitSignal
+    index: Any = None
+
+    @classmethod
+    def pack(cls, entry, exit_, index=None) -> "PackedSignals":
+        return cls(BitSignal.from_bool(entry), BitSignal.from_bool(exit_), index)
+
+    @property
+    def length(self) -> int:
+        return self.entry.length
+
+    def unpack(self):
+        """(entry, exit) as bool arrays."""
+        return self.entry.to_bool(), self.exit.to_bool()
+
+    def to_frame(self) -> pd.DataFrame:
+        entry, exit_ = self.unpack()
+        return pd.DataFrame({"entry": entry, "exit": exit_}, index=self.index)
+
+    def counts(self) -> Dict[str, int]:
+        return {"entry": self.entry.count(), "exit": self.exit.count()}
+
+    @property
+    def nbytes(self) -> int:
+        return self.entry.nbytes + self.exit.nbytes
+
+
+# -------------------------------
+# PACKED EVALUATION
+# -------------------------------
+_PREDICATES = (CompareNode, BoolNode, CrossNode)
+
+
+def eval_bits(node, df, memo=None):
+    """eval_node, except that predicates come back as BitSignals."""
+    if not isinstance(node, _PREDICATES):
+        return eval_node(node, df, memo)
+    if memo is None:
+        return _eval_bits(node, df, memo)
+    # tagged: the same node may also sit in the memo as a bool Series
+    return memo.lookup(("bits", node.key()), lambda: _eval_bits(node, df, memo))
+
+
+def _dense(value, index):
+    return pd.Series(value.to_bool(), index=index) if isinstance(value, BitSignal) else value
+
+
+def _array(value):
+    return value.to_numpy() if isinstance(value, pd.Series) else value
+
+
+def _is_bool(value) -> bool:
+    return isinstance(value, (BitSignal, bool, np.bool_))
+
+
+def _as_bits(value, n: int) -> BitSignal:
+    return value if isinstance(value, BitSignal) else BitSignal.full(n, bool(value))
+
+
+def _previous_compare(left, right, op: str, n: int, bars: np.ndarray) -> np.ndarray:
+    """`prev(left) op prev(right)` at `bars`, with codegen._previous semantics (back-filled shift)."""
+
+    def previous(x):
+        if np.ndim(x) == 0:
+            return x
+        valid = np.flatnonzero(x == x)
+        # the first known value at or after bar i-1 (bar 0 has no i-1: from bar 0)
+        at = np.searchsorted(valid, np.maximum(bars - 1, 0))
+        out = np.full(len(bars), np.nan)
+        found = at < len(valid)
+        out[found] = x[valid[at[found]]]
+        return out
+
+    return _COMPARE[op](previous(left), previous(right))
+
+
+def _cross(left, right, above: bool, n: int):
+    if np.ndim(left) == 0 and np.ndim(right) == 0:
+        return (left <= right) & (left > right) if above else (left >= right) & (left < right)
+    before, now = ("<=", ">") if above else (">=", "<")
+    current = BitSignal.compare(left, right, now, n)
+    valid = BitSignal.full(n, True)
+    for x in (left, right):
+        if np.ndim(x):
+            valid = valid & BitSignal.compare(x, x, "==", n)
+    # where both previous values exist, prev(left) op prev(right) is the shifted comparison
+    known = valid.shift()
+    out = BitSignal.compare(left, right, before, n).shift() & known & current
+    # elsewhere (bar 0, warm-up and NaN gaps) the back-filled values decide
+    bars = (current & ~known).indices()
+    if len(bars):
+        out = out | BitSignal.from_indices(bars[_previous_compare(left, right, before, n, bars)], n)
+    return out
+
+
+def _eval_bits(node, df, memo):
+    n = len(df.index)
+    if isinstance(node, CompareNode):
+        if node.op not in _COMPARE:
+            raise ValueError(f"Unknown compare op {node.op}")
+        left = _array(eval_bits(node.left, df, memo))
+        right = _array(eval_bits(node.right, df, memo))
+        if np.ndim(left) == 0 and np.ndim(right) == 0:
+            return bool(_COMPARE[node.op](left, right))
+        return BitSignal.compare(left, right, node.op, n)
+
+    if isinstance(node, BoolNode):
+        left = eval_bits(node.left, df, memo)
+        if isinstance(left, BitSignal) and isinstance(node.right, _PREDICATES):
+            if (not left.any()) if node.op == "AND" else left.all():
+                return left
+        right = eval_bits(node.right, df, memo)
+        if _is_bool(left) and _is_bool(right):
+            if not isinstance(left, BitSignal) and not isinstance(right, BitSignal):
+                return (left and right) if node.op == "AND" else (left or right)
+            left, right = _as_bits(left, n), _as_bits(right, n)
+            return left & right if node.op == "AND" else left | right
+        # a value operand (e.g. a bare field): pandas semantics, as in eval_node
+        left, right = _dense(left, df.index), _dense(right, df.index)
+        value = left & right if node.op == "AND" else left | right
+        return BitSignal.from_bool(value.to_numpy()) if getattr(value, "dtype", None) == bool else value
+
+    if isinstance(node, CrossNode):
+        left = _array(eval_bits(node.left, df, memo))
+        right = _array(eval_bits(node.right, df, memo))
+        return _cross(left, right, node.dir.lower() == "crosses_above", n)
+
+    raise ValueError(f"Unknown AST node: {node}")
+
+
+def _root(value, n: int) -> BitSignal:
+    if isinstance(value, BitSignal):
+        return value
+    if isinstance(value, pd.Series):
+        return BitSignal.from_bool(value.fillna(False).astype(bool).to_numpy())
+    return BitSignal.full(n, bool(value))
+
+
+def packed_signals(ast: ScriptAST, df: pd.DataFrame, memo: EvalMemo = None) -> PackedSignals:
+    """generate_signals with packed results (see generate_signals(..., packed=True))."""
+    if memo is None:
+        memo = EvalMemo()
+    if hasattr(memo, "bind"):
+        memo.bind(df)
+    n = len(df.index)
+    entry = _root(eval_bits(ast.entry, df, memo), n) if ast.entry else BitSignal.full(n, False)
+    exit_ = _root(eval_bits(ast.exit, df, memo), n) if ast.exit else BitSignal.full(n, False)
+    return PackedSignals(entry, exit_, df.index)
@@ -0,0 +1,261 @@
+# src/chunked.py
+"""
+Out-of-core signal evaluation: run a compiled script over a long history one
+fixed-size block at a time.
+
+    for block in generate_signals_chunked(ast, store.columns("AAPL"), chunk_size=250_000):
+        ...                                  # DataFrame of entry/exit for that block
+
+Every step of the plan keeps only the look-back its consumers need from the
+previous block: one bar of each crossover operand (the previous-bar
+comparison).  Each block is evaluated on its rows plus that carried tail, so
+peak memory is bounded by the chunk size plus the largest window, whatever
+the length of the history.
+
+Indicators carry their state instead of a tail and resume exactly where the
+previous block stopped.  EMA and Wilder's RSI carry the filter state (last
+value, bars since the last observation, observation count; for RSI also the
+previous input and the partial seed sums).  A rolling mean's value depends on
+pandas' running sum since the first bar, not only on the window (restarting
+pandas on the last period-1 inputs drifts by an ulp now and then), so sma
+carries that kernel's state: compensated sums, counts and the window's
+inputs, advanced a block at a time by streaming.RollingMean.run.
+
+Indicator values, and so signals, are identical to a single generate_signals
+pass.
+"""
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.ast_nodes import ScriptAST
+from src.compiler import CompiledScript, compile_script, _OPS, _to_signal, _length
+from src.codegen import _rsi_values
+from src.streaming import RollingMean
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _lookback(step) -> int:
+    """Bars of history before the first output row a step needs from each input."""
+    if step.op in ("cross_above", "cross_below"):
+        return 1
+    return 0
+
+
+class _SMAState(RollingMean):
+    """Resumable rolling(period, min_periods=period).mean() (see streaming.RollingMean.run)."""
+
+    def __init__(self, period: int):
+        super().__init__(period, period)
+
+
+class _EWMState:
+    """Resumable ewm(adjust=False).mean() with the given com/span."""
+
+    def __init__(self, **ewm):
+        self.ewm = ewm
+        self.last = None     # filter value at the last observation
+        self.gap = 0         # missing bars since then
+
+    def run(self, x: np.ndarray) -> np.ndarray:
+        m = len(x)
+        if self.last is None:
+            head = 0
+            ext = x
+        else:
+            # replaying the last value, then the missing bars, puts pandas' ewm in the
+            # exact state it had at the block boundary (old weight reset to 1, then decayed)
+            head = 1 + self.gap
+            ext = np.concatenate(([self.last], np.full(self.gap, np.nan), x))
+        out = pd.Series(ext).ewm(adjust=False, **self.ewm).mean().to_numpy()[head:].copy()
+
+        valid = ~np.isnan(x)
+        if valid.any():
+            last_obs = m - 1 - int(np.argmax(valid[::-1]))
+            self.last = out[last_obs]
+            self.gap = m - 1 - last_obs
+        else:
+            self.gap += m
+        return out
+
+
+class _EMAState(_EWMState):
+    """Resumable ewm(span=period, adjust=False, min_periods=period).mean()."""
+
+    def __init__(self, period: int):
+        super().__init__(span=period)
+        self.period = period
+        self.nobs = 0
+
+    def run(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        out = super().run(x)
+        seen = self.nobs + np.cumsum(~np.isnan(x))
+        self.nobs = int(seen[-1]) if len(x) else self.nobs
+        out[seen < self.period] = np.nan
+        return out
+
+
+class _WilderState:
+    """Resumable codegen.wilder_mean: seed sums until `period` bars are in, then the recursion."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.seen = 0        # bars of the seed window so far
+        self.total = 0.0
+        self.count = 0
+        self.ewm = None
+
+    def run(self, x: np.ndarray) -> np.ndarray:
+        if self.ewm is not None:
+            return self.ewm.run(x)
+        out = np.full(len(x), np.nan)
+        begin = 0
+        if self.seen == 0:
+            valid = np.flatnonzero(x == x)
+            if len(valid) == 0:
+                return out
+            begin = int(valid[0])
+        stop = min(begin + self.period - self.seen, len(x))
+        window = x[begin:stop]
+        # continuing the running sum keeps the exact summation order of the one-shot seed
+        self.total = np.nancumsum(np.concatenate(([self.total], window)))[-1]
+        self.count += np.count_nonzero(window == window)
+        self.seen += stop - begin
+        if self.seen < self.period:
+            return out
+        self.ewm = _EWMState(com=self.period - 1)
+        out[stop - 1:] = self.ewm.run(np.concatenate(([self.total / self.count], x[stop:])))
+        return out
+
+
+class _RSIState:
+    """Resumable codegen.rsi: the previous input plus Wilder states for gains and losses."""
+
+    def __init__(self, period: int):
+        self.prev = np.nan
+        self.up = _WilderState(period)
+        self.down = _WilderState(period)
+
+    def run(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        delta = np.diff(x, prepend=self.prev)
+        if len(x):
+            self.prev = x[-1]
+        return _rsi_values(self.up.run(np.clip(delta, 0, None)), self.down.run(-np.clip(delta, None, 0)))
+
+
+_STATES = {"sma": _SMAState, "ema": _EMAState, "rsi": _RSIState}
+
+
+class ChunkedEvaluator:
+    """
+    Stateful block-by-block evaluator for one script over one history.
+
+        ev = ChunkedEvaluator(ast)
+        for cols in blocks:                  # {"close": array, ...}, consecutive rows
+            entry, exit_ = ev.push(cols)
+    """
+
+    def __init__(self, script: Union[ScriptAST, CompiledScript]):
+        self.compiled = script if isinstance(script, CompiledScript) else compile_script(script)
+        steps = self.compiled.steps
+        if any(s.op == "timeframe" for s in steps):
+            raise ValueError("timeframe-qualified series are not supported by chunked evaluation")
+        # tail length kept for each slot = the most any consumer looks back into it
+        self.tail_sizes = [0] * len(steps)
+        for step in steps:
+            for i in step.args:
+                self.tail_sizes[i] = max(self.tail_sizes[i], _lookback(step))
+        self.reset()
+
+    @property
+    def columns(self) -> List[str]:
+        return self.compiled.columns
+
+    def reset(self):
+        """Forget the carried history (start of a new series)."""
+        self._tails: List[Any] = [None] * len(self.compiled.steps)
+        # recursive indicators carry their filter state instead of a tail
+        self._filters: Dict[int, Any] = {
+            i: _STATES[s.op](s.params[0]) for i, s in enumerate(self.compiled.steps) if s.op in _STATES}
+        self.rows = 0
+
+    def _extended(self, slot: int, value, lookback: int):
+        tail = self._tails[slot]
+        if lookback == 0 or tail is None or np.ndim(value) == 0:
+            return value, 0
+        tail = tail[len(tail) - min(lookback, len(tail)):]
+        return np.concatenate((tail, value)), len(tail)
+
+    def push(self, columns: Mapping[str, Any], n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Evaluate the next block of rows (`n` of them if no column is given); returns (entry, exit)."""
+        m = _length(columns) if n is None else n
+        slots = []
+        for i, step in enumerate(self.compiled.steps):
+            fn = _OPS[step.op]
+            inputs = [slots[j] for j in step.args]
+            if step.op in _STATES and np.ndim(inputs[0]):
+                value = self._filters[i].run(inputs[0])
+            else:
+                lookback = _lookback(step)
+                extended = [self._extended(j, v, lookback) for j, v in zip(step.args, inputs)]
+                value = fn(columns, *step.params, *[v for v, _ in extended])
+                head = max((h for _, h in extended), default=0)
+                if head and np.ndim(value):
+                    value = value[head:]
+            slots.append(value)
+
+        # carry each slot's tail into the next block (only after every step has read the old one)
+        for i, value in enumerate(slots):
+            keep = self.tail_sizes[i]
+            if keep and np.ndim(value):
+                tail = self._tails[i]
+                if tail is not None and len(value) < keep:
+                    value = np.concatenate((tail, value))
+                self._tails[i] = np.array(value[len(value) - min(keep, len(value)):])
+        self.rows += m
+        c = self.compiled
+        entry = _to_signal(slots[c.entry_slot], m) if c.entry_slot is not None else np.zeros(m, dtype=bool)
+        exit_ = _to_signal(slots[c.exit_slot], m) if c.exit_slot is not None else np.zeros(m, dtype=bool)
+        return entry, exit_
+
+
+# -------------------------------
+# BLOCK SOURCES
+# -------------------------------
+def iter_blocks(data, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                names: Optional[List[str]] = None) -> Iterator[Tuple[Dict[str, Any], pd.Index]]:
+    """
+    Split `data` into ({column: array}, index) blocks of at most `chunk_size` rows.
+
+    `data` is a DataFrame, a {column: array} mapping (e.g. the memory maps of
+    ColumnStore.columns, which are only paged in block by block) or an iterable
+    of DataFrames that are already blocks (e.g. pd.read_csv(..., chunksize=N)).
+    """
+    if isinstance(data, pd.DataFrame) or isinstance(data, Mapping):
+        n = _length(data)
+        index = data.index if isinstance(data, pd.DataFrame) else pd.RangeIndex(n)
+        names = [c for c in (names if names is not None else list(data.keys())) if c in data]
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            yield {c: np.asarray(data[c])[start:stop] for c in names}, index[start:stop]
+        return
+    for df in data:
+        cols = [c for c in (names if names is not None else list(df.columns)) if c in df.columns]
+        yield {c: df[c].to_numpy() for c in cols}, df.index
+
+
+def generate_signals_chunked(ast: Union[ScriptAST, CompiledScript], data,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Chunked counterpart of codegen.generate_signals: yields one entry/exit
+    DataFrame per block; concatenated, they equal the single-pass result.
+    """
+    ev = ChunkedEvaluator(ast)
+    names = ev.columns + [s.params[0] for s in ev.compiled.steps if s.op == "column_or_false"]
+    for block, index in iter_blocks(data, chunk_size, names):
+        entry, exit_ = ev.push(block, len(index))
+        yield pd.DataFrame({"entry": entry, "exit": exit_}, index=index)
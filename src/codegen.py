@@ -1,25 +1,111 @@
 # src/codegen.py
 import pandas as pd
 import numpy as np
-from .ast_nodes import ScriptAST, FieldNode, NumberNode, FunctionNode, CompareNode, BoolNode, CrossNode
+from src.ast_nodes import ScriptAST, FieldNode, NumberNode, FunctionNode, CompareNode, BoolNode, CrossNode, TimeframeNode
+from src.timeframes import resampled
 
 def sma(series: pd.Series, period: int) -> pd.Series:
-    return series.rolling(period, min_periods=1).mean()
+    return series.rolling(period, min_periods=period).mean()
+
+def ema(series: pd.Series, period: int) -> pd.Series:
+    return series.ewm(span=period, adjust=False, min_periods=period).mean()
+
+def wilder_mean(values, period: int) -> np.ndarray:
+    """
+    Wilder's smoothing: the mean of the first `period` bars (counted from the
+    first observation), then avg = (avg * (period - 1) + x) / period.
+    The recursion is pandas' ewm(com=period-1, adjust=False) kernel, so the
+    whole series is one compiled O(n) pass.
+    """
+    x = np.asarray(values, dtype=float)
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(x == x)
+    if len(valid) == 0 or valid[0] + period > len(x):
+        return out
+    stop = valid[0] + period
+    window = x[valid[0]:stop]
+    seed = np.nancumsum(window)[-1] / np.count_nonzero(window == window)
+    smoothed = pd.Series(np.concatenate(([seed], x[stop:]))).ewm(com=period - 1, adjust=False).mean()
+    out[stop - 1:] = smoothed.to_numpy()
+    return out
+
+def _rsi_values(avg_up, avg_down):
+    total = avg_up + avg_down
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = 100 * avg_up / total
+    out[total == 0] = 50.0      # no gains and no losses: neutral
+    return out
 
 def rsi(series: pd.Series, period: int) -> pd.Series:
-    # Simple RSI implementation (wilders smoothing approx)
-    delta = series.diff()
-    up = delta.clip(lower=0)
-    down = -delta.clip(upper=0)
-    ma_up = up.rolling(period, min_periods=1).mean()
-    ma_down = down.rolling(period, min_periods=1).mean()
-    rs = ma_up / (ma_down.replace(0, 1e-8))
-    return 100 - (100 / (1 + rs))
-
-def eval_node(node, df):
+    # Wilder's RSI: gains and losses smoothed with wilder_mean
+    x = series.to_numpy(dtype=float)
+    delta = np.diff(x, prepend=np.nan)
+    avg_up = wilder_mean(np.clip(delta, 0, None), period)
+    avg_down = wilder_mean(-np.clip(delta, None, 0), period)
+    return pd.Series(_rsi_values(avg_up, avg_down), index=series.index)
+
+def _previous(value):
+    if not isinstance(value, pd.Series):
+        return value
+    return value.shift(1).bfill()
+
+class EvalMemo:
+    """
+    Per-evaluation memo keyed by structural node key, so an indicator or
+    comparison that appears several times in a script is computed once.
+    `hits` / `misses` count lookups that were served from / added to the memo.
+    Its values belong to one frame: the evaluators bind the memo to the frame
+    they evaluate, and passing it on with another frame raises ValueError.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+        self.frame = None
+
+    def bind(self, frame):
+        """Tie the memo to `frame` (DataFrame, Panel or column mapping) on first use."""
+        if self.frame is None:
+            self.frame = frame
+        elif frame is not self.frame:
+            raise ValueError("EvalMemo already holds values of another frame; use one memo per frame")
+
+    def lookup(self, key, compute):
+        if key in self.values:
+            self.hits += 1
+            return self.values[key]
+        self.misses += 1
+        value = self.values[key] = compute()
+        return value
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.values)}
+
+class _ScopedMemo:
+    """View of a memo for nodes evaluated on resampled bars: keys are tagged with the
+    timeframe so they never collide with the same subtree on the base frame."""
+
+    def __init__(self, memo, timeframe: str):
+        self.memo = memo
+        self.timeframe = timeframe
+
+    def lookup(self, key, compute):
+        return self.memo.lookup(("@", self.timeframe, key), compute)
+
+# leaves are cheap to evaluate and are not worth a memo entry
+_MEMO_NODES = (FunctionNode, CompareNode, BoolNode, CrossNode, TimeframeNode)
+_PREDICATES = (CompareNode, BoolNode, CrossNode)
+
+def eval_node(node, df, memo: EvalMemo = None):
     """Return a pandas Series or scalar depending on node type."""
+    if memo is not None and isinstance(node, _MEMO_NODES):
+        return memo.lookup(node.key(), lambda: _eval_node(node, df, memo))
+    return _eval_node(node, df, memo)
+
+def _eval_node(node, df, memo):
     if node is None:
-        return pd.Series([False]*len(df), index=df.index)
+        return pd.Series(np.zeros(len(df), dtype=bool), index=df.index)
     if isinstance(node, FieldNode):
         name = node.name.lower()
         return df[name]
@@ -34,18 +120,22 @@ def eval_node(node, df):
             # expect args[0] field, args[1] number
             period = int(args[1].value) if isinstance(args[1], NumberNode) else int(args[1])
             # support if first arg is FieldNode or string
-            series = eval_node(args[0], df)
+            series = eval_node(args[0], df, memo)
             return sma(series, period)
         if name == "rsi":
             period = int(args[1].value) if isinstance(args[1], NumberNode) else int(args[1])
-            series = eval_node(args[0], df)
+            series = eval_node(args[0], df, memo)
             return rsi(series, period)
+        if name == "ema":
+            period = int(args[1].value) if isinstance(args[1], NumberNode) else int(args[1])
+            series = eval_node(args[0], df, memo)
+            return ema(series, period)
         # default: try name as column function (fallback)
         return df[name] if name in df.columns else pd.Series([False]*len(df), index=df.index)
 
     if isinstance(node, CompareNode):
-        left = eval_node(node.left, df)
-        right = eval_node(node.right, df)
+        left = eval_node(node.left, df, memo)
+        right = eval_node(node.right, df, memo)
         op = node.op
         if op == ">":
             return left > right
@@ -62,34 +152,68 @@ def eval_node(node, df):
         raise ValueError(f"Unknown compare op {op}")
 
     if isinstance(node, BoolNode):
-        left = eval_node(node.left, df)
-        right = eval_node(node.right, df)
+        left = eval_node(node.left, df, memo)
+        # the outcome is already settled on every bar: skip the right-hand side
+        # (only when it is a predicate, so `left & right` would be `left` again)
+        if isinstance(node.right, _PREDICATES) and isinstance(left, pd.Series) and left.dtype == bool:
+            if (not left.any()) if node.op == "AND" else left.all():
+                return left
+        right = eval_node(node.right, df, memo)
         if node.op == "AND":
             return left & right
         else:
             return left | right
 
     if isinstance(node, CrossNode):
-        left = eval_node(node.left, df)
-        right = eval_node(node.right, df)
-        if node.dir == "crosseS_above".lower() or node.dir == "crosses_above":
+        left = eval_node(node.left, df, memo)
+        right = eval_node(node.right, df, memo)
+        # previous bar values; the first bar (and warm-up gaps) take the next known value
+        prev_left = _previous(left)
+        prev_right = _previous(right)
+        if node.dir.lower() == "crosses_above":
             # crosses above: previous left <= previous right and current left > current right
-            prev_left = left.shift(1).fillna(method="bfill")
-            prev_right = right.shift(1).fillna(method="bfill")
             return (prev_left <= prev_right) & (left > right)
         else:
-            prev_left = left.shift(1).fillna(method="bfill")
-            prev_right = right.shift(1).fillna(method="bfill")
             return (prev_left >= prev_right) & (left < right)
 
+    if isinstance(node, TimeframeNode):
+        # evaluated on the cached resampled bars, then forward-aligned (no look-ahead)
+        tf = resampled(df, node.timeframe)
+        scoped = _ScopedMemo(memo, tf.timeframe) if memo is not None else None
+        value = tf.align(eval_node(node.expr, tf.bars, scoped))
+        return pd.Series(value, index=df.index) if np.ndim(value) else value
+
     raise ValueError(f"Unknown AST node: {node}")
 
-def generate_signals(ast: ScriptAST, df: pd.DataFrame) -> pd.DataFrame:
-    """Return DataFrame with boolean 'entry' and 'exit' series."""
-    entry_series = eval_node(ast.entry, df) if ast.entry else pd.Series([False]*len(df), index=df.index)
-    exit_series = eval_node(ast.exit, df) if ast.exit else pd.Series([False]*len(df), index=df.index)
-    # ensure boolean Series
-    entry_series = entry_series.fillna(False).astype(bool) if not isinstance(entry_series, (int, float)) else pd.Series([bool(entry_series)]*len(df), index=df.index)
-    exit_series = exit_series.fillna(False).astype(bool) if not isinstance(exit_series, (int, float)) else pd.Series([bool(exit_series)]*len(df), index=df.index)
+def generate_signals(ast: ScriptAST, df: pd.DataFrame, memo: EvalMemo = None, packed: bool = False) -> pd.DataFrame:
+    """
+    Return DataFrame with boolean 'entry' and 'exit' series.
+    Repeated subtrees are evaluated once; pass an EvalMemo to inspect its hit/miss counts.
+    packed=True keeps every predicate bit-packed and returns bitsignals.PackedSignals.
+    """
+    if packed:
+        from src.bitsignals import packed_signals
+        return packed_signals(ast, df, memo)
+    if memo is None:
+        memo = EvalMemo()
+    if hasattr(memo, "bind"):
+        memo.bind(df)
+    entry_series = eval_node(ast.entry, df, memo) if ast.entry else False
+    exit_series = eval_node(ast.exit, df, memo) if ast.exit else False
+    # ensure boolean Series (constants, e.g. the `ENTRY: 0` placeholder, are broadcast)
+    entry_series = entry_series.fillna(False).astype(bool) if not isinstance(entry_series, (int, float)) else pd.Series(np.full(len(df), bool(entry_series)), index=df.index)
+    exit_series = exit_series.fillna(False).astype(bool) if not isinstance(exit_series, (int, float)) else pd.Series(np.full(len(df), bool(exit_series)), index=df.index)
     signals = pd.DataFrame({"entry": entry_series, "exit": exit_series}, index=df.index)
     return signals
+
+# alias kept for callers written against the older name
+generate_signals_from_ast = generate_signals
+
+def generate_signal_function(ast: ScriptAST, df: pd.DataFrame = None):
+    """
+    Compile `ast` once and return a reusable `fn(df) -> signals` callable.
+    If `df` is given, the compiled function is applied to it straight away.
+    """
+    from src.compiler import compile_script
+    fn = compile_script(ast)
+    return fn(df) if df is not None else fn
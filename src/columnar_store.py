@@ -0,0 +1,184 @@
+# src/columnar_store.py
+"""
+Local columnar store for long OHLCV histories.
+
+    store = ColumnStore("data/bars")
+    store.write("AAPL", df)                  # once, at ingest time
+    cols = store.columns("AAPL")             # {"close": memmap, ...}, no copy
+    entry, exit_ = compile_script(ast).evaluate(cols)
+    df = store.load("AAPL")                  # DataFrame backed by the same maps
+
+Layout: one .npy file per column per symbol (<root>/<SYMBOL>/<column>.npy),
+the row index in <SYMBOL>/_index.npy, and a JSON metadata index at
+<root>/_meta.json listing symbols, row counts and dtypes.  Columns are opened
+with np.load(mmap_mode="r"), so every process reading the same symbol shares
+the OS page cache instead of holding a private copy.
+
+Writers from several processes may share a store: the metadata update of
+write() re-reads _meta.json and rewrites it under an exclusive lock on
+<root>/_meta.lock (fcntl; without fcntl, e.g. on Windows, writes must not
+overlap).
+
+A ColumnStore has `symbols()` / `load(symbol)`, so it can be passed directly
+as the `data` argument of batch.run_universe.
+"""
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:       # not available on Windows
+    fcntl = None
+
+STORE_VERSION = 1
+META_FILE = "_meta.json"
+LOCK_FILE = "_meta.lock"
+INDEX_FILE = "_index.npy"
+
+
+def _atomic_save(path: Path, array: np.ndarray):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array, allow_pickle=False)
+    os.replace(tmp, path)
+
+
+class ColumnStore:
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._meta = self._read_meta()
+
+    # ---- metadata ----
+    def _read_meta(self) -> dict:
+        path = self.root / META_FILE
+        if not path.exists():
+            return {"version": STORE_VERSION, "symbols": {}}
+        with open(path) as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"{path}: unsupported column store version {meta.get('version')}")
+        return meta
+
+    def _write_meta(self):
+        path = self.root / META_FILE
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._meta, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+    @contextmanager
+    def _meta_lock(self):
+        """Exclusive lock around a read-modify-write of the metadata index."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.root / LOCK_FILE, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Re-read the metadata index (e.g. after another process wrote to the store)."""
+        self._meta = self._read_meta()
+
+    def symbols(self) -> List[str]:
+        return sorted(self._meta["symbols"])
+
+    def info(self, symbol: str) -> dict:
+        """Row count, column dtypes and index description of `symbol`."""
+        try:
+            return self._meta["symbols"][symbol]
+        except KeyError:
+            raise KeyError(f"Symbol not in column store: {symbol}") from None
+
+    def version(self, symbol: str) -> Optional[int]:
+        """Modification time (ns) of the symbol's folder: every write() renames files into it."""
+        try:
+            return (self.root / symbol).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._meta["symbols"]
+
+    def __len__(self):
+        return len(self._meta["symbols"])
+
+    # ---- write ----
+    def write(self, symbol: str, df: pd.DataFrame):
+        """Store (or replace) the history of `symbol`: one .npy per column plus the index."""
+        folder = self.root / symbol
+        folder.mkdir(exist_ok=True)
+        dtypes = {}
+        for name in df.columns:
+            values = df[name].to_numpy()
+            if values.dtype == object:
+                raise TypeError(f"Column {name!r} of {symbol} is not numeric")
+            _atomic_save(folder / f"{name}.npy", np.ascontiguousarray(values))
+            dtypes[str(name)] = values.dtype.str
+
+        if isinstance(df.index, pd.DatetimeIndex):
+            # tz-aware stamps are stored in UTC: local wall-clock times are ambiguous across DST changes
+            index = {"kind": "datetime", "tz": str(df.index.tz) if df.index.tz else None, "utc": True}
+            naive = df.index.tz_convert("UTC").tz_localize(None) if df.index.tz else df.index
+            _atomic_save(folder / INDEX_FILE, naive.to_numpy())
+        elif isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1:
+            index = {"kind": "range"}
+        else:
+            index = {"kind": "values"}
+            _atomic_save(folder / INDEX_FILE, np.ascontiguousarray(df.index.to_numpy()))
+
+        with self._meta_lock():
+            # other processes may have added symbols since this store read the index
+            self._meta = self._read_meta()
+            # drop files of columns that no longer exist
+            for old in self._meta["symbols"].get(symbol, {}).get("columns", {}):
+                if old not in dtypes:
+                    (folder / f"{old}.npy").unlink(missing_ok=True)
+
+            self._meta["symbols"][symbol] = {"rows": len(df), "columns": dtypes, "index": index}
+            self._write_meta()
+
+    # ---- read ----
+    def columns(self, symbol: str, names: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Read-only memory maps of the requested columns (all of them by default)."""
+        info = self.info(symbol)
+        names = list(info["columns"]) if names is None else names
+        folder = self.root / symbol
+        return {name: np.load(folder / f"{name}.npy", mmap_mode="r") for name in names}
+
+    def index(self, symbol: str) -> pd.Index:
+        info = self.info(symbol)
+        spec = info["index"]
+        if spec["kind"] == "range":
+            return pd.RangeIndex(info["rows"])
+        values = np.load(self.root / symbol / INDEX_FILE, mmap_mode="r")
+        if spec["kind"] == "datetime":
+            index = pd.DatetimeIndex(values)
+            if not spec["tz"]:
+                return index
+            if spec.get("utc"):
+                return index.tz_localize("UTC").tz_convert(spec["tz"])
+            return index.tz_localize(spec["tz"])      # written before stamps were stored in UTC
+        return pd.Index(values)
+
+    def load(self, symbol: str, names: Optional[List[str]] = None) -> pd.DataFrame:
+        """DataFrame whose columns are views of the memory maps (no copy of the data)."""
+        # plain ndarray views of the maps, so pandas treats them like any other column
+        columns = {name: np.asarray(m) for name, m in self.columns(symbol, names).items()}
+        df = pd.DataFrame(columns, index=self.index(symbol), copy=False)
+        df.attrs["symbol"] = symbol       # keys the resampled-bar cache (see timeframes)
+        return df
+
+    def __repr__(self):
+        return f"ColumnStore({str(self.root)!r}, symbols={len(self)})"
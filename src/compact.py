@@ -0,0 +1,81 @@
+# src/compact.py
+"""
+Compact evaluation mode for memory-bound, universe-wide runs.
+
+    signals = compact_signals(ast, df)            # PackedSignals, 1 bit per bar and signal
+    result = run_backtest_compact(df, signals)    # equity_curve is a float64 ndarray
+
+Compared with generate_signals + run_backtest:
+- price and volume columns are read as float32 (compact_columns), and every
+  indicator / timeframe series is stored as float32.  The recursive kernels
+  (rolling sums, ewm, Wilder smoothing) still accumulate in float64 and only
+  their outputs are rounded, so the error is that of rounding the inputs
+  (~6e-8 relative for averages, ~1e-4 points for RSI, which works on
+  bar-to-bar differences) and does not grow with the series length.
+- entry/exit are bitsignals.PackedSignals: 8 bars per byte instead of one.
+- the equity curve is one NumPy array instead of a list of Python floats;
+  PnL and equity are accumulated in float64.
+
+Signals can differ from the float64 path only where an indicator and the
+value it is compared with are within float32 rounding of each other.
+"""
+from typing import Any, Dict, Mapping, Union
+
+import numpy as np
+import pandas as pd
+
+from src.ast_nodes import ScriptAST
+from src.compiler import CompiledScript, compile_script
+from src.backtest import run_backtest_arrays
+from src.bitsignals import PackedSignals
+
+COMPACT_DTYPE = np.float32
+
+
+def compact_columns(df: pd.DataFrame, columns=None) -> Dict[str, np.ndarray]:
+    """float32 copies of the numeric columns of `df` (all of them, or just `columns`)."""
+    names = df.columns if columns is None else [c for c in columns if c in df.columns]
+    out = {}
+    for name in names:
+        values = df[name].to_numpy()
+        out[name] = values.astype(COMPACT_DTYPE) if values.dtype.kind in "fiu" else values
+    return out
+
+
+class _CompactMemo:
+    """Memo that rounds indicator and timeframe outputs to float32 as they are produced."""
+
+    def lookup(self, key, compute):
+        value = compute()
+        if isinstance(value, np.ndarray) and value.dtype.kind == "f":
+            return value.astype(COMPACT_DTYPE, copy=False)
+        return value
+
+
+def compact_signals(script: Union[ScriptAST, CompiledScript], data) -> PackedSignals:
+    """
+    Evaluate `script` (a ScriptAST or an already compiled plan) in compact mode.
+    `data` is a DataFrame (converted with compact_columns) or a column mapping
+    that is used as is, e.g. columns already converted once per symbol.
+    """
+    compiled = script if isinstance(script, CompiledScript) else compile_script(script)
+    if isinstance(data, pd.DataFrame):
+        columns = compact_columns(data, compiled.columns)
+        index = data.index
+        if any(s.op == "timeframe" for s in compiled.steps):
+            # timeframe steps resample a DataFrame.  No symbol in attrs: the float32
+            # bars must not share resample-cache entries with the float64 frame.
+            columns = pd.DataFrame(columns, index=index, copy=False)
+    else:
+        columns, index = data, None
+    entry, exit_ = compiled.evaluate(columns, memo=_CompactMemo())
+    return PackedSignals.pack(entry, exit_, index)
+
+
+def run_backtest_compact(df: Union[pd.DataFrame, Mapping[str, Any]], signals: PackedSignals) -> Dict[str, Any]:
+    """run_backtest_arrays on float32 closes and packed signals; the equity curve stays an ndarray."""
+    close = df["close"]
+    close = close.to_numpy(dtype=COMPACT_DTYPE) if isinstance(close, pd.Series) else np.asarray(close, dtype=COMPACT_DTYPE)
+    entry, exit_ = signals.unpack()
+    index = signals.index if signals.index is not None else getattr(df, "index", None)
+    return run_backtest_arrays(close, entry, exit_, index, curve="array")
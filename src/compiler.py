@@ -0,0 +1,308 @@
+# src/compiler.py
+"""
+Compile a ScriptAST once into a flat execution plan over NumPy arrays.
+
+`codegen.eval_node` walks the tree and dispatches on node type every time it
+runs.  `compile_script` does that walk a single time and emits a list of
+steps in evaluation order: every step reads earlier slots and writes exactly
+one new slot.  The resulting `CompiledScript` can be applied to any number of
+DataFrames (or plain column mappings) and produces the same signals as
+`codegen.generate_signals`.  Identical subtrees are emitted once (see _Compiler).
+
+Like eval_node, the plan short-circuits AND / OR: when the left operand of an
+AND is False on every bar (of an OR, True on every bar) and the right one is
+a predicate, the steps only that right operand needs are not run.  Plans
+with such steps are therefore evaluated on demand, from the ENTRY / EXIT
+roots, instead of front to back.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.ast_nodes import ScriptAST, FieldNode, NumberNode, FunctionNode, CompareNode, BoolNode, CrossNode, TimeframeNode
+from src.codegen import sma, ema, rsi
+from src.timeframes import resampled
+
+
+# -------------------------------
+# KERNELS
+# -------------------------------
+# every op is called as fn(columns, *params, *inputs) and returns an array or scalar
+
+def _op_field(columns, name):
+    return np.asarray(columns[name])
+
+def _op_const(columns, value):
+    return value
+
+def _op_column_or_false(columns, name):
+    # mirrors eval_node's fallback for unknown function names
+    if name in columns:
+        return np.asarray(columns[name])
+    return False
+
+def _op_sma(columns, period, x):
+    return sma(pd.Series(x, copy=False), period).to_numpy()
+
+def _op_ema(columns, period, x):
+    return ema(pd.Series(x, copy=False), period).to_numpy()
+
+def _op_rsi(columns, period, x):
+    return rsi(pd.Series(x, copy=False), period).to_numpy()
+
+_COMPARE = {
+    ">": np.greater,
+    "<": np.less,
+    ">=": np.greater_equal,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+def _op_compare(columns, op, left, right):
+    return _COMPARE[op](left, right)
+
+def _op_and(columns, left, right):
+    return np.logical_and(left, right)
+
+def _op_or(columns, left, right):
+    return np.logical_or(left, right)
+
+def _previous(x):
+    """Value one bar back; the first bar and gaps take the current value (see eval_node)."""
+    if np.ndim(x) == 0:
+        return x
+    prev = np.empty_like(x)
+    prev[1:] = x[:-1]
+    prev[:1] = x[:1]
+    if prev.dtype.kind == "f":
+        gaps = np.isnan(prev)
+        if gaps.any():
+            prev[gaps] = x[gaps]
+    return prev
+
+def _op_cross_above(columns, left, right):
+    return (_previous(left) <= _previous(right)) & (left > right)
+
+def _op_cross_below(columns, left, right):
+    return (_previous(left) >= _previous(right)) & (left < right)
+
+def _run(steps, columns) -> list:
+    slots = []
+    for s in steps:
+        slots.append(_OPS[s.op](columns, *s.params, *[slots[i] for i in s.args]))
+    return slots
+
+def _op_timeframe(columns, timeframe, steps, root):
+    # the sub-plan runs on the cached resampled bars; its result is forward-aligned
+    if not isinstance(columns, pd.DataFrame):
+        raise ValueError("timeframe-qualified series need a DataFrame with a DatetimeIndex")
+    tf = resampled(columns, timeframe)
+    return tf.align(_run(steps, tf.bars)[root])
+
+# ops whose results are worth handing to a memo (see CompiledScript.evaluate)
+INDICATOR_OPS = {"sma", "ema", "rsi"}
+_MEMO_OPS = INDICATOR_OPS | {"timeframe"}
+# ops that produce a boolean per bar (eval_node's predicates)
+_PREDICATE_OPS = {"compare", "and", "or", "cross_above", "cross_below"}
+
+_OPS = {
+    "field": _op_field,
+    "const": _op_const,
+    "column_or_false": _op_column_or_false,
+    "sma": _op_sma,
+    "ema": _op_ema,
+    "rsi": _op_rsi,
+    "compare": _op_compare,
+    "and": _op_and,
+    "or": _op_or,
+    "cross_above": _op_cross_above,
+    "cross_below": _op_cross_below,
+    "timeframe": _op_timeframe,
+}
+
+
+def _to_signal(value, n: int) -> np.ndarray:
+    """Coerce a step result to a boolean array the way generate_signals does."""
+    if np.ndim(value) == 0:
+        return np.full(n, bool(value))
+    value = np.asarray(value)
+    if value.dtype == bool:
+        return value
+    if value.dtype.kind == "f":
+        return ~np.isnan(value) & (value != 0)
+    return value != 0
+
+
+def _settled(op: str, left) -> bool:
+    """True when `left AND ...` is False (`left OR ...` True) on every bar whatever the right side."""
+    if not isinstance(left, np.ndarray) or left.dtype != bool:
+        return False
+    return not left.any() if op == "and" else left.all()
+
+
+def _length(columns) -> int:
+    if isinstance(columns, pd.DataFrame):
+        return len(columns.index)
+    return len(next(iter(columns.values())))
+
+
+# -------------------------------
+# PLAN
+# -------------------------------
+@dataclass(frozen=True)
+class Step:
+    op: str                   # key into _OPS
+    args: Tuple[int, ...]     # input slots
+    params: Tuple[Any, ...]   # static parameters (column name, period, operator, ...)
+    key: tuple = field(default=(), compare=False)   # structural key of the source node
+
+
+class CompiledScript:
+    """A ScriptAST lowered to a flat list of steps; call it with a DataFrame."""
+
+    def __init__(self, steps: List[Step], entry: Optional[int], exit: Optional[int], cse_stats: Optional[dict] = None):
+        self.steps = steps
+        self.entry_slot = entry
+        self.exit_slot = exit
+        # common-subexpression counts from compilation: hits are steps that were shared
+        self.cse_stats = cse_stats or {"hits": 0, "misses": len(steps)}
+        self.columns = sorted(_fields(steps))
+        self._program = [(_OPS[s.op], s.args, s.params) for s in steps]
+        # AND / OR steps whose right operand may be skipped (see _settled)
+        self._lazy = {i for i, s in enumerate(steps)
+                      if s.op in ("and", "or") and steps[s.args[1]].op in _PREDICATE_OPS}
+
+    def evaluate(self, columns: Mapping[str, Any], memo=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run the plan against a column mapping; returns (entry, exit) bool arrays.
+        With a `memo` (anything with lookup(key, compute), e.g. codegen.EvalMemo),
+        indicator steps are fetched through it by structural key; a memo with a
+        `bind` method (EvalMemo) is bound to `columns` first.
+        """
+        n = _length(columns)
+        if memo is not None and hasattr(memo, "bind"):
+            memo.bind(columns)
+        if self._lazy:
+            slots = {}
+            entry = self._value(self.entry_slot, slots, columns, memo) if self.entry_slot is not None else None
+            exit_ = self._value(self.exit_slot, slots, columns, memo) if self.exit_slot is not None else None
+        else:
+            slots = []
+            for step, (fn, args, params) in zip(self.steps, self._program):
+                inputs = [slots[i] for i in args]
+                if memo is not None and step.op in _MEMO_OPS:
+                    slots.append(memo.lookup(step.key, lambda: fn(columns, *params, *inputs)))
+                else:
+                    slots.append(fn(columns, *params, *inputs))
+            entry = slots[self.entry_slot] if self.entry_slot is not None else None
+            exit_ = slots[self.exit_slot] if self.exit_slot is not None else None
+        entry = _to_signal(entry, n) if entry is not None else np.zeros(n, dtype=bool)
+        exit_ = _to_signal(exit_, n) if exit_ is not None else np.zeros(n, dtype=bool)
+        return entry, exit_
+
+    def _value(self, slot: int, slots: Dict[int, Any], columns, memo):
+        """Result of step `slot`, running only the steps it needs."""
+        if slot in slots:
+            return slots[slot]
+        step = self.steps[slot]
+        fn, args, params = self._program[slot]
+        if slot in self._lazy:
+            left = self._value(args[0], slots, columns, memo)
+            if _settled(step.op, left):
+                slots[slot] = left
+                return left
+        inputs = [self._value(i, slots, columns, memo) for i in args]
+        if memo is not None and step.op in _MEMO_OPS:
+            value = memo.lookup(step.key, lambda: fn(columns, *params, *inputs))
+        else:
+            value = fn(columns, *params, *inputs)
+        slots[slot] = value
+        return value
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        entry, exit_ = self.evaluate(df)
+        return pd.DataFrame({"entry": entry, "exit": exit_}, index=df.index)
+
+    def __repr__(self):
+        return f"CompiledScript(steps={len(self.steps)}, columns={self.columns})"
+
+
+def _fields(steps) -> set:
+    """Columns read by a plan, including the sub-plans of timeframe steps."""
+    names = set()
+    for s in steps:
+        if s.op == "field":
+            names.add(s.params[0])
+        elif s.op == "timeframe":
+            names |= _fields(s.params[1])
+    return names
+
+
+class _Compiler:
+    """
+    Emits steps with hash-consing: a step whose op, inputs and params match an
+    earlier one reuses that slot, so repeated subtrees (the same indicator in
+    ENTRY and EXIT, a comparison repeated inside AND/OR chains) run once.
+    """
+
+    def __init__(self):
+        self.steps: List[Step] = []
+        self.slots: Dict[Step, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def emit(self, op, args=(), params=(), key=()) -> int:
+        step = Step(op, tuple(args), tuple(params), key)
+        slot = self.slots.get(step)
+        if slot is not None:
+            self.hits += 1
+            return slot
+        self.misses += 1
+        self.steps.append(step)
+        slot = self.slots[step] = len(self.steps) - 1
+        return slot
+
+    def compile(self, node) -> int:
+        if isinstance(node, FieldNode):
+            return self.emit("field", params=(node.name.lower(),), key=node.key())
+        if isinstance(node, NumberNode):
+            return self.emit("const", params=(node.value,), key=node.key())
+        if isinstance(node, FunctionNode):
+            name = node.name.lower()
+            if name in INDICATOR_OPS:
+                period = int(node.args[1].value) if isinstance(node.args[1], NumberNode) else int(node.args[1])
+                source = self.compile(node.args[0])
+                return self.emit(name, (source,), (period,), node.key())
+            return self.emit("column_or_false", params=(name,), key=node.key())
+        if isinstance(node, CompareNode):
+            if node.op not in _COMPARE:
+                raise ValueError(f"Unknown compare op {node.op}")
+            left = self.compile(node.left)
+            right = self.compile(node.right)
+            return self.emit("compare", (left, right), (node.op,), node.key())
+        if isinstance(node, BoolNode):
+            left = self.compile(node.left)
+            right = self.compile(node.right)
+            return self.emit("and" if node.op == "AND" else "or", (left, right), key=node.key())
+        if isinstance(node, CrossNode):
+            left = self.compile(node.left)
+            right = self.compile(node.right)
+            op = "cross_above" if node.dir.lower() == "crosses_above" else "cross_below"
+            return self.emit(op, (left, right), key=node.key())
+        if isinstance(node, TimeframeNode):
+            # a separate plan: its slots live on the resampled bars, not the base rows
+            sub = _Compiler()
+            root = sub.compile(node.expr)
+            return self.emit("timeframe", params=(node.timeframe, tuple(sub.steps), root), key=node.key())
+        raise ValueError(f"Unknown AST node: {node}")
+
+
+def compile_script(ast: ScriptAST) -> CompiledScript:
+    """Lower `ast` to a CompiledScript that can be applied to many DataFrames."""
+    c = _Compiler()
+    entry = c.compile(ast.entry) if ast.entry else None
+    exit_ = c.compile(ast.exit) if ast.exit else None
+    return CompiledScript(c.steps, entry, exit_, {"hits": c.hits, "misses": c.misses})
@@ -0,0 +1,224 @@
+# src/indicator_cache.py
+"""
+Persistent on-disk cache of indicator series (sma / ema / rsi).
+
+    cache = IndicatorCache("~/.cache/dsl-indicators", max_bytes=2 << 30)
+    signals = generate_signals(ast, df, memo=DiskMemo(df, cache))
+
+DiskMemo is an EvalMemo (see codegen) that looks every indicator node up on
+disk before computing it.  An entry is keyed by the indicator's structural
+key (name, parameters, input expression) and a hash of its input series, or
+an explicit data version (DiskMemo(df, cache, version="AAPL@2024-06-28"))
+that replaces the hash.  With a version, a hit skips the indicator's input
+altogether (ema(sma(close,5),10) does not evaluate the inner sma).
+
+When a symbol's history has only grown, the entry from the previous run is
+extended instead of recomputed.  The symbol comes from df.attrs["symbol"] or
+the `symbol` argument.  Each (symbol, indicator) pair keeps a pointer to its
+latest entry.  If that entry's input is a prefix of today's input (the
+prefix is re-hashed to check), ema and rsi compute only the new bars,
+resuming from the filter state saved with the entry (the chunked evaluator's
+states).  sma is recomputed over the whole input: one compiled pandas pass
+is cheaper than replaying its running-sum state bar by bar (see chunked).
+Results are identical to a fresh computation.
+
+Entries are single pickle files written to a temporary name and renamed into
+place, so concurrent processes never read a partial entry.  Two writers of
+the same entry both write a valid file, and the last rename wins.  Size is
+bounded by LRU eviction: hits refresh a file's mtime, and a put that takes
+the directory over max_bytes removes the oldest files.  The cache is meant
+for trusted local directories, because entries are pickles.
+
+Timeframe-scoped nodes (expr@1d) are memoized in memory only.
+"""
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.ast_nodes import node_from_key
+from src.codegen import EvalMemo, eval_node, sma
+from src.chunked import _EMAState, _RSIState
+
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 1 << 30
+INDICATORS = {"sma", "ema", "rsi"}
+_STATES = {"ema": _EMAState, "rsi": _RSIState}
+
+
+def _digest(*parts) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    h.update(repr((CACHE_FORMAT,) + tuple(p for p in parts if not isinstance(p, np.ndarray))).encode())
+    for p in parts:
+        if isinstance(p, np.ndarray):
+            h.update(np.ascontiguousarray(p).view(np.uint8))
+    return h.hexdigest()
+
+
+def _indicator(key):
+    """(name, input key, period) of an indicator node key, None for anything else."""
+    if key[0] != "function" or key[1] not in INDICATORS or len(key[2]) != 2:
+        return None
+    source, period = key[2]
+    if not (isinstance(source, tuple) and isinstance(period, tuple) and period[0] == "number"):
+        return None
+    return key[1], source, int(period[1])
+
+
+def _compute(name: str, x: np.ndarray, period: int):
+    """(values, resumable state) of an indicator over the whole input."""
+    if name == "sma":
+        return sma(pd.Series(x), period).to_numpy(), None
+    state = _STATES[name](period)
+    return state.run(x), state
+
+
+def _extend(x: np.ndarray, entry: Dict[str, Any]) -> np.ndarray:
+    tail = entry["state"].run(x[entry["n"]:])
+    return np.concatenate((entry["values"], tail))
+
+
+class IndicatorCache:
+    """Directory of cached indicator entries, bounded to about `max_bytes`."""
+
+    def __init__(self, root: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root).expanduser()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "extended": 0, "misses": 0, "evicted": 0}
+        self._unchecked = None        # bytes written since the directory was last sized
+
+    # ---- files ----
+    def _path(self, name: str) -> Path:
+        return self.root / f"{name}.pkl"
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        path = self._path(name)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            os.utime(path)                    # recency for LRU eviction
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # unreadable (e.g. written by an older version): drop it
+            path.unlink(missing_ok=True)
+            return None
+        return entry if entry.get("format") == CACHE_FORMAT else None
+
+    def put(self, name: str, entry: Dict[str, Any]):
+        path = self._path(name)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump({**entry, "format": CACHE_FORMAT}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        # the directory is sized on the first put, then again after every sixteenth of the budget
+        if self._unchecked is not None:
+            self._unchecked += path.stat().st_size
+        if self._unchecked is None or self._unchecked > self.max_bytes // 16:
+            self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the directory fits in max_bytes."""
+        files = []
+        for e in os.scandir(self.root):
+            try:
+                if e.name.endswith(".pkl"):
+                    st = e.stat()
+                    files.append((st.st_mtime, st.st_size, e.path))
+            except FileNotFoundError:
+                continue                      # removed by another process meanwhile
+        total = sum(size for _, size, _ in files)
+        self._unchecked = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                self.stats["evicted"] += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def info(self) -> Dict[str, Any]:
+        sizes = [p.stat().st_size for p in self.root.glob("*.pkl")]
+        return {**self.stats, "entries": len(sizes), "bytes": sum(sizes)}
+
+    def clear(self):
+        for p in self.root.glob("*.pkl"):
+            p.unlink(missing_ok=True)
+
+    # ---- indicators ----
+    def versioned(self, key: tuple, version: str) -> Optional[np.ndarray]:
+        """Cached values of indicator node `key` for data `version`, None if absent."""
+        entry = self.get(_digest(key, version))
+        if entry is None:
+            return None
+        self.stats["hits"] += 1
+        return entry["values"]
+
+    def indicator(self, key: tuple, x: np.ndarray, symbol: Optional[str] = None,
+                  version: Optional[str] = None) -> np.ndarray:
+        """Values of indicator node `key` over input `x`: loaded, extended or computed (and stored)."""
+        name, _, period = _indicator(key)
+        content = _digest(key, version) if version is not None else _digest(key, x)
+        entry = self.get(content)
+        if entry is not None and entry["n"] == len(x):
+            self.stats["hits"] += 1
+            return entry["values"]
+
+        # only stateful indicators are extended, so only they keep a head pointer
+        head = _digest("head", symbol, key) if symbol is not None and name in _STATES else None
+        values = None
+        if head is not None and version is None:
+            pointer = self.get(head)
+            if pointer is not None and pointer["n"] < len(x) and _digest(key, x[:pointer["n"]]) == pointer["entry"]:
+                entry = self.get(pointer["entry"])
+                if entry is not None:
+                    values, state = _extend(x, entry), entry["state"]
+                    self.stats["extended"] += 1
+        if values is None:
+            values, state = _compute(name, x, period)
+            self.stats["misses"] += 1
+
+        self.put(content, {"n": len(x), "values": values, "state": state})
+        if head is not None:
+            self.put(head, {"n": len(x), "entry": content})
+        return values
+
+
+class DiskMemo(EvalMemo):
+    """EvalMemo for one frame that serves indicator nodes from an IndicatorCache."""
+
+    def __init__(self, df: pd.DataFrame, cache: IndicatorCache, symbol: Optional[str] = None,
+                 version: Optional[str] = None):
+        super().__init__()
+        self.bind(df)
+        self.df = df
+        self.cache = cache
+        self.symbol = df.attrs.get("symbol") if symbol is None else symbol
+        self.version = version
+
+    def lookup(self, key, compute):
+        spec = _indicator(key) if key not in self.values else None
+        if spec is None:
+            return super().lookup(key, compute)
+
+        def load():
+            if self.version is not None:
+                # keyed by version alone: a hit needs neither the input nor its hash
+                values = self.cache.versioned(key, self.version)
+                if values is not None and len(values) == len(self.df):
+                    return pd.Series(values, index=self.df.index)
+            source = eval_node(node_from_key(spec[1]), self.df, self)
+            if not isinstance(source, pd.Series):
+                return compute()              # indicator of a constant: nothing to cache
+            x = source.to_numpy(dtype=float)
+            values = self.cache.indicator(key, x, self.symbol, self.version)
+            return pd.Series(values, index=self.df.index)
+
+        return super().lookup(key, load)
@@ -41,10 +41,10 @@ def number_from_phrase(phrase):
             return {"type":"number","value": int(tok)}
     return None
 
-def nl_to_json(nl_text):
+def nl_to_json_reference(nl_text):
     """
-    Very small rule-based mapper that handles the example patterns and similar phrasings.
-    Returns: dict with 'entry' and 'exit' lists of condition objects (see schema).
+    Original regex-cascade implementation of nl_to_json, kept as the reference
+    the single-pass matcher is tested and benchmarked against.
     """
     text = nl_text.strip()
     low = text.lower()
@@ -237,6 +237,172 @@ def nl_to_json(nl_text):
 
     return out
 
+
+# -------------------------------
+# CLAUSE MATCHER
+# -------------------------------
+class _Pattern:
+    """One clause shape: a regex plus the keywords any match of it must contain."""
+
+    def __init__(self, kind, regex, gate, flags=re.IGNORECASE):
+        self.kind = kind
+        self.regex = re.compile(regex, flags)
+        self.gate = gate          # tuple of alternatives, at least one must occur in the lowered text
+
+    def search(self, text, low):
+        if not any(g in low for g in self.gate):
+            return None
+        return self.regex.search(text)
+
+
+def _first_match(patterns, text):
+    """(kind, match) of the first pattern, in priority order, that matches `text`."""
+    low = text.lower()
+    for pat in patterns:
+        m = pat.search(text, low)
+        if m:
+            return pat.kind, m
+    return None, None
+
+
+_SMA_CALL = r'sma\(\s*(?P<fld>\w+)\s*,\s*(?P<n>\d+)\s*\)'
+_RSI_CALL = r'rsi\(\s*(?P<fld>\w+)\s*,\s*(?P<n>\d+)\s*\)'
+_FIELDS = ('price', 'close', 'open', 'high', 'low', 'volume')
+
+# same patterns and order as the reference cascade; the gates only skip
+# regexes that cannot match, so the first hit is the same clause shape
+_CLAUSE_PATTERNS = [
+    # 1) "close price is above the 20-day moving average"
+    _Pattern("compare", r'(?P<left>close|price|open|high|low|volume)\s+(?:price\s+)?(?:is\s+)?(?P<op>above|over|>|greater than|below|under|<|<=|>=|==)\s+(?P<right>[\w\s\-\(\),%\.]+)',
+             ('above', 'over', '>', 'greater than', 'below', 'under', '<', '==')),
+    # 2) "price crosses above yesterday's high"
+    _Pattern("cross", r'(?P<left>close|price|open|high|low|volume|\w+\([^)]+\))\s+cross(?:es)?\s*(?:_| )?(?P<dir>above|below)\s+(?P<right>[\w\(\)\'s_ -]+)',
+             ('cross',)),
+    # 3) "RSI(close,14) is below 30"
+    _Pattern("rsi", _RSI_CALL + r'\s*(?:is\s+)?(?P<op><|>|<=|>=|==|below|above)\s*(?P<val>[\d\.]+)',
+             ('rsi(',)),
+    # 4) "volume increases by more than 30% compared to last week"
+    _Pattern("volume_pct", r'volume .*?increases by more than\s*(?P<pct>\d+)\s*%.*last week',
+             ('increases by more than',)),
+    # 5) direct DSL-like comparisons, "rsi(close,14) < 30" (case-sensitive)
+    _Pattern("direct", r'(?P<left>[\w\(\),]+)\s*(?P<op>>|<|>=|<=|==)\s*(?P<right>[\w\(\),.%]+)',
+             ('<', '>', '=='), flags=0),
+]
+
+_RIGHT_PATTERNS = [
+    _Pattern("sma", _SMA_CALL, ('sma(',)),
+    _Pattern("ma", r'(?P<n>\d+)[\s-]*day\s+moving\s+average', ('moving',)),
+    _Pattern("rsi", _RSI_CALL, ('rsi(',)),
+]
+
+_AND_SPLIT = re.compile(r'\s+and\s+', re.IGNORECASE)
+_EXIT_WORDS = re.compile(r'\b(exit|sell|close)\b')
+_ENTRY_WORDS = re.compile(r'\b(buy|enter|trigger entry|enter when|trigger)\b')
+_SMA_SEARCH = re.compile(_SMA_CALL, re.IGNORECASE)
+_RSI_SEARCH = re.compile(_RSI_CALL, re.IGNORECASE)
+_YESTERDAY = re.compile(r'yesterday[\'s\s]*\s*(?P<f>\w+)', re.IGNORECASE)
+_COMPARE_OPS = {"above": ">", "over": ">", "greater than": ">", ">": ">",
+                "below": "<", "under": "<", "<": "<", ">=": ">=", "<=": "<=", "==": "=="}
+
+
+def _cross_operand(tok):
+    tok = tok.strip()
+    low = tok.lower()
+    if low in _FIELDS:
+        return make_field(tok if low != 'price' else 'close')
+    if 'yesterday' in low:
+        # e.g., "yesterday's high" or "yesterday high"
+        fldm = _YESTERDAY.search(tok)
+        return make_yesterday_field(fldm.group('f')) if fldm else {"type": "yesterday_field", "name": "close"}
+    call = _SMA_SEARCH.search(tok)
+    if call:
+        return make_indicator('sma', call.group('fld'), call.group('n'))
+    call = _RSI_SEARCH.search(tok)
+    if call:
+        return make_indicator('rsi', call.group('fld'), call.group('n'))
+    return {"type": "raw", "text": tok}
+
+
+def _build_compare(m):
+    left = m.group('left').lower()
+    op = _COMPARE_OPS.get(m.group('op').lower(), ">")
+    right_phrase = m.group('right').strip()
+    kind, rm = _first_match(_RIGHT_PATTERNS, right_phrase)
+    if kind == "sma":
+        right = make_indicator('sma', rm.group('fld'), rm.group('n'))
+    elif kind == "ma":
+        right = make_indicator('sma', left, int(rm.group('n')))  # SMA of the same field
+    elif kind == "rsi":
+        right = make_indicator('rsi', rm.group('fld'), rm.group('n'))
+    else:
+        right = number_from_phrase(right_phrase) or {"type": "raw", "text": right_phrase}
+    return {"type": "compare", "left": make_field(left if left != 'price' else 'close'), "op": op, "right": right}
+
+
+def _build_cross(m):
+    return {"type": "cross", "dir": m.group('dir').lower(),
+            "left": _cross_operand(m.group('left')), "right": _cross_operand(m.group('right'))}
+
+
+def _build_rsi(m):
+    op_raw, val = m.group('op'), m.group('val')
+    op = '<' if op_raw in ('below', '<') else '>' if op_raw in ('above', '>') else op_raw
+    right = {"type": "number", "value": float(val) if '.' in val else int(val)}
+    return {"type": "compare", "left": make_indicator('rsi', m.group('fld'), m.group('n')), "op": op, "right": right}
+
+
+def _build_volume_pct(m):
+    factor = 1 + float(m.group('pct')) / 100.0
+    # "last week" maps to sma(volume,5)
+    right_expr = make_binary_expr('*', factor, make_indicator('sma', 'volume', 5))
+    return {"type": "compare", "left": make_field('volume'), "op": ">", "right": right_expr}
+
+
+def _build_direct(m):
+    left_expr, op, right_expr = m.group('left'), m.group('op'), m.group('right')
+    low = left_expr.lower()
+    if low.startswith('rsi') or low.startswith('sma'):
+        mm = (_RSI_SEARCH if low.startswith('rsi') else _SMA_SEARCH).search(left_expr)
+        left = make_indicator(low[:3], mm.group('fld'), mm.group('n')) if mm else {"type": "raw", "text": left_expr}
+    else:
+        left = make_field(left_expr)
+    right = number_from_phrase(right_expr)
+    if not right:
+        mm = _SMA_SEARCH.search(right_expr)
+        right = make_indicator('sma', mm.group('fld'), mm.group('n')) if mm else {"type": "raw", "text": right_expr}
+    return {"type": "compare", "left": left, "op": op, "right": right}
+
+
+_BUILDERS = {"compare": _build_compare, "cross": _build_cross, "rsi": _build_rsi,
+             "volume_pct": _build_volume_pct, "direct": _build_direct}
+
+
+def nl_to_json(nl_text):
+    """
+    Very small rule-based mapper that handles the example patterns and similar phrasings.
+    Returns: dict with 'entry' and 'exit' lists of condition objects (see schema).
+
+    Each clause is matched against _CLAUSE_PATTERNS (compiled once, regexes whose
+    keywords are absent are skipped) and handed to the builder for its shape;
+    output is the same as nl_to_json_reference.
+    """
+    text = nl_text.strip()
+    low = text.lower()
+    out = {"entry": [], "exit": []}
+
+    is_exit = bool(_EXIT_WORDS.search(low))
+    is_entry = bool(_ENTRY_WORDS.search(low)) or (not is_exit)
+
+    conditions = []
+    for clause in _AND_SPLIT.split(text):
+        c = clause.strip()
+        kind, m = _first_match(_CLAUSE_PATTERNS, c)
+        conditions.append(_BUILDERS[kind](m) if kind else {"type": "raw_clause", "text": c})
+
+    # both or neither keyword: entry wins, as in the reference
+    out['entry' if is_entry else 'exit'].extend(conditions)
+    return out
+
 # pretty-print helper
 def pretty(nl):
     j = nl_to_json(nl)
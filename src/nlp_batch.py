@@ -0,0 +1,112 @@
+# src/nlp_batch.py
+"""
+Bulk natural-language -> DSL conversion.
+
+    dsls = nlp_to_dsl_batch(rules)          # same output as [nlp_to_dsl(r) for r in rules]
+
+nlp_to_dsl rewrites the text with ~20 sequential str.replace / re.sub passes.
+Here the passes that commute are fused into single precompiled alternations
+(indicator phrases, comparison words, volume units), so a rule takes four
+scans instead of twenty, and results are memoized so repeated rules (common in
+analyst rule books) are converted once.  The few inputs where sequential
+rewriting feeds one pass's output into another (see _SEQUENTIAL_ONLY) are
+handed to nlp_to_dsl itself, so the output is identical for every input.
+"""
+import re
+from functools import lru_cache
+from typing import Iterable, List
+
+from src.nlp_to_dsl import nlp_to_dsl, _num_from_text
+
+NL_CACHE_SIZE = 16384
+
+# inputs where one sequential pass rewrites another's output: a moving-average phrase
+# right after "<n> day " (-> "<n> day sma(...)"), and a k/m amount followed by
+# "million" or by ".<digits>" (the expanded "<n>.0" joins the next number)
+_SEQUENTIAL_ONLY = re.compile(r"day \d+[ -]?day moving average|\d[km](?:\s*million|\.\d)")
+
+_DAY_PHRASE = r"\d+[ -]?day (?:moving average|sma)"
+_INDICATORS = re.compile(
+    r"(\d+)[ -]?day (?:moving average|sma)"
+    # the sma/rsi shorthands never claim digits that start an "<n> day ..." phrase,
+    # which the sequential passes rewrite first
+    rf"|sma\s*\(?\s*(?!{_DAY_PHRASE})(\d+)\s*\)?"
+    rf"|rsi\(?\s*(?!{_DAY_PHRASE})(\d{{1,2}})\)?"
+)
+_COMPARISONS = re.compile(r"is above|closes above|above|is below|falls below|drops below|goes below|below")
+_COMPARISON_OPS = {"is above": ">", "closes above": ">", "above": ">",
+                   "is below": "<", "falls below": "<", "drops below": "<", "goes below": "<", "below": "<"}
+_UNITS = re.compile(r"(\d+(?:\.\d+)?)(?:([km])\b|\s*million\b)")
+_SPLIT = re.compile(r"[.\n]")
+_ENTRY_PREFIX = re.compile(r"^(buy|enter|open|long)\s*(when)?\s*")
+_EXIT_PREFIX = re.compile(r"^(exit|sell|close|stop|short)\s*(when)?\s*")
+_FILLER = re.compile(r"\b(the|a|an|when|then|is|and also)\b")
+_SPACES = re.compile(r"\s+")
+
+
+def _indicator(m) -> str:
+    if m.group(1) is not None:
+        return f"sma(close,{m.group(1)})"
+    if m.group(2) is not None:
+        return f"sma(close,{m.group(2)})"
+    return f"rsi(close,{m.group(3)})"
+
+
+def _unit(m) -> str:
+    if m.group(2) is not None:
+        return _num_from_text(m.group(1) + m.group(2))
+    return str(float(m.group(1)) * 1_000_000)
+
+
+def _clean(x: str) -> str:
+    return _SPACES.sub(" ", _FILLER.sub(" ", x)).strip()
+
+
+@lru_cache(maxsize=NL_CACHE_SIZE)
+def nlp_to_dsl_fast(nl: str) -> str:
+    """nlp_to_dsl with fused rewrite passes; memoized."""
+    if not nl:
+        raise ValueError("Empty input")
+    text = nl.lower().strip().replace("price", "close")
+    if _SEQUENTIAL_ONLY.search(text):
+        return nlp_to_dsl(nl)
+    text = _INDICATORS.sub(_indicator, text)
+    text = _COMPARISONS.sub(lambda m: _COMPARISON_OPS[m.group(0)], text)
+    text = _UNITS.sub(_unit, text)
+
+    entry = ""
+    exit_ = ""
+    for p in _SPLIT.split(text):
+        p = p.strip()
+        if not p:
+            continue
+        if p.startswith(("buy", "enter", "open", "long")):
+            entry = _ENTRY_PREFIX.sub("", p)
+        elif p.startswith(("exit", "sell", "close", "stop", "short")):
+            exit_ = _EXIT_PREFIX.sub("", p)
+        elif not entry:
+            entry = p
+        elif not exit_:
+            exit_ = p
+
+    entry = _clean(entry).replace(" and ", " AND ")
+    exit_ = _clean(exit_).replace(" and ", " AND ")
+
+    # same layout as nlp_to_dsl, including the no-op ENTRY
+    lines = ["ENTRY:", entry or "0"]
+    if exit_:
+        lines += ["", "EXIT:", exit_]
+    return "\n".join(lines).strip()
+
+
+def nlp_to_dsl_batch(texts: Iterable[str]) -> List[str]:
+    """Convert many rules; repeated inputs are served from the memo."""
+    return [nlp_to_dsl_fast(t) for t in texts]
+
+
+def nl_cache_info():
+    return nlp_to_dsl_fast.cache_info()
+
+
+def clear_nl_cache():
+    nlp_to_dsl_fast.cache_clear()
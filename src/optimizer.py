@@ -0,0 +1,141 @@
+# src/optimizer.py
+"""
+AST optimizer, run between parsing and evaluation.
+
+    ast = parse_dsl(text, optimize=True)        # or optimize_script(parse_dsl(text))
+
+Rewrites, applied bottom-up:
+- constant folding: a comparison of two numbers, `x > x` / `x < x` and a
+  cross of a series with itself (or of two numbers) are decided up front;
+- dead-branch pruning: `False AND p` -> False, `True AND p` -> p,
+  `True OR p` -> True, `False OR p` -> p, `p AND p` -> p;
+- cost-based ordering: the operands of an AND / OR chain are sorted by
+  estimated cost, cheapest first.  generate_signals and compiled plans stop
+  evaluating a chain once its outcome is settled on every bar (an AND
+  already False everywhere, an OR already True everywhere), so a cheap,
+  selective filter spares the indicator work behind it.
+
+Signals are identical to those of the original script.  No rewrite changes
+the type of a value.  A decided root becomes NumberNode(1.0) or
+NumberNode(0.0), which generate_signals broadcasts exactly like the bool it
+replaces.  Pruning and reordering only touch operands that are predicates
+(comparisons, crosses, AND/OR).
+"""
+import operator
+from functools import reduce
+from typing import List, Optional, Tuple
+
+from src.ast_nodes import ScriptAST, FieldNode, NumberNode, FunctionNode, CompareNode, BoolNode, CrossNode, TimeframeNode
+
+# rough per-bar cost of one evaluation of a node, children excluded
+FUNCTION_COSTS = {"sma": 4.0, "ema": 4.0, "rsi": 8.0}
+CROSS_COST = 4.0          # two shifts, back-fill and two comparisons
+TIMEFRAME_COST = 8.0      # resample lookup and alignment
+
+PREDICATES = (CompareNode, CrossNode, BoolNode)
+
+_COMPARE = {">": operator.gt, "<": operator.lt, ">=": operator.ge,
+            "<=": operator.le, "==": operator.eq, "!=": operator.ne}
+
+
+def estimate_cost(node) -> float:
+    """Estimated evaluation cost of a subtree (arbitrary units per bar)."""
+    if isinstance(node, NumberNode) or not isinstance(node, (FieldNode, FunctionNode, TimeframeNode) + PREDICATES):
+        return 0.0
+    if isinstance(node, FieldNode):
+        return 1.0
+    if isinstance(node, FunctionNode):
+        return FUNCTION_COSTS.get(node.name.lower(), 1.0) + sum(estimate_cost(a) for a in node.args)
+    if isinstance(node, TimeframeNode):
+        return TIMEFRAME_COST + estimate_cost(node.expr)
+    own = CROSS_COST if isinstance(node, CrossNode) else 1.0
+    return own + estimate_cost(node.left) + estimate_cost(node.right)
+
+
+# -------------------------------
+# FOLDING AND PRUNING
+# -------------------------------
+def _fold_value(node):
+    # a constant evaluated on another timeframe is still the constant
+    if isinstance(node, TimeframeNode) and isinstance(node.expr, NumberNode):
+        return node.expr
+    return node
+
+
+def _fold(node) -> Tuple[object, Optional[bool]]:
+    """(rewritten node, its truth value when known up front, else None)."""
+    if isinstance(node, CompareNode):
+        left, right = _fold_value(node.left), _fold_value(node.right)
+        if left is not node.left or right is not node.right:
+            node = CompareNode(left, node.op, right)
+        if isinstance(left, NumberNode) and isinstance(right, NumberNode) and node.op in _COMPARE:
+            return node, bool(_COMPARE[node.op](left.value, right.value))
+        if node.op in (">", "<") and left.key() == right.key():
+            return node, False
+        return node, None
+
+    if isinstance(node, CrossNode):
+        left, right = _fold_value(node.left), _fold_value(node.right)
+        if left is not node.left or right is not node.right:
+            node = CrossNode(node.dir, left, right)
+        if left.key() == right.key() or (isinstance(left, NumberNode) and isinstance(right, NumberNode)):
+            return node, False
+        return node, None
+
+    if isinstance(node, BoolNode):
+        left, lv = _fold(node.left)
+        right, rv = _fold(node.right)
+        absorbing = node.op != "AND"          # False absorbs an AND, True an OR
+        if lv is not None and rv is not None:
+            value = (lv and rv) if node.op == "AND" else (lv or rv)
+            return BoolNode(node.op, left, right), value
+        for value, kept, other in ((lv, left, right), (rv, right, left)):
+            if value is None or not isinstance(other, PREDICATES):
+                continue
+            if value == absorbing:
+                return kept, value
+            return other, None
+        if isinstance(left, PREDICATES) and left.key() == right.key():
+            return left, None
+        if left is not node.left or right is not node.right:
+            node = BoolNode(node.op, left, right)
+        return node, None
+
+    return node, None
+
+
+# -------------------------------
+# ORDERING
+# -------------------------------
+def _chain(node, op: str) -> List:
+    if isinstance(node, BoolNode) and node.op == op:
+        return _chain(node.left, op) + _chain(node.right, op)
+    return [node]
+
+
+def _order(node):
+    if not isinstance(node, BoolNode):
+        return node
+    operands = [_order(n) for n in _chain(node, node.op)]
+    if not all(isinstance(n, PREDICATES) for n in operands):
+        # `&` / `|` on non-boolean operands is not commutative in pandas; leave the shape as written
+        return BoolNode(node.op, _order(node.left), _order(node.right))
+    unique = {}
+    for n in operands:
+        unique.setdefault(n.key(), n)         # p AND p -> p
+    return reduce(lambda a, b: BoolNode(node.op, a, b), sorted(unique.values(), key=estimate_cost))
+
+
+def optimize_node(node):
+    """Optimized copy of an ENTRY / EXIT expression (None stays None)."""
+    if node is None:
+        return None
+    node, value = _fold(node)
+    if value is not None:
+        return NumberNode(1.0 if value else 0.0)
+    return _order(node)
+
+
+def optimize_script(ast: ScriptAST) -> ScriptAST:
+    """Optimized copy of `ast`; the input (possibly a shared, cached AST) is not modified."""
+    return ScriptAST(entry=optimize_node(ast.entry), exit=optimize_node(ast.exit))
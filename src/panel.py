@@ -0,0 +1,212 @@
+# src/panel.py
+"""
+Cross-sectional (panel) evaluation: one strategy over many symbols at once.
+
+    panel = Panel.from_frames({"AAPL": df1, "MSFT": df2, ...})
+    signals = panel_signals("ENTRY: ... EXIT: ...", panel)   # (bars, symbols) entry / exit
+    signals.frame("AAPL")                                    # == generate_signals(ast, df1)
+    table = run_panel(scripts, panel)                        # one row per (symbol, strategy)
+
+Every field of a Panel is a 2-D array (bars x symbols, one contiguous column
+per symbol), so a compiled plan (see compiler) runs once for the whole
+universe instead of once per symbol.  Comparisons, AND/OR and crossovers are
+the compiler's own kernels, which broadcast over the extra axis.  sma, ema
+and rsi are computed column-wise: each column goes through the same pandas
+kernel as in generate_signals, and RSI's Wilder seed starts at each symbol's
+own first observation.  run_backtest_panel then backtests every column in
+one pass.
+
+Signals and metrics are identical to the per-symbol generate_signals /
+run_backtest_arrays results.  All symbols must share one index.  Timeframe-
+qualified nodes (expr@1d) are evaluated per symbol on its resampled bars and
+stacked.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.parser import parse_dsl
+from src.compiler import CompiledScript, compile_script, _OPS, _MEMO_OPS
+from src.codegen import EvalMemo, sma, ema, _rsi_values
+from src.backtest import run_backtest_panel
+from src.batch import as_source
+
+
+@dataclass
+class Panel:
+    """Aligned bars of many symbols: every field is a (bars, symbols) array."""
+    index: pd.Index
+    symbols: List[str]
+    fields: Dict[str, np.ndarray]
+    _frames: Dict[str, pd.DataFrame] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_frames(cls, data, symbols: Optional[Sequence[str]] = None) -> "Panel":
+        """Stack the frames of a data source (see batch.as_source); they must share one index."""
+        source = as_source(data)
+        names = list(symbols) if symbols is not None else source.symbols()
+        if not names:
+            raise ValueError("A panel needs at least one symbol")
+        frames = [source.load(s) for s in names]
+        index = frames[0].index
+        misaligned = [s for s, df in zip(names, frames) if not df.index.equals(index)]
+        if misaligned:
+            raise ValueError(f"Index of {misaligned[:5]} differs from {names[0]}'s; a panel needs one shared index")
+        fields = {}
+        for name in frames[0].columns:
+            if all(name in df.columns for df in frames):
+                columns = [df[name].to_numpy() for df in frames]
+                values = np.empty((len(index), len(names)), dtype=np.result_type(*columns), order="F")
+                for j, column in enumerate(columns):
+                    values[:, j] = column
+                fields[name] = values
+        return cls(index, names, fields)
+
+    @property
+    def shape(self):
+        return len(self.index), len(self.symbols)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.fields[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.fields
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """One symbol's bars as a DataFrame (views of the panel's columns)."""
+        df = self._frames.get(symbol)
+        if df is None:
+            j = self.symbols.index(symbol)
+            df = pd.DataFrame({name: values[:, j] for name, values in self.fields.items()}, index=self.index)
+            df.attrs["symbol"] = symbol       # keys the resampled-bar cache (see timeframes)
+            self._frames[symbol] = df
+        return df
+
+
+# -------------------------------
+# COLUMN-WISE KERNELS
+# -------------------------------
+def wilder_mean_2d(x: np.ndarray, period: int) -> np.ndarray:
+    """codegen.wilder_mean of every column, each seeded from its own first observation."""
+    n, m = x.shape
+    out = np.full((n, m), np.nan, order="F")
+    observed = x == x
+    first = np.where(observed.any(axis=0), observed.argmax(axis=0), n)
+    cols = np.flatnonzero(first + period <= n)
+    if not len(cols):
+        return out
+    stop = first[cols] + period
+    window = x[first[cols] + np.arange(period)[:, None], cols]
+    seed = np.nancumsum(window, axis=0)[-1] / np.count_nonzero(window == window, axis=0)
+    # the seed at bar stop-1 and the raw input after it; ewm ignores the leading NaNs
+    seeded = np.where(np.arange(n)[:, None] >= stop, x[:, cols], np.nan)
+    seeded[stop - 1, np.arange(len(cols))] = seed
+    out[:, cols] = pd.DataFrame(seeded, copy=False).ewm(com=period - 1, adjust=False).mean().to_numpy()
+    return out
+
+
+def _op_sma(panel, period, x):
+    if np.ndim(x) < 2:
+        return _OPS["sma"](panel, period, x)
+    return sma(pd.DataFrame(x, copy=False), period).to_numpy()
+
+
+def _op_ema(panel, period, x):
+    if np.ndim(x) < 2:
+        return _OPS["ema"](panel, period, x)
+    return ema(pd.DataFrame(x, copy=False), period).to_numpy()
+
+
+def _op_rsi(panel, period, x):
+    if np.ndim(x) < 2:
+        return _OPS["rsi"](panel, period, x)
+    delta = np.diff(np.asarray(x, dtype=float), axis=0, prepend=np.nan)
+    avg_up = wilder_mean_2d(np.clip(delta, 0, None), period)
+    avg_down = wilder_mean_2d(-np.clip(delta, None, 0), period)
+    return _rsi_values(avg_up, avg_down)
+
+
+def _op_timeframe(panel, timeframe, steps, root):
+    # resampling is per symbol: run the compiler's kernel on each symbol's frame and stack
+    values = [_OPS["timeframe"](panel.frame(s), timeframe, steps, root) for s in panel.symbols]
+    if all(np.ndim(v) == 0 for v in values):
+        return values[0]
+    return np.column_stack([np.broadcast_to(v, len(panel.index)) for v in values])
+
+
+_PANEL_OPS = {**_OPS, "sma": _op_sma, "ema": _op_ema, "rsi": _op_rsi, "timeframe": _op_timeframe}
+
+
+def _to_panel_signal(value, shape) -> np.ndarray:
+    """compiler._to_signal for a (bars, symbols) result."""
+    value = np.broadcast_to(value, shape)
+    if value.dtype == bool:
+        return value
+    if value.dtype.kind == "f":
+        return ~np.isnan(value) & (value != 0)
+    return value != 0
+
+
+# -------------------------------
+# EVALUATION
+# -------------------------------
+@dataclass
+class PanelSignals:
+    """Entry/exit flags of every symbol: (bars, symbols) bool arrays."""
+    entry: np.ndarray
+    exit: np.ndarray
+    index: Any
+    symbols: List[str]
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """One symbol's signals, as generate_signals returns them."""
+        j = self.symbols.index(symbol)
+        return pd.DataFrame({"entry": self.entry[:, j], "exit": self.exit[:, j]}, index=self.index)
+
+
+def _plan(script) -> CompiledScript:
+    if isinstance(script, CompiledScript):
+        return script
+    return compile_script(parse_dsl(script, optimize=True) if isinstance(script, str) else script)
+
+
+def panel_signals(script, panel: Panel, memo: Optional[EvalMemo] = None) -> PanelSignals:
+    """
+    Signals of one script (DSL text, ScriptAST or CompiledScript) for every
+    symbol of `panel`.  A memo shared between calls serves the indicators the
+    scripts have in common.
+    """
+    plan = _plan(script)
+    if memo is not None and hasattr(memo, "bind"):
+        memo.bind(panel)
+    slots = []
+    for step in plan.steps:
+        fn, inputs = _PANEL_OPS[step.op], [slots[i] for i in step.args]
+        if memo is not None and step.op in _MEMO_OPS:
+            slots.append(memo.lookup(step.key, lambda: fn(panel, *step.params, *inputs)))
+        else:
+            slots.append(fn(panel, *step.params, *inputs))
+    shape = panel.shape
+    entry = _to_panel_signal(slots[plan.entry_slot], shape) if plan.entry_slot is not None else np.zeros(shape, dtype=bool)
+    exit_ = _to_panel_signal(slots[plan.exit_slot], shape) if plan.exit_slot is not None else np.zeros(shape, dtype=bool)
+    return PanelSignals(entry, exit_, panel.index, panel.symbols)
+
+
+def run_panel(scripts, data, symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Backtest every script against every symbol of a Panel (or a data source,
+    see batch.as_source) in one column-wise pass per script.  Returns one row
+    per (symbol, strategy) with the same metrics as run_universe.
+    """
+    panel = data if isinstance(data, Panel) else Panel.from_frames(data, symbols)
+    candidates = [scripts] if isinstance(scripts, str) or not isinstance(scripts, Sequence) else list(scripts)
+    memo = EvalMemo()
+    close = panel["close"]
+    tables = []
+    for sid, script in enumerate(candidates):
+        signals = panel_signals(script, panel, memo)
+        res = run_backtest_panel(close, signals.entry, signals.exit)
+        tables.append(pd.DataFrame({"symbol": panel.symbols, "strategy": sid, **res}))
+    return pd.concat(tables, ignore_index=True)
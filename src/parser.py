@@ -1,5 +1,7 @@
 # src/parser.py
-from lark import Lark, Transformer, v_args
+import functools
+import hashlib
+import re
 from src.ast_nodes import (
     ScriptAST,
     FieldNode,
@@ -7,8 +9,10 @@ from src.ast_nodes import (
     FunctionNode,
     CompareNode,
     BoolNode,
-    CrossNode
+    CrossNode,
+    TimeframeNode
 )
+from src.optimizer import optimize_script
 
 GRAMMAR = r"""
 start: entry_block exit_block?
@@ -25,9 +29,12 @@ exit_block: "EXIT:" expr
 comparison: value COMP value
 cross: value CROSS_OP value
 
-?value: FIELD                -> field
-      | NUMBER               -> number
-      | function_call
+?value: atom
+      | atom "@" TIMEFRAME   -> timeframe
+
+?atom: FIELD                 -> field
+     | NUMBER                -> number
+     | function_call
 
 function_call: NAME "(" [value ("," value)*] ")"
 
@@ -36,6 +43,7 @@ NAME: /(sma|ema|rsi)/i
 
 NUMBER: /[0-9]+(\.[0-9]+)?/
 
+TIMEFRAME: /[0-9]+(min|m|h|d|w)/i
 CROSS_OP: /(CROSSES_ABOVE|CROSSES_BELOW)/i
 COMP: ">" | "<" | ">=" | "<=" | "==" | "!="
 
@@ -43,13 +51,56 @@ COMP: ">" | "<" | ">=" | "<=" | "==" | "!="
 %ignore WS
 """
 
-parser = Lark(GRAMMAR, start="start", parser="lalr")
+# -------------------------------
+# LAZY PARSER CONSTRUCTION
+# -------------------------------
+# Importing this module must stay cheap: neither lark nor the LALR tables are
+# touched until the first parse.  The tables ship pre-generated as a
+# standalone module (src/_dsl_parser.py, no lark dependency at runtime); if it
+# was generated from a different GRAMMAR we fall back to building with lark.
+STANDALONE_MODULE = "src._dsl_parser"
+
+def grammar_hash() -> str:
+    return hashlib.sha256(GRAMMAR.encode("utf-8")).hexdigest()
+
+@functools.lru_cache(maxsize=None)
+def get_parser():
+    """LALR parser that transforms straight into a ScriptAST (built once per process)."""
+    try:
+        from src import _dsl_parser
+        if _dsl_parser.GRAMMAR_SHA256 == grammar_hash():
+            return _dsl_parser.Lark_StandAlone(transformer=ASTBuilder())
+    except ImportError:
+        pass
+    from lark import Lark
+    return Lark(GRAMMAR, start="start", parser="lalr", transformer=ASTBuilder())
+
+def build_standalone(path=None):
+    """Regenerate src/_dsl_parser.py after editing GRAMMAR (needs lark installed)."""
+    import io
+    from pathlib import Path
+    from lark import Lark
+    from lark.tools.standalone import gen_standalone
+    out = io.StringIO()
+    gen_standalone(Lark(GRAMMAR, start="start", parser="lalr"), out=out)
+    path = Path(path) if path else Path(__file__).with_name("_dsl_parser.py")
+    path.write_text(f'GRAMMAR_SHA256 = "{grammar_hash()}"\n' + out.getvalue(), encoding="utf-8")
+    return path
+
+def __getattr__(name):
+    # `parser` (plain lark parse-tree parser, used by demo_parse) is built on first access
+    if name == "parser":
+        from lark import Lark
+        value = globals()["parser"] = Lark(GRAMMAR, start="start", parser="lalr")
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # -------------------------------
 # TRANSFORMER
 # -------------------------------
-class ASTBuilder(Transformer):
+class ASTBuilder:
+    """Rule callbacks applied inline by the LALR parser (lark's transformer protocol)."""
 
     def start(self, items):
         entry = items[0]
@@ -70,11 +121,11 @@ class ASTBuilder(Transformer):
 
     def comparison(self, items):
         left, op, right = items
-        return CompareNode(left=left, op=op, right=right)
+        return CompareNode(left=left, op=str(op), right=right)
 
     def cross(self, items):
         left, op, right = items
-        return CrossNode(left=left, op=op, right=right)
+        return CrossNode(dir=str(op), left=left, right=right)
 
     def field(self, items):
         return FieldNode(name=str(items[0]).lower())
@@ -82,6 +133,10 @@ class ASTBuilder(Transformer):
     def number(self, items):
         return NumberNode(value=float(items[0]))
 
+    def timeframe(self, items):
+        expr, tf = items
+        return TimeframeNode(timeframe=normalize_timeframe(tf), expr=expr)
+
     def function_call(self, items):
         name = str(items[0]).lower()
         args = items[1:]
@@ -102,12 +157,50 @@ class ASTBuilder(Transformer):
     def NUMBER(self, token):
         return str(token)
 
+    def TIMEFRAME(self, token):
+        return str(token)
+
+
+# -------------------------------
+# PARSE CACHE
+# -------------------------------
+PARSE_CACHE_SIZE = 4096
+
+def normalize_dsl(text: str) -> str:
+    """Collapse whitespace; the grammar ignores it, so this never changes the parse."""
+    return " ".join(text.split())
+
+_TIMEFRAME = re.compile(r"^(\d+)\s*(min|m|h|d|w)$", re.IGNORECASE)
+
+def normalize_timeframe(text: str) -> str:
+    """Canonical spelling of a timeframe ("5MIN" -> "5m", "1D" -> "1d")."""
+    m = _TIMEFRAME.match(str(text).strip())
+    if not m or int(m.group(1)) == 0:
+        raise ValueError(f"Unknown timeframe {text!r} (expected e.g. 5m, 1h, 1d, 1w)")
+    unit = m.group(2).lower()
+    return f"{int(m.group(1))}{'m' if unit == 'min' else unit}"
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_normalized(text: str):
+    return get_parser().parse(text)
+
+def parse_cache_info():
+    return _parse_normalized.cache_info()
+
+def clear_parse_cache():
+    _parse_normalized.cache_clear()
+
 
-def parse_dsl(text: str):
+def parse_dsl(text: str, use_cache: bool = True, optimize: bool = False):
+    """
+    Parse DSL text into a ScriptAST.  Results are cached (LRU) by normalized text,
+    so repeated strategies skip Lark entirely; cached ASTs are shared, treat them
+    as read-only.  optimize=True returns optimizer.optimize_script of the AST
+    (same signals, less work).
+    """
     try:
-        tree = parser.parse(text)
-        ast = ASTBuilder().transform(tree)
-        return ast
+        ast = _parse_normalized(normalize_dsl(text)) if use_cache else get_parser().parse(text)
+        return optimize_script(ast) if optimize else ast
     except Exception as e:
         print("\n❌ Error while parsing DSL:")
         print(text)
@@ -0,0 +1,207 @@
+# src/profiling.py
+"""
+Per-node profiling of signal evaluation (EXPLAIN ANALYZE for a strategy).
+
+    profile = EvalProfile()
+    signals = generate_signals(ast, df, memo=profile)
+    print(explain_analyze(ast, profile))          # annotated tree
+    annotated = annotate(ast, profile)            # ScriptAST.to_dict() + "profile" entries
+    profile.export_trace("eval.trace.json")       # chrome://tracing / Perfetto
+
+EvalProfile is an EvalMemo: codegen.eval_node already routes every
+FunctionNode, CompareNode, BoolNode and CrossNode through `memo.lookup`, so
+the profile sees each node's computation without any hook in the evaluator.
+A plain generate_signals call uses a plain EvalMemo and pays nothing.
+
+Per node (by structural key, so repeated subtrees share one entry) it keeps:
+calls (lookups, including memo hits), wall time including children, self
+time, and the size of the output buffer.
+"""
+import json
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from src.ast_nodes import ScriptAST, ASTNode, FieldNode, NumberNode, FunctionNode, CompareNode, BoolNode, CrossNode, TimeframeNode
+from src.codegen import EvalMemo, generate_signals
+
+
+@dataclass
+class NodeStats:
+    calls: int = 0
+    hits: int = 0
+    total_s: float = 0.0      # wall time of the computation, children included
+    self_s: float = 0.0       # minus the time spent computing children
+    out_bytes: int = 0        # size of the result buffer (0 for scalars)
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=False))
+    return int(getattr(value, "nbytes", 0))
+
+
+class EvalProfile(EvalMemo):
+    """EvalMemo that also times every node it computes."""
+
+    def __init__(self):
+        super().__init__()
+        self.nodes: Dict[tuple, NodeStats] = {}
+        self.events: List[Dict[str, Any]] = []
+        self._children: List[float] = []      # child time accumulated per open frame
+        self._t0 = time.perf_counter()
+
+    def lookup(self, key, compute):
+        stats = self.nodes.get(key)
+        if stats is None:
+            stats = self.nodes[key] = NodeStats()
+        stats.calls += 1
+        if key in self.values:
+            stats.hits += 1
+            return super().lookup(key, compute)
+
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            value = super().lookup(key, compute)
+        finally:
+            elapsed = time.perf_counter() - start
+            child = self._children.pop()
+        if self._children:
+            self._children[-1] += elapsed
+        stats.total_s += elapsed
+        stats.self_s += elapsed - child
+        stats.out_bytes = _nbytes(value)
+        self.events.append({"key": key, "start": start - self._t0, "dur": elapsed,
+                            "depth": len(self._children), "out_bytes": stats.out_bytes})
+        return value
+
+    def stats_for(self, node, timeframe: Optional[str] = None) -> Optional[NodeStats]:
+        """Stats of `node`; pass the timeframe for nodes under a TimeframeNode (scoped keys)."""
+        if not isinstance(node, ASTNode):
+            return None
+        return self.nodes.get(node.key() if timeframe is None else ("@", timeframe, node.key()))
+
+    def to_trace(self) -> Dict[str, Any]:
+        """Chrome trace-event document (one complete event per node computation)."""
+        events = [{"name": label_key(e["key"]), "cat": e["key"][0], "ph": "X",
+                   "ts": e["start"] * 1e6, "dur": e["dur"] * 1e6, "pid": 0, "tid": 0,
+                   "args": {"out_bytes": e["out_bytes"], "depth": e["depth"]}}
+                  for e in self.events]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_trace(self, path) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_trace(), f)
+
+
+# -------------------------------
+# RENDERING
+# -------------------------------
+def label_key(key: tuple) -> str:
+    """DSL-like text for a structural node key."""
+    kind = key[0]
+    if kind == "field":
+        return key[1]
+    if kind == "number":
+        return f"{key[1]:g}" if isinstance(key[1], float) else str(key[1])
+    if kind == "function":
+        return f"{key[1]}({','.join(label_key(a) if isinstance(a, tuple) else str(a) for a in key[2])})"
+    if kind == "compare":
+        return f"{label_key(key[2])} {key[1]} {label_key(key[3])}"
+    if kind == "bool":
+        return f"({label_key(key[2])}) {key[1]} ({label_key(key[3])})"
+    if kind == "cross":
+        return f"{label_key(key[2])} {key[1]} {label_key(key[3])}"
+    if kind in ("timeframe", "@"):
+        return f"{label_key(key[2])}@{key[1]}"
+    if kind == "bits":
+        return label_key(key[1])
+    return str(key)
+
+
+def _children(node) -> List[ASTNode]:
+    if isinstance(node, FunctionNode):
+        return [a for a in node.args if isinstance(a, ASTNode)]
+    if isinstance(node, (CompareNode, BoolNode, CrossNode)):
+        return [node.left, node.right]
+    if isinstance(node, TimeframeNode):
+        return [node.expr]
+    return []
+
+
+def _head(node) -> str:
+    if isinstance(node, FieldNode):
+        return f"Field {node.name.lower()}"
+    if isinstance(node, NumberNode):
+        return f"Number {label_key(node.key())}"
+    if isinstance(node, FunctionNode):
+        return f"Function {label_key(node.key())}"
+    if isinstance(node, CompareNode):
+        return f"Compare {node.op}"
+    if isinstance(node, BoolNode):
+        return f"Bool {node.op}"
+    if isinstance(node, CrossNode):
+        return f"Cross {node.dir.lower()}"
+    if isinstance(node, TimeframeNode):
+        return f"Timeframe {node.timeframe}"
+    return type(node).__name__
+
+
+def _format_stats(s: NodeStats) -> str:
+    return (f"(total={s.total_s * 1e3:.3f} ms self={s.self_s * 1e3:.3f} ms "
+            f"calls={s.calls} hits={s.hits} out={s.out_bytes:,} B)")
+
+
+def explain_analyze(ast: ScriptAST, profile: EvalProfile) -> str:
+    """Annotated tree of `ast`, one line per node, with the stats `profile` recorded."""
+    lines = []
+
+    def walk(node, prefix, last, top, scope=None):
+        stats = profile.stats_for(node, scope)
+        text = _head(node) + (f"  {_format_stats(stats)}" if stats else "")
+        lines.append(prefix + ("" if top else ("└─ " if last else "├─ ")) + text)
+        kids = _children(node)
+        inner = node.timeframe if isinstance(node, TimeframeNode) else scope
+        for i, child in enumerate(kids):
+            walk(child, prefix + ("" if top else ("   " if last else "│  ")), i == len(kids) - 1, False, inner)
+
+    for name, root in (("ENTRY", ast.entry), ("EXIT", ast.exit)):
+        lines.append(f"{name}:")
+        if root is None:
+            lines.append("  (none)")
+        else:
+            walk(root, "  ", True, True)
+    return "\n".join(lines)
+
+
+def annotate(ast: ScriptAST, profile: EvalProfile) -> Dict[str, Any]:
+    """ScriptAST.to_dict() with a "profile" entry on every node that was timed."""
+
+    def walk(node, scope=None):
+        if not isinstance(node, ASTNode):
+            return node
+        d = node.to_dict()
+        if isinstance(node, FunctionNode):
+            d["args"] = [walk(a, scope) for a in node.args]
+        elif isinstance(node, (CompareNode, BoolNode, CrossNode)):
+            d["left"] = walk(node.left, scope)
+            d["right"] = walk(node.right, scope)
+        elif isinstance(node, TimeframeNode):
+            d["expr"] = walk(node.expr, node.timeframe)
+        stats = profile.stats_for(node, scope)
+        if stats is not None:
+            d["profile"] = asdict(stats)
+        return d
+
+    return {"entry": walk(ast.entry) if ast.entry else None,
+            "exit": walk(ast.exit) if ast.exit else None}
+
+
+def profile_signals(ast: ScriptAST, df: pd.DataFrame):
+    """Run generate_signals under an EvalProfile; returns (signals, profile)."""
+    profile = EvalProfile()
+    signals = generate_signals(ast, df, memo=profile)
+    return signals, profile
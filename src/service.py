@@ -0,0 +1,412 @@
+# src/service.py
+"""
+Long-running strategy-evaluation service (asyncio front end, process-pool back end).
+
+    service = StrategyService("data/bars", max_workers=4)
+    async with service:
+        server = await serve(service, port=8765)          # newline-delimited JSON over TCP
+        ...
+    # or, without sockets:
+    async with StrategyService(frames, max_workers=0) as service:
+        client = LocalClient(service)
+        reply = await client.request({"text": "Buy when close is above 100", "symbol": "AAPL"})
+
+A request carries DSL or natural-language text plus a symbol of the data
+source (anything batch.as_source accepts).  NL is converted in the event loop
+(nlp_batch memo); parsing, compiling, evaluating and backtesting run on the
+pool, where every worker keeps its own parse/compile memo and the last few
+loaded symbols.  An in-memory {symbol: DataFrame} mapping is published to
+shared memory when the service starts (see shared_data), so process workers
+read one copy of the universe instead of each unpickling their own; the
+segments are released by close().  A loaded symbol is reused only while the source reports the
+same data version for it (source.version(symbol), e.g. a file's mtime), so
+rewritten histories are picked up without restarting the service.
+
+Identical requests in flight at the same time (same normalized DSL, symbol
+and options) are coalesced onto one evaluation.  The evaluation runs as a
+task of its own: a caller that is cancelled stops waiting for it, but the
+other callers still get the result, and the job keeps its pool slot until
+the pool has actually finished it.  At most `max_pending` jobs are handed to
+the pool; further jobs wait for a slot (the queue depth), and once
+`max_queue` jobs are waiting new requests are rejected with ServiceBusy
+instead of piling up.  If a worker process dies, the pool is replaced and
+the jobs it lost are resubmitted once.  `stats()` reports counters, queue
+depth and p50/p99 latency over a sliding window.
+
+Wire protocol: one JSON object per line, {"id", "text", "symbol", "trades"}
+or {"id", "op": "stats"}; replies are {"id", "ok": true, "result": ...} or
+{"id", "ok": false, "error": "..."}, in completion order.
+"""
+import abc
+import argparse
+import asyncio
+import functools
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.parser import parse_dsl, normalize_dsl
+from src.compiler import compile_script
+from src.backtest import backtest_columnar
+from src.nlp_batch import nlp_to_dsl_fast
+from src.batch import MappingSource, as_source
+from src.shared_data import SharedFrames
+
+DEFAULT_PORT = 8765
+LATENCY_WINDOW = 10_000
+WORKER_FRAMES = 4            # symbols kept loaded per worker
+WORKER_SCRIPTS = 1024        # compiled scripts kept per worker
+
+
+class ServiceBusy(RuntimeError):
+    """Raised when the wait queue is full; the caller should back off and retry."""
+
+
+# -------------------------------
+# WORKER SIDE
+# -------------------------------
+_worker: Dict[str, Any] = {}
+
+def _init_worker(source):
+    _worker["source"] = source
+    _worker["frames"] = OrderedDict()
+
+@functools.lru_cache(maxsize=WORKER_SCRIPTS)
+def _compiled(dsl: str):
+    return compile_script(parse_dsl(dsl, optimize=True))
+
+def data_version(source, symbol: str):
+    """The source's version token of `symbol` (None when it has no notion of versions)."""
+    version = getattr(source, "version", None)
+    return version(symbol) if version is not None else None
+
+def _frame(symbol: str):
+    source, frames = _worker["source"], _worker["frames"]
+    version = data_version(source, symbol)
+    cached = frames.get(symbol)
+    if cached is not None and cached[0] == version:
+        frames.move_to_end(symbol)
+        return cached[1]
+    if cached is not None and hasattr(source, "refresh"):
+        source.refresh()                  # e.g. a ColumnStore's row counts and dtypes
+    df = source.load(symbol)
+    if version is not None:
+        df.attrs["data_version"] = (symbol, version)    # spares the resample cache a checksum
+    frames[symbol] = (version, df)
+    frames.move_to_end(symbol)
+    while len(frames) > WORKER_FRAMES:
+        frames.popitem(last=False)
+    return df
+
+def _evaluate(dsl: str, symbol: str, keep_trades: bool = False) -> Dict[str, Any]:
+    compiled = _compiled(dsl)
+    df = _frame(symbol)
+    entry, exit_ = compiled.evaluate(df)
+    res = backtest_columnar(df["close"].to_numpy(), entry, exit_, df.index)
+    out = {"symbol": symbol, "dsl": dsl, "bars": len(df),
+           "entries": int(entry.sum()), "exits": int(exit_.sum()),
+           "total_return": res.total_return,
+           "max_drawdown": res.max_drawdown,
+           "number_of_trades": res.number_of_trades}
+    if keep_trades:
+        out["trades"] = [{**t, "entry_date": str(t["entry_date"]), "exit_date": str(t["exit_date"])}
+                         for t in res.to_dict()["trades"]]
+    return out
+
+
+def to_dsl(text: str) -> str:
+    """DSL text as is; anything without an ENTRY: block is treated as natural language."""
+    return text if "ENTRY:" in text.upper() else nlp_to_dsl_fast(text)
+
+
+# -------------------------------
+# SERVICE
+# -------------------------------
+class StrategyService:
+
+    def __init__(self, data, max_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 max_queue: int = 1000, latency_window: int = LATENCY_WINDOW):
+        self.source = as_source(data)
+        # 0 runs evaluations on one in-process thread (tests, notebooks)
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.max_pending = max_pending or 2 * max(1, self.max_workers)
+        self.max_queue = max_queue
+        self._latencies = deque(maxlen=latency_window)
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._pool = None
+        self._slots = None
+        self._plane = None
+        self._worker_source = self.source
+        self.requests = self.completed = self.failed = self.coalesced = self.rejected = 0
+        self.waiting = self.running = self.restarts = 0
+        self._jobs = 0            # jobs queued or running
+
+    # ---- lifecycle ----
+    def _new_pool(self):
+        if self.max_workers == 0:
+            return ThreadPoolExecutor(1, initializer=_init_worker, initargs=(self.source,))
+        return ProcessPoolExecutor(self.max_workers, initializer=_init_worker, initargs=(self._worker_source,))
+
+    def _replace_pool(self, broken):
+        # every job on a broken pool fails with it; the first one to notice replaces it
+        if self._pool is broken:
+            self._pool = self._new_pool()
+            self.restarts += 1
+            broken.shutdown(wait=False)
+
+    async def start(self):
+        if self._pool is not None:
+            return self
+        if self.max_workers != 0 and isinstance(self.source, MappingSource):
+            # workers (and replacement pools) get segment descriptors, not pickled frames
+            plane = SharedFrames()
+            try:
+                self._worker_source = plane.publish_source(self.source)
+                self._plane = plane
+            except TypeError:
+                plane.close()         # e.g. a text column: hand the mapping over as is
+        self._pool = self._new_pool()
+        self._slots = asyncio.Semaphore(self.max_pending)
+        return self
+
+    async def close(self):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(None, pool.shutdown)
+        if self._plane is not None:
+            plane, self._plane = self._plane, None
+            self._worker_source = self.source
+            plane.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ---- requests ----
+    async def evaluate(self, text: str, symbol: str, keep_trades: bool = False) -> Dict[str, Any]:
+        """Evaluate and backtest `text` (DSL or NL) on `symbol`; see the module docstring."""
+        if self._pool is None:
+            raise RuntimeError("StrategyService is not started")
+        t0 = time.perf_counter()
+        self.requests += 1
+        try:
+            key = (normalize_dsl(to_dsl(text)), symbol, bool(keep_trades))
+            job = self._inflight.get(key)
+            if job is not None:
+                self.coalesced += 1
+            else:
+                job = self._submit(key)
+            # cancelling one caller must not cancel the job the others wait for
+            result = await asyncio.shield(job)
+        except ServiceBusy:
+            self.rejected += 1
+            raise
+        except BaseException:
+            self.failed += 1
+            self._latencies.append(time.perf_counter() - t0)
+            raise
+        self.completed += 1
+        self._latencies.append(time.perf_counter() - t0)
+        return result
+
+    def _submit(self, key: tuple) -> asyncio.Task:
+        # counted when submitted, so a burst is rejected before its jobs get to run
+        queued = self._jobs - self.max_pending
+        if queued >= self.max_queue:
+            raise ServiceBusy(f"{queued} requests already waiting")
+        self._jobs += 1
+        job = self._inflight[key] = asyncio.ensure_future(self._job(key))
+        job.add_done_callback(functools.partial(self._finished, key))
+        return job
+
+    def _finished(self, key: tuple, job: asyncio.Task):
+        self._jobs -= 1
+        del self._inflight[key]
+        if not job.cancelled():
+            job.exception()          # retrieved here, in case every caller was cancelled
+
+    async def _job(self, key: tuple) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            for attempt in range(2):
+                pool = self._pool
+                try:
+                    return await loop.run_in_executor(pool, _evaluate, *key)
+                except BrokenProcessPool:
+                    self._replace_pool(pool)
+                    if attempt:
+                        raise
+        finally:
+            # released only once the pool is done with the job
+            self.running -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        lat = np.fromiter(self._latencies, dtype=float)
+        p50, p99 = (np.percentile(lat, [50, 99]) * 1e3).tolist() if len(lat) else (None, None)
+        return {"requests": self.requests, "completed": self.completed, "failed": self.failed,
+                "coalesced": self.coalesced, "rejected": self.rejected, "restarts": self.restarts,
+                "queue_depth": self.waiting, "running": self.running, "inflight": len(self._inflight),
+                "p50_ms": p50, "p99_ms": p99}
+
+    async def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """One wire-protocol request -> its reply (errors are replies, not exceptions)."""
+        reply = {"id": message.get("id") if isinstance(message, dict) else None}
+        try:
+            if not isinstance(message, dict):
+                raise TypeError(f"expected a JSON object, got {type(message).__name__}")
+            if message.get("op") == "stats":
+                reply["result"] = self.stats()
+            else:
+                reply["result"] = await self.evaluate(message["text"], message["symbol"],
+                                                      bool(message.get("trades", False)))
+            reply["ok"] = True
+        except Exception as e:
+            reply["ok"] = False
+            reply["error"] = f"{type(e).__name__}: {e}"
+        return reply
+
+
+# -------------------------------
+# TRANSPORT
+# -------------------------------
+async def _connection(service: StrategyService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    lock = asyncio.Lock()
+    tasks = set()
+
+    async def answer(line: bytes):
+        try:
+            reply = await service.handle(json.loads(line))
+        except ValueError as e:
+            reply = {"id": None, "ok": False, "error": f"ValueError: {e}"}
+        async with lock:
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                task = asyncio.create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        writer.close()
+
+
+async def serve(service: StrategyService, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+    """Start the TCP front end (port 0 picks a free port; see server.sockets)."""
+    await service.start()
+    return await asyncio.start_server(functools.partial(_connection, service), host, port)
+
+
+class _Client(abc.ABC):
+
+    @abc.abstractmethod
+    async def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one wire-protocol message and return its reply."""
+
+    async def evaluate(self, text: str, symbol: str, trades: bool = False) -> Dict[str, Any]:
+        return await self.request({"text": text, "symbol": symbol, "trades": trades})
+
+    async def stats(self) -> Dict[str, Any]:
+        return await self.request({"op": "stats"})
+
+
+class LocalClient(_Client):
+    """In-process client: same messages and replies as the TCP protocol, no sockets."""
+
+    def __init__(self, service: StrategyService):
+        self.service = service
+
+    async def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        # the JSON round trip keeps replies identical to what a remote client sees
+        return json.loads(json.dumps(await self.service.handle(json.loads(json.dumps(message)))))
+
+
+class TCPClient(_Client):
+    """Client for `serve`; concurrent requests on one connection are matched by id."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self._next_id = 0
+        self._waiters: Dict[int, asyncio.Future] = {}
+        self._listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> "TCPClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            reply = json.loads(line)
+            fut = self._waiters.pop(reply.get("id"), None)
+            if fut is not None and not fut.done():
+                fut.set_result(reply)
+        for fut in self._waiters.values():
+            fut.set_exception(ConnectionError("service closed the connection"))
+        self._waiters.clear()
+
+    async def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self._next_id += 1
+        message = {**message, "id": self._next_id}
+        fut = self._waiters[self._next_id] = asyncio.get_running_loop().create_future()
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+        return await fut
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self._listener.cancel()
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Strategy-evaluation service (newline-delimited JSON over TCP)")
+    ap.add_argument("data", help="directory of per-symbol OHLCV files")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--max-pending", type=int, default=None, help="jobs handed to the pool at once")
+    ap.add_argument("--max-queue", type=int, default=1000, help="waiting requests before ServiceBusy")
+    args = ap.parse_args(argv)
+
+    async def run():
+        async with StrategyService(args.data, args.workers, args.max_pending, args.max_queue) as service:
+            server = await serve(service, args.host, args.port)
+            print(f"serving on {args.host}:{server.sockets[0].getsockname()[1]}")
+            async with server:
+                await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,214 @@
+# src/shared_data.py
+"""
+Zero-copy shared-memory data plane for multiprocess evaluation.
+
+    with SharedFrames() as plane:
+        source = plane.publish_source(frames)          # a SharedSource of small descriptors
+        rows = list(run_universe(scripts, source, max_workers=8))
+
+Each symbol's columns and index are copied once into one
+multiprocessing.shared_memory segment.  Workers get a SharedFrame descriptor
+(segment name, dtypes, offsets: a few hundred bytes) instead of a pickled
+DataFrame.  attach() turns it into a DataFrame whose columns are read-only
+views of the segment, so compiled plans, generate_signals and
+run_backtest_arrays all read the shared buffer directly.
+
+Lifecycle: only the publisher unlinks a segment.  It does so on close() or at
+the end of the with-block, and also when it is garbage-collected or the
+interpreter exits.  Workers attach without registering the segment with
+the resource tracker: a forked worker's own tracker would unlink it as soon
+as the worker exits, and spawn / forkserver workers share the publisher's
+tracker, where an unregister would drop the publisher's own registration.
+So a worker that crashes leaks nothing.  If the publisher itself is killed,
+its resource tracker unlinks every segment it created.
+"""
+import sys
+import threading
+import weakref
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.batch import as_source
+
+ALIGN = 64                # byte alignment of every array in a segment
+
+
+@dataclass(frozen=True)
+class SharedColumn:
+    name: str
+    dtype: str
+    offset: int
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """Picklable descriptor of one published DataFrame."""
+    segment: str
+    length: int
+    columns: Tuple[SharedColumn, ...]
+    index: Optional[SharedColumn] = None     # None: a default RangeIndex
+    tz: Optional[str] = None
+    symbol: Optional[str] = None
+
+
+# segments created by SharedFrames in this process, and segments attached by it
+_owned: Dict[str, shared_memory.SharedMemory] = {}
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+_register_lock = threading.Lock()
+
+
+def _no_register(name, rtype):
+    pass
+
+
+def _open(name: str) -> shared_memory.SharedMemory:
+    shm = _owned.get(name) or _attached.get(name)
+    if shm is not None:
+        return shm
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name, track=False)
+    else:
+        # before 3.13 attaching registers the segment too; keep it from doing so
+        with _register_lock:
+            register, resource_tracker.register = resource_tracker.register, _no_register
+            try:
+                shm = shared_memory.SharedMemory(name)
+            finally:
+                resource_tracker.register = register
+    _attached[name] = shm
+    return shm
+
+
+def _view(shm, col: SharedColumn, length: int) -> np.ndarray:
+    values = np.ndarray((length,), dtype=np.dtype(col.dtype), buffer=shm.buf, offset=col.offset)
+    values.flags.writeable = False
+    return values
+
+
+def attach(frame: SharedFrame) -> pd.DataFrame:
+    """DataFrame over the shared buffers of `frame` (no copy; the columns are read-only)."""
+    shm = _open(frame.segment)
+    columns = {c.name: _view(shm, c, frame.length) for c in frame.columns}
+    if frame.index is None:
+        index = pd.RangeIndex(frame.length)
+    else:
+        values = _view(shm, frame.index, frame.length)
+        index = pd.Index(values, copy=False, name=frame.index.name or None)
+        if frame.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(frame.tz)
+    df = pd.DataFrame(columns, index=index, copy=False)
+    if frame.symbol is not None:
+        df.attrs["symbol"] = frame.symbol      # keys the resampled-bar cache (see timeframes)
+    return df
+
+
+def detach(segment: str):
+    """Drop this process's mapping of `segment` (frames attached from it must be gone)."""
+    shm = _attached.pop(segment, None)
+    if shm is not None:
+        try:
+            shm.close()
+        except BufferError:
+            pass        # views still alive; the mapping goes away with them
+
+
+class SharedSource:
+    """Data source (symbols() / load(symbol)) over published frames; cheap to pickle."""
+
+    def __init__(self, frames: Mapping[str, SharedFrame]):
+        self.frames = dict(frames)
+
+    def symbols(self) -> List[str]:
+        return list(self.frames)
+
+    def load(self, symbol: str) -> pd.DataFrame:
+        return attach(self.frames[symbol])
+
+
+def _unlink_all(segments: Dict[str, shared_memory.SharedMemory]):
+    for name, shm in list(segments.items()):
+        segments.pop(name)
+        _owned.pop(name, None)
+        try:
+            shm.close()
+        except BufferError:
+            pass        # frames attached in this process still hold views
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedFrames:
+    """Publisher: owns the segments it creates and unlinks them on close()."""
+
+    def __init__(self):
+        self.frames: Dict[str, SharedFrame] = {}
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+        self._finalizer = weakref.finalize(self, _unlink_all, self._segments)
+
+    def publish(self, symbol: str, df: pd.DataFrame) -> SharedFrame:
+        """Copy the numeric columns and index of `df` into a new segment."""
+        arrays = []
+        for name in df.columns:
+            values = df[name].to_numpy()
+            if values.dtype.kind not in "biuf":
+                raise TypeError(f"Column {name!r} of {symbol}: only numeric and bool columns can be shared")
+            arrays.append((str(name), values))
+
+        index, tz = df.index, None
+        if isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1:
+            index_values = None
+        elif isinstance(index, pd.DatetimeIndex):
+            if index.tz is not None:
+                tz, index = str(index.tz), index.tz_convert("UTC").tz_localize(None)
+            index_values = index.to_numpy()
+        elif index.dtype.kind in "iuf":
+            index_values = index.to_numpy()
+        else:
+            raise TypeError(f"Index of {symbol}: only datetime, numeric or default indexes can be shared")
+        if index_values is not None:
+            arrays.append((index.name or "", index_values))
+
+        offsets, size = [], 0
+        for _, values in arrays:
+            offsets.append(size)
+            size += -(-values.nbytes // ALIGN) * ALIGN
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self._segments[shm.name] = _owned[shm.name] = shm
+        for (_, values), offset in zip(arrays, offsets):
+            np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf, offset=offset)[:] = values
+
+        described = [SharedColumn(name, values.dtype.str, offset) for (name, values), offset in zip(arrays, offsets)]
+        frame = SharedFrame(shm.name, len(df), tuple(described[:len(df.columns)]),
+                            described[-1] if index_values is not None else None, tz, symbol)
+        old = self.frames.get(symbol)
+        self.frames[symbol] = frame
+        if old is not None:
+            _unlink_all({old.segment: self._segments[old.segment]})
+            self._segments.pop(old.segment, None)
+        return frame
+
+    def publish_source(self, data, symbols: Optional[Sequence[str]] = None) -> SharedSource:
+        """Publish every symbol of a data source (see batch.as_source) and return a SharedSource."""
+        source = as_source(data)
+        names = list(symbols) if symbols is not None else source.symbols()
+        return SharedSource({s: self.frames.get(s) or self.publish(s, source.load(s)) for s in names})
+
+    @property
+    def nbytes(self) -> int:
+        return sum(shm.size for shm in self._segments.values())
+
+    def close(self):
+        self.frames.clear()
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
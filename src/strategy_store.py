@@ -0,0 +1,74 @@
+# src/strategy_store.py
+"""
+On-disk store of pre-parsed strategies.
+
+    StrategyStore.write("strategies.json", dsl_texts)  # once, e.g. at deploy time
+    store = StrategyStore("strategies.json")           # in every worker
+    ast = store.get(dsl_text)                          # no Lark parse
+
+The file is a single JSON document mapping normalized DSL text to the
+structural key of its ScriptAST (see ScriptAST.to_bytes), so loading it is
+one read plus one json.loads, and any Python version can read it.  ASTs are
+rebuilt on first access.  A file that is not a store of this format version
+raises ValueError asking for a rebuild.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Union
+
+from src.ast_nodes import FORMAT_VERSION, ScriptAST, key_from_json
+from src.parser import normalize_dsl
+
+
+class StrategyStore:
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        try:
+            with open(self.path, "rb") as f:
+                data = json.loads(f.read())
+            version, keys = data["version"], dict(data["keys"])
+        except (ValueError, TypeError, KeyError) as e:
+            raise ValueError(f"{self.path}: unreadable strategy store ({e!r}); rebuild it with StrategyStore.write") from None
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: unsupported strategy store version {version}; rebuild it with StrategyStore.write")
+        self._keys: Dict[str, list] = keys
+        self._asts: Dict[str, ScriptAST] = {}
+
+    @staticmethod
+    def write(path: Union[str, Path], scripts: Iterable[str]) -> int:
+        """Parse `scripts` and write them to `path` (atomically); returns the count."""
+        from src.parser import parse_dsl
+        keys = {}
+        for text in scripts:
+            norm = normalize_dsl(text)
+            if norm not in keys:
+                keys[norm] = parse_dsl(norm).key()
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"version": FORMAT_VERSION, "keys": keys}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return len(keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, text: str) -> bool:
+        return normalize_dsl(text) in self._keys
+
+    def get(self, text: str) -> ScriptAST:
+        """Stored AST for `text`; KeyError if it was never written."""
+        norm = normalize_dsl(text)
+        ast = self._asts.get(norm)
+        if ast is None:
+            ast = self._asts[norm] = ScriptAST.from_key(key_from_json(self._keys[norm]))
+        return ast
+
+    def parse(self, text: str) -> ScriptAST:
+        """Like parse_dsl, but served from the store when possible."""
+        if text in self:
+            return self.get(text)
+        from src.parser import parse_dsl
+        return parse_dsl(text)
@@ -0,0 +1,359 @@
+# src/streaming.py
+"""
+Streaming evaluator: feed one bar at a time, get that bar's entry/exit flags.
+
+The script is lowered with compile_script and every step becomes a small
+stateful cell.  Indicator cells keep O(period) running state (ring buffer +
+running sum for rolling means, the previous value for EMA and for Wilder's
+RSI averages), and crossover cells keep the previous operand values, so
+`push(bar)` costs the same no matter how long the history is.
+
+The cells follow the same update rules as pandas' rolling mean (Kahan-summed
+running sum, exact result for a window of one repeated value) and ewm
+(adjust=False), so the output matches codegen.generate_signals bar for bar.
+"""
+import math
+from collections import deque
+from typing import Any, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.ast_nodes import ScriptAST
+from src.compiler import compile_script
+
+
+# -------------------------------
+# RUNNING STATE
+# -------------------------------
+class RollingMean:
+    """rolling(period, min_periods).mean(), one value at a time."""
+
+    def __init__(self, period: int, min_periods: int):
+        self.period = period
+        self.min_periods = min_periods
+        self.window = deque()
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same = 0
+        self.prev_value = None
+
+    def _add(self, val):
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            # consecutive identical values average to exactly that value
+            self.same = self.same + 1 if val == self.prev_value else 1
+            self.prev_value = val
+
+    def _remove(self, val):
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct -= 1
+
+    def push(self, val: float) -> float:
+        val = float(val)
+        if self.prev_value is None or self.period <= 1:
+            # first window (or a window of one): start from scratch
+            self.window.clear()
+            self.nobs = self.neg_ct = self.same = 0
+            self.sum_x = self.comp_add = self.comp_remove = 0.0
+            self.prev_value = val
+        elif len(self.window) == self.period:
+            self._remove(self.window.popleft())
+        self.window.append(val)
+        self._add(val)
+
+        if self.nobs >= self.min_periods and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.same >= self.nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+            return result
+        return math.nan
+
+    def run(self, values) -> np.ndarray:
+        """
+        push() over a block of values, with the same results and final state.
+        Only the two compensated sums are updated bar by bar; counts, signs and
+        runs of repeated values are computed for the whole block at once.
+        """
+        x = np.asarray(values, dtype=float)
+        if len(x) and (self.prev_value is None or self.period <= 1):
+            if self.period <= 1:
+                # a window of one starts from scratch on every bar: the result is the value
+                self.push(x[-1])
+                return x.copy()
+            first = self.push(x[0])
+            return np.concatenate(([first], self.run(x[1:])))
+        m, period = len(x), self.period
+        if m == 0:
+            return np.empty(0)
+
+        # the input leaving the window at each bar (NaN while the window fills)
+        held = np.concatenate((np.asarray(self.window, dtype=float), x))
+        leaving = np.full(m, np.nan)
+        pos = np.arange(m) + len(self.window) - period
+        leaving[pos >= 0] = held[pos[pos >= 0]]
+        added, removed = ~np.isnan(x), ~np.isnan(leaving)
+        nobs = self.nobs + np.cumsum(added) - np.cumsum(removed)
+        neg_ct = self.neg_ct + np.cumsum(added & np.signbit(x)) - np.cumsum(removed & np.signbit(leaving))
+
+        # run of identical observations ending at each bar, continuing the current one
+        obs = x[added]
+        same = np.arange(1, len(obs) + 1)
+        if len(obs):
+            breaks = np.flatnonzero(obs[1:] != obs[:-1]) + 1
+            starts = np.zeros(len(obs), dtype=np.int64)
+            starts[breaks] = breaks
+            same -= np.maximum.accumulate(starts)
+            if obs[0] == self.prev_value:
+                first_run = breaks[0] if len(breaks) else len(obs)
+                same[:first_run] += self.same
+        seen = np.cumsum(added)
+        last = np.maximum(seen - 1, 0)
+        same = np.where(seen > 0, same[last] if len(obs) else 0, self.same)
+        prev = np.where(seen > 0, obs[last] if len(obs) else np.nan, self.prev_value)
+
+        # pandas' Kahan-compensated add and remove sums, in its order: remove, then add
+        sums = []
+        total, comp_add, comp_remove = self.sum_x, self.comp_add, self.comp_remove
+        for old, val in zip(leaving.tolist(), x.tolist()):
+            if old == old:
+                y = -old - comp_remove
+                t = total + y
+                comp_remove = t - total - y
+                total = t
+            if val == val:
+                y = val - comp_add
+                t = total + y
+                comp_add = t - total - y
+                total = t
+            sums.append(total)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out = np.asarray(sums) / nobs
+        out[(neg_ct == 0) & (out < 0)] = 0.0
+        out[(neg_ct == nobs) & (out > 0)] = 0.0
+        flat = same >= nobs
+        out[flat] = prev[flat]
+        out[(nobs < self.min_periods) | (nobs <= 0)] = np.nan
+
+        self.window = deque(held[len(held) - min(period, len(held)):].tolist())
+        self.sum_x, self.comp_add, self.comp_remove = total, comp_add, comp_remove
+        self.nobs, self.neg_ct = int(nobs[-1]), int(neg_ct[-1])
+        self.same, self.prev_value = int(same[-1]), float(prev[-1])
+        return out
+
+
+class EWMean:
+    """
+    ewm(span=period, adjust=False, min_periods=period).mean(), one value at a time;
+    with `com` given, ewm(com=com, adjust=False).mean() instead.
+    """
+
+    def __init__(self, period: int, com: Optional[float] = None):
+        min_periods = period if com is None else 0
+        com = (period - 1) / 2 if com is None else com
+        self.alpha = 1. / (1. + com)
+        self.old_wt_factor = 1. - self.alpha
+        self.new_wt = self.alpha
+        # pandas re-derives the new weight when com == 1 (irregular-interval support)
+        self.com_is_one = com == 1
+        self.min_periods = min_periods
+        self.weighted = None
+        self.old_wt = 1.
+        self.nobs = 0
+
+    def push(self, cur: float) -> float:
+        cur = float(cur)
+        is_observation = cur == cur
+        self.nobs += is_observation
+        if self.weighted is None:
+            self.weighted = cur
+        elif self.weighted == self.weighted:
+            self.old_wt *= self.old_wt_factor
+            if is_observation:
+                if self.weighted != cur:
+                    if self.com_is_one:
+                        self.new_wt = 1. - self.old_wt
+                    self.weighted = self.old_wt * self.weighted + self.new_wt * cur
+                    self.weighted /= (self.old_wt + self.new_wt)
+                self.old_wt = 1.
+        elif is_observation:
+            self.weighted = cur
+        return self.weighted if self.nobs >= self.min_periods else math.nan
+
+
+class WilderMean:
+    """codegen.wilder_mean, one value at a time: a plain mean of the first
+    `period` bars, then the ewm(com=period-1) recursion seeded with it."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.seen = 0          # bars since the first observation (while seeding)
+        self.total = 0.0
+        self.count = 0
+        self.ewm = None
+
+    def push(self, val: float) -> float:
+        val = float(val)
+        if self.ewm is not None:
+            return self.ewm.push(val)
+        if self.seen == 0 and val != val:
+            return math.nan
+        self.seen += 1
+        if val == val:
+            self.total += val
+            self.count += 1
+        if self.seen < self.period:
+            return math.nan
+        self.ewm = EWMean(self.period, com=self.period - 1)
+        return self.ewm.push(self.total / self.count)
+
+
+class RSIState:
+    """codegen.rsi, one value at a time: Wilder means of gains and losses."""
+
+    def __init__(self, period: int):
+        self.up = WilderMean(period)
+        self.down = WilderMean(period)
+        self.prev = math.nan
+
+    def push(self, val: float) -> float:
+        delta = float(val) - self.prev
+        self.prev = float(val)
+        if delta != delta:
+            up = down = math.nan
+        else:
+            up = max(delta, 0.0)
+            down = -min(delta, 0.0)
+        avg_up = self.up.push(up)
+        avg_down = self.down.push(down)
+        total = avg_up + avg_down
+        return 50.0 if total == 0 else 100 * avg_up / total
+
+
+# -------------------------------
+# CELLS
+# -------------------------------
+_COMPARE = {
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+}
+
+
+class _Cross:
+
+    def __init__(self, above: bool):
+        self.above = above
+        self.prev = None
+
+    def push(self, left, right) -> bool:
+        # a missing previous value falls back to the current one, as in the batch path
+        if self.prev is None:
+            prev_left, prev_right = left, right
+        else:
+            prev_left, prev_right = self.prev
+            if prev_left != prev_left:
+                prev_left = left
+            if prev_right != prev_right:
+                prev_right = right
+        self.prev = (left, right)
+        if self.above:
+            return prev_left <= prev_right and left > right
+        return prev_left >= prev_right and left < right
+
+
+def _truth(value) -> bool:
+    # NaN counts as False, like fillna(False) in generate_signals
+    return bool(value) and value == value
+
+
+class StreamingEvaluator:
+    """
+    Stateful per-bar evaluator for a ScriptAST.
+
+        ev = StreamingEvaluator(parse_dsl(dsl))
+        for bar in feed:                     # bar: {"close": ..., "volume": ..., ...}
+            entry, exit_ = ev.push(bar)
+    """
+
+    def __init__(self, ast: ScriptAST):
+        compiled = compile_script(ast)
+        # fields the script reads, plus columns it may pick up by function name
+        self.columns = compiled.columns + [s.params[0] for s in compiled.steps if s.op == "column_or_false"]
+        self.entry_slot = compiled.entry_slot
+        self.exit_slot = compiled.exit_slot
+        self._cells: List[Tuple[str, Tuple[int, ...], Any]] = []
+        for step in compiled.steps:
+            if step.op == "sma":
+                state = RollingMean(step.params[0], step.params[0])
+            elif step.op == "ema":
+                state = EWMean(step.params[0])
+            elif step.op == "rsi":
+                state = RSIState(step.params[0])
+            elif step.op in ("cross_above", "cross_below"):
+                state = _Cross(step.op == "cross_above")
+            elif step.op == "compare":
+                state = _COMPARE[step.params[0]]
+            elif step.op == "timeframe":
+                raise ValueError("timeframe-qualified series are not supported by the streaming evaluator")
+            else:
+                state = step.params[0] if step.params else None
+            self._cells.append((step.op, step.args, state))
+        self.bars = 0
+
+    def push(self, bar: Mapping[str, Any]) -> Tuple[bool, bool]:
+        """Consume one bar and return its (entry, exit) flags."""
+        slots = []
+        for op, args, state in self._cells:
+            if op == "field":
+                value = bar[state]
+            elif op == "const":
+                value = state
+            elif op == "column_or_false":
+                value = bar[state] if state in bar else False
+            elif op in ("sma", "ema", "rsi"):
+                value = state.push(slots[args[0]])
+            elif op == "compare":
+                value = state(slots[args[0]], slots[args[1]])
+            elif op == "and":
+                value = bool(slots[args[0]]) and bool(slots[args[1]])
+            elif op == "or":
+                value = bool(slots[args[0]]) or bool(slots[args[1]])
+            else:
+                value = state.push(slots[args[0]], slots[args[1]])
+            slots.append(value)
+        self.bars += 1
+        entry = _truth(slots[self.entry_slot]) if self.entry_slot is not None else False
+        exit_ = _truth(slots[self.exit_slot]) if self.exit_slot is not None else False
+        return entry, exit_
+
+    def run(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Replay a frame bar by bar; mainly for checking against generate_signals."""
+        cols = {c: df[c].tolist() for c in self.columns if c in df.columns}
+        names = list(cols)
+        flags = [self.push(dict(zip(names, values))) for values in zip(*cols.values())] if names else \
+            [self.push({}) for _ in range(len(df))]
+        return pd.DataFrame(flags, columns=["entry", "exit"], index=df.index, dtype=bool)
@@ -0,0 +1,145 @@
+# src/sweep.py
+"""
+Parameter sweeps over a DSL template, e.g.
+
+    ENTRY: close > sma(close,{fast}) AND rsi(close,{n}) < {lo}
+    EXIT:  close < sma(close,{fast})
+
+with a grid such as {"fast": range(5, 201), "n": [7, 14], "lo": [30, 40]}.
+
+The template is parsed once (placeholders become sentinel numbers that are
+swapped per combination), and indicators are served by a RollingBank: each
+distinct (indicator, column, N) is computed once however many combinations
+use it.  sma runs pandas' rolling mean per N, as codegen.sma does; a shared
+prefix sum would be cheaper but drifts from it on long histories, and the
+sweep must rank combinations on the numbers a real run reproduces.  rsi
+shares the gain/loss split across N and runs one Wilder recursion per N.
+Indicator arrays are produced on demand and kept in a small LRU, so a sweep
+never holds every intermediate series at once.
+"""
+import itertools
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.ast_nodes import ScriptAST, NumberNode, FunctionNode, CompareNode, BoolNode, CrossNode, TimeframeNode
+from src.parser import parse_dsl
+from src.compiler import compile_script
+from src.codegen import sma, wilder_mean, _rsi_values
+from src.backtest import backtest_columnar
+
+# placeholder values, far outside any realistic period or threshold
+_SENTINEL = 987650000
+
+
+def expand_grid(grid: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of a {name: values} grid, last name varying fastest."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[k] for k in names))]
+
+
+def bind_params(node, values: Mapping[float, float]):
+    """Copy of `node` with every NumberNode whose value is a key of `values` replaced."""
+    if node is None:
+        return None
+    if isinstance(node, ScriptAST):
+        return ScriptAST(entry=bind_params(node.entry, values), exit=bind_params(node.exit, values))
+    if isinstance(node, NumberNode):
+        return NumberNode(value=values[node.value]) if node.value in values else node
+    if isinstance(node, FunctionNode):
+        return FunctionNode(name=node.name, args=[bind_params(a, values) for a in node.args])
+    if isinstance(node, CompareNode):
+        return CompareNode(left=bind_params(node.left, values), op=node.op, right=bind_params(node.right, values))
+    if isinstance(node, BoolNode):
+        return BoolNode(op=node.op, left=bind_params(node.left, values), right=bind_params(node.right, values))
+    if isinstance(node, CrossNode):
+        return CrossNode(dir=node.dir, left=bind_params(node.left, values), right=bind_params(node.right, values))
+    if isinstance(node, TimeframeNode):
+        return TimeframeNode(timeframe=node.timeframe, expr=bind_params(node.expr, values))
+    return node
+
+
+# -------------------------------
+# SHARED ROLLING COMPUTATIONS
+# -------------------------------
+class RollingBank:
+    """
+    Per-column passes shared by every window length.
+    Implements the memo protocol (lookup(key, compute)) of CompiledScript.evaluate,
+    so sma/rsi steps of any N are served from it; other steps fall through.
+    Values are identical to codegen.sma/rsi.
+    """
+
+    def __init__(self, columns, max_cached: int = 32):
+        self.columns = columns
+        self.max_cached = max_cached
+        self._series: Dict[str, pd.Series] = {}
+        self._moves: Dict[str, tuple] = {}     # column -> (gains, losses)
+        self._cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def sma(self, column: str, n: int) -> np.ndarray:
+        if column not in self._series:
+            self._series[column] = pd.Series(np.asarray(self.columns[column], dtype=float))
+        return sma(self._series[column], n).to_numpy()
+
+    def rsi(self, column: str, n: int) -> np.ndarray:
+        # same definition as codegen.rsi, with the diff/up/down pass shared across N
+        if column not in self._moves:
+            x = np.asarray(self.columns[column], dtype=float)
+            delta = np.diff(x, prepend=np.nan)
+            self._moves[column] = (np.clip(delta, 0, None), -np.clip(delta, None, 0))
+        up, down = self._moves[column]
+        return _rsi_values(wilder_mean(up, n), wilder_mean(down, n))
+
+    def lookup(self, key, compute):
+        # ("function", name, (("field", column), ("number", period)))
+        if (len(key) == 3 and key[0] == "function" and key[1] in ("sma", "rsi")
+                and len(key[2]) == 2 and key[2][0][0] == "field" and key[2][1][0] == "number"):
+            spec = (key[1], key[2][0][1], int(key[2][1][1]))
+            if spec in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(spec)
+                return self._cache[spec]
+            self.misses += 1
+            name, column, n = spec
+            value = self.sma(column, n) if name == "sma" else self.rsi(column, n)
+            self._cache[spec] = value
+            if len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+            return value
+        return compute()
+
+
+# -------------------------------
+# SWEEP
+# -------------------------------
+def run_sweep(template: str, grid: Mapping[str, Sequence[Any]], df: pd.DataFrame,
+              rank_by: str = "total_return", ascending: bool = False,
+              top: Optional[int] = None) -> pd.DataFrame:
+    """
+    Evaluate and backtest `template` for every combination in `grid`.
+    Returns one row per combination (params + backtest metrics) ranked by `rank_by`.
+    """
+    names = list(grid)
+    sentinels = {name: _SENTINEL + i for i, name in enumerate(names)}
+    ast = parse_dsl(template.format(**{k: str(v) for k, v in sentinels.items()}))
+
+    bank = RollingBank(df)
+    close = df["close"].to_numpy()
+    rows = []
+    for params in expand_grid(grid):
+        bound = bind_params(ast, {float(sentinels[k]): float(v) for k, v in params.items()})
+        entry, exit_ = compile_script(bound).evaluate(df, memo=bank)
+        res = backtest_columnar(close, entry, exit_)
+        rows.append({**params,
+                     "total_return": res.total_return,
+                     "max_drawdown": res.max_drawdown,
+                     "number_of_trades": res.number_of_trades})
+
+    table = pd.DataFrame(rows, columns=names + ["total_return", "max_drawdown", "number_of_trades"])
+    table = table.sort_values(rank_by, ascending=ascending, kind="stable").reset_index(drop=True)
+    return table.head(top) if top else table
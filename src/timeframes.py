@@ -0,0 +1,146 @@
+# src/timeframes.py
+"""
+Multi-timeframe support: timeframe-qualified series in the DSL.
+
+    ENTRY: close crosses_above sma(close,20) AND close > sma(close,20)@1d
+
+`expr@1d` evaluates `expr` on daily bars resampled from the (intraday) base
+frame and aligns the result back onto the base index.  Timeframes are a count
+and a unit: m (minutes), h (hours), d (days) or w (weeks), e.g. 5m, 4h, 1d.
+
+Resampled OHLCV bars (open first, high max, low min, close last, volume sum,
+any other column last) are computed once and kept in a module-level LRU
+keyed by (symbol, timeframe), so every strategy evaluated on the same symbol
+shares the aggregation and the alignment positions.  The symbol is taken
+from df.attrs["symbol"] (set by ColumnStore.load and DirectorySource.load).
+Frames without one are keyed by identity and held through a weak reference,
+so the cache never keeps a frame alive.  An entry is reused only while the
+frame's shape, index bounds and contents match: the contents are identified
+by df.attrs["data_version"] when the loader sets one, else by a CRC-32 of
+the columns (about as costly as the resampling itself on wide frames).
+
+No look-ahead: a resampled bar is stamped with its close time (bins are
+closed on the left, labelled on the right) and becomes visible from the
+first base bar stamped at or after that time.  With bars stamped at their
+open, today's daily values are used from the first bar of tomorrow.
+"""
+import weakref
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.parser import normalize_timeframe
+
+RESAMPLE_CACHE_SIZE = 256
+TIMEFRAME_UNITS = {"m": "min", "h": "h", "d": "D", "w": "W"}
+AGGREGATIONS = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+def to_offset(timeframe: str) -> str:
+    """pandas frequency string of a canonical timeframe."""
+    tf = normalize_timeframe(timeframe)
+    return tf[:-1] + TIMEFRAME_UNITS[tf[-1]]
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """OHLCV bars of `timeframe`, indexed by bar close time; periods without base bars are dropped."""
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise ValueError("timeframe-qualified series need a DataFrame with a DatetimeIndex")
+    r = df.resample(to_offset(timeframe), closed="left", label="right")
+    bars = r.agg({c: AGGREGATIONS.get(c, "last") for c in df.columns})
+    return bars[r.size().to_numpy() > 0]
+
+
+@dataclass
+class TimeframeBars:
+    """Resampled bars plus, for every base row, the row of the latest bar closed by then."""
+    timeframe: str
+    bars: pd.DataFrame
+    positions: np.ndarray     # -1 before the first bar has closed
+
+    def align(self, values):
+        """Forward-align a result computed on `bars` onto the base rows (scalars pass through)."""
+        if np.ndim(values) == 0:
+            return values
+        values = np.asarray(values)
+        missing = self.positions < 0
+        if values.dtype == bool:
+            return values[self.positions] & ~missing
+        out = values[self.positions].astype(float)
+        out[missing] = np.nan
+        return out
+
+
+# -------------------------------
+# RESAMPLE CACHE
+# -------------------------------
+_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _checksum(df: pd.DataFrame) -> int:
+    """CRC-32 of the index and every column, so corrected values miss the cache."""
+    crc = 0
+    for values in [df.index.to_numpy()] + [df[c].to_numpy() for c in df.columns]:
+        if values.dtype == object:
+            values = pd.util.hash_array(values)
+        crc = zlib.crc32(np.ascontiguousarray(values), crc)
+    return crc
+
+
+def _fingerprint(df: pd.DataFrame) -> tuple:
+    n = len(df.index)
+    version = df.attrs.get("data_version")
+    return (n, tuple(df.columns), df.index[0] if n else None, df.index[-1] if n else None,
+            version if version is not None else _checksum(df))
+
+
+def _forget(key, ref):
+    # a frame keyed by identity was collected: drop its entry before the id can be reused
+    entry = _cache.get(key)
+    if entry is not None and entry[0] is ref:
+        del _cache[key]
+
+
+def resampled(df: pd.DataFrame, timeframe: str, symbol: Optional[str] = None) -> TimeframeBars:
+    """
+    Cached TimeframeBars of `df` at `timeframe`.  Keyed by (symbol, timeframe)
+    when a symbol is given (or found in df.attrs), by the frame itself otherwise;
+    a cached entry is reused only while the frame's shape, index bounds and
+    contents (data_version or checksum) match.
+    """
+    tf = normalize_timeframe(timeframe)
+    symbol = df.attrs.get("symbol") if symbol is None else symbol
+    key = (symbol, tf) if symbol is not None else (id(df), tf)
+    entry = _cache.get(key)
+    if entry is not None:
+        owner, fingerprint, value = entry
+        if (symbol is not None or owner() is df) and fingerprint == _fingerprint(df):
+            _stats["hits"] += 1
+            _cache.move_to_end(key)
+            return value
+
+    _stats["misses"] += 1
+    bars = resample_ohlcv(df, tf)
+    positions = bars.index.searchsorted(df.index, side="right") - 1
+    value = TimeframeBars(tf, bars, positions)
+    # a frame keyed by identity is held weakly; its entry goes away with it
+    owner = weakref.ref(df, lambda ref, key=key: _forget(key, ref)) if symbol is None else None
+    _cache[key] = (owner, _fingerprint(df), value)
+    _cache.move_to_end(key)
+    while len(_cache) > RESAMPLE_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return value
+
+
+def resample_cache_info() -> Dict[str, Any]:
+    return {**_stats, "entries": len(_cache)}
+
+
+def clear_resample_cache():
+    _cache.clear()
+    _stats["hits"] = _stats["misses"] = 0
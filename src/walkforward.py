@@ -0,0 +1,101 @@
+# src/walkforward.py
+"""
+Walk-forward (rolling-window) backtesting.
+
+    report = walk_forward(["ENTRY: ... EXIT: ...", ...], df, train=500, test=100)
+    report["folds"][0]["test_metrics"]     # per-fold out-of-sample metrics
+    report["equity_curve"]                 # chained out-of-sample equity (pd.Series)
+
+Fold k trains on bars [k*step, k*step + train) (from bar 0 with anchored=True)
+and tests on the `test` bars that follow.  With several candidate scripts,
+each fold picks the best one on its training window (by `select`) and trades
+it on the test window.
+
+Signals of every candidate are computed once over the full history and
+sliced per fold.  The candidates share one memo, so an indicator they have in
+common is computed once as well.  Each fold then only runs the array backtest
+on its slices.  Indicators are causal, so a slice equals the signals a fold
+would see live, with the warm-up taken from the bars before the window.
+Positions start flat at the beginning of each window and are closed at its
+last bar.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.parser import parse_dsl
+from src.compiler import compile_script
+from src.codegen import EvalMemo
+from src.backtest import backtest_columnar
+
+METRICS = ("total_return", "max_drawdown", "number_of_trades")
+
+
+def fold_windows(n: int, train: int, test: int, step: Optional[int] = None,
+                 anchored: bool = False) -> List[Tuple[int, int, int]]:
+    """(train_start, test_start, test_end) bar positions of every complete fold."""
+    step = test if step is None else step
+    if train <= 0 or test <= 0 or step <= 0:
+        raise ValueError("train, test and step must be positive")
+    if step < test:
+        raise ValueError(f"step ({step}) shorter than the test window ({test}): test windows would overlap")
+    folds = []
+    start = 0
+    while start + train + test <= n:
+        folds.append((0 if anchored else start, start + train, start + train + test))
+        start += step
+    return folds
+
+
+def _window(close, entry, exit_, lo: int, hi: int):
+    """Metrics of one window and its per-bar equity (a position still open is closed on the last bar)."""
+    res = backtest_columnar(close[lo:hi], entry[lo:hi], exit_[lo:hi])
+    equity = res.equity_curve[:hi - lo].copy()
+    equity[-1] = res.equity_curve[-1]
+    return {k: getattr(res, k) for k in METRICS}, equity
+
+
+def walk_forward(scripts, df: pd.DataFrame, train: int, test: int, step: Optional[int] = None,
+                 anchored: bool = False, select: str = "total_return",
+                 memo: Optional[EvalMemo] = None) -> Dict[str, Any]:
+    """
+    Walk-forward backtest of one script or a list of candidate scripts (DSL text
+    or ScriptAST).  Returns {"folds": [...], "equity_curve": Series, plus the
+    METRICS of the chained out-of-sample curve}.
+    """
+    candidates = [scripts] if isinstance(scripts, str) or not isinstance(scripts, Sequence) else list(scripts)
+    plans = [compile_script(parse_dsl(s, optimize=True) if isinstance(s, str) else s) for s in candidates]
+    memo = EvalMemo() if memo is None else memo
+    signals = [plan.evaluate(df, memo) for plan in plans]
+    close = df["close"].to_numpy()
+    index = df.index
+
+    folds, curves, positions = [], [], []
+    offset = 0.0
+    trades = 0
+    for k, (lo, mid, hi) in enumerate(fold_windows(len(df), train, test, step, anchored)):
+        if len(plans) == 1:
+            best, train_metrics = 0, _window(close, *signals[0], lo, mid)[0]
+        else:
+            scored = [_window(close, entry, exit_, lo, mid)[0] for entry, exit_ in signals]
+            best = max(range(len(plans)), key=lambda i: scored[i][select])
+            train_metrics = scored[best]
+        test_metrics, equity = _window(close, *signals[best], mid, hi)
+        folds.append({"fold": k, "strategy": best,
+                      "train": (index[lo], index[mid - 1]), "test": (index[mid], index[hi - 1]),
+                      "train_metrics": train_metrics, "test_metrics": test_metrics})
+        curves.append(equity + offset)
+        positions.append(np.arange(mid, hi))
+        offset += test_metrics["total_return"]
+        trades += test_metrics["number_of_trades"]
+
+    curve = np.concatenate(curves) if curves else np.zeros(0)
+    eq = curve if len(curve) else np.array([0.0])
+    return {
+        "folds": folds,
+        "equity_curve": pd.Series(curve, index=index[np.concatenate(positions)] if positions else index[:0]),
+        "total_return": float(eq[-1]),
+        "max_drawdown": float((eq - np.maximum.accumulate(eq)).min()),
+        "number_of_trades": trades,
+    }
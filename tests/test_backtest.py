@@ -0,0 +1,101 @@
+# tests/test_backtest.py
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import run_backtest, run_backtest_vectorized, run_backtest_arrays, backtest_columnar, BacktestResult
+
+
+def _frame(n, seed, p_entry=0.1, p_exit=0.1):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    df = pd.DataFrame({"close": close}, index=pd.date_range("2024-01-01", periods=n, freq="h"))
+    signals = pd.DataFrame({
+        "entry": rng.random(n) < p_entry,
+        "exit": rng.random(n) < p_exit,
+    }, index=df.index)
+    return df, signals
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("p_entry,p_exit", [(0.1, 0.1), (0.5, 0.5), (0.02, 0.3), (0.3, 0.01)])
+def test_vectorized_matches_loop(seed, p_entry, p_exit):
+    df, signals = _frame(500, seed, p_entry, p_exit)
+    assert run_backtest_vectorized(df, signals) == run_backtest(df, signals)
+
+
+def test_vectorized_edge_cases():
+    df, _ = _frame(5, 0)
+    cases = [
+        ([0, 0, 0, 0, 0], [0, 0, 0, 0, 0]),
+        ([1, 1, 1, 1, 1], [1, 1, 1, 1, 1]),   # both flagged: enter/exit alternate
+        ([0, 0, 0, 0, 1], [0, 0, 0, 0, 0]),   # entry on the last bar
+        ([1, 0, 0, 0, 0], [1, 0, 1, 0, 0]),
+        ([0, 0, 0, 0, 0], [1, 1, 1, 1, 1]),   # exit with no position is ignored
+    ]
+    for e, x in cases:
+        signals = pd.DataFrame({"entry": np.array(e, bool), "exit": np.array(x, bool)}, index=df.index)
+        assert run_backtest_vectorized(df, signals) == run_backtest(df, signals)
+
+
+def test_arrays_without_index():
+    res = run_backtest_arrays(np.array([1.0, 2.0, 4.0, 3.0]),
+                              np.array([1, 0, 0, 0], bool), np.array([0, 0, 1, 0], bool))
+    assert res["trades"] == [{"entry_date": 0, "exit_date": 2, "entry_price": 1.0, "exit_price": 4.0, "pnl": 3.0}]
+    assert res["equity_curve"] == [0.0, 0.0, 3.0, 3.0]
+
+
+def _naive_analytics(close, high, low, trades, n):
+    """Per-bar / per-trade loops over the run_backtest trade log."""
+    held = np.zeros(n, dtype=bool)
+    mae, mfe = [], []
+    for t in trades:
+        i, j = t["entry_date"], t["exit_date"]
+        held[i + 1:j + 1] = True
+        mae.append(low[i:j + 1].min() - close[i])
+        mfe.append(high[i:j + 1].max() - close[i])
+    returns = np.array([close[k] / close[k - 1] - 1 if held[k] else 0.0 for k in range(1, n)])
+    return held[1:].mean(), returns, np.array(mae), np.array(mfe)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_columnar_analytics(seed):
+    df, signals = _frame(400, seed)
+    close = df["close"].to_numpy()
+    high, low = close + np.random.default_rng(seed).random(400), close - 1.0
+    res = backtest_columnar(close, signals["entry"].to_numpy(), signals["exit"].to_numpy())
+    legacy = run_backtest_arrays(close, signals["entry"].to_numpy(), signals["exit"].to_numpy())
+    assert res.to_dict() == legacy
+    assert res.total_return == legacy["total_return"] and res.number_of_trades == len(legacy["trades"])
+
+    exposure, returns, mae, mfe = _naive_analytics(close, high, low, legacy["trades"], 400)
+    assert res.exposure() == pytest.approx(exposure)
+    np.testing.assert_allclose(res.bar_returns()[1:], returns)
+    assert res.sharpe(252) == pytest.approx(returns.mean() / returns.std(ddof=1) * np.sqrt(252))
+    assert res.win_rate() == np.mean([t["pnl"] > 0 for t in legacy["trades"]])
+    got_mae, got_mfe = res.excursions(high, low)
+    np.testing.assert_allclose(got_mae, mae)
+    np.testing.assert_allclose(got_mfe, mfe)
+    assert (got_mae <= 0).all() and (got_mfe >= 0).all()
+
+
+def test_columnar_export(tmp_path):
+    df, signals = _frame(300, 1, 0.2, 0.05)      # ends in a position
+    res = backtest_columnar(df["close"].to_numpy(), signals["entry"].to_numpy(),
+                            signals["exit"].to_numpy(), df.index)
+    assert res.exit_idx[-1] == 299 and len(res.equity_curve) == 301
+
+    frame = res.to_frame()
+    assert list(frame["entry_date"]) == [t["entry_date"] for t in res.to_dict()["trades"]]
+
+    res.save(tmp_path / "run")
+    back = BacktestResult.load(tmp_path / "run", index=df.index)
+    assert isinstance(back.pnl, np.memmap) and back.to_dict() == res.to_dict()
+    assert back.metrics() == res.metrics()
+
+    empty = backtest_columnar(np.array([1.0, 2.0]), np.zeros(2, bool), np.zeros(2, bool))
+    assert empty.metrics()["number_of_trades"] == 0 and empty.excursions()[0].size == 0
+
+    pq = pytest.importorskip("pyarrow.parquet")
+    res.to_parquet(tmp_path / "trades.parquet")
+    table = pq.read_table(tmp_path / "trades.parquet")
+    assert table.column("pnl").to_numpy().tolist() == res.pnl.tolist()
@@ -0,0 +1,78 @@
+# tests/test_batch.py
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals
+from backtest import run_backtest
+from batch import run_universe, make_tasks
+from src.shared_data import SharedFrames
+
+SCRIPTS = [
+    "ENTRY: close > sma(close,20) EXIT: close < sma(close,20)",
+    "ENTRY: close crosses_above sma(close,10) EXIT: rsi(close,14) > 70",
+    "ENTRY: rsi(close,14) < 30 EXIT: rsi(close,14) > 50",
+]
+
+
+def _universe(n_symbols=4, n=250):
+    frames = {}
+    for k in range(n_symbols):
+        rng = np.random.default_rng(k)
+        close = 50 + np.cumsum(rng.normal(0, 1, n))
+        frames[f"SYM{k}"] = pd.DataFrame({
+            "open": close, "high": close + 1, "low": close - 1, "close": close,
+            "volume": rng.integers(1, 10, n) * 100_000,
+        }, index=pd.date_range("2024-01-01", periods=n, freq="D"))
+    return frames
+
+
+def _expected(frames):
+    out = {}
+    for sym, df in frames.items():
+        for sid, dsl in enumerate(SCRIPTS):
+            res = run_backtest(df, generate_signals(parse_dsl(dsl), df))
+            out[(sym, sid)] = (res["total_return"], res["max_drawdown"], res["number_of_trades"])
+    return out
+
+
+def _collect(rows):
+    return {(r["symbol"], r["strategy"]): (r["total_return"], r["max_drawdown"], r["number_of_trades"]) for r in rows}
+
+
+def test_make_tasks_chunks_per_symbol():
+    tasks = list(make_tasks(["A", "B"], 5, 2))
+    assert tasks == [("A", (0, 1)), ("A", (2, 3)), ("A", (4,)),
+                     ("B", (0, 1)), ("B", (2, 3)), ("B", (4,))]
+
+
+def test_in_process_matches_serial_pipeline():
+    frames = _universe()
+    assert _collect(run_universe(SCRIPTS, frames, max_workers=0, chunk_size=2)) == _expected(frames)
+
+
+def test_process_pool_over_directory(tmp_path):
+    frames = _universe(3)
+    for sym, df in frames.items():
+        df.to_csv(tmp_path / f"{sym}.csv")
+    rows = list(run_universe(SCRIPTS, tmp_path, max_workers=2, chunk_size=1, keep_trades=True))
+    assert len(rows) == len(frames) * len(SCRIPTS)
+    assert all("trades" in r for r in rows)
+    assert _collect(rows) == _expected(frames)
+
+
+def test_mappings_are_shared_with_workers(monkeypatch):
+    published = []
+    publish_source = SharedFrames.publish_source
+    monkeypatch.setattr(SharedFrames, "publish_source",
+                        lambda self, *a, **kw: published.append(1) or publish_source(self, *a, **kw))
+    frames = _universe(3)
+    assert _collect(run_universe(SCRIPTS, frames, max_workers=2)) == _expected(frames)
+    assert published == [1]
+
+    # a column that cannot be shared: the mapping is copied to the workers instead
+    for df in frames.values():
+        df["note"] = "x"
+    assert _collect(run_universe(SCRIPTS, frames, max_workers=2)) == _expected(frames)
+    with pytest.raises(TypeError):
+        list(run_universe(SCRIPTS, frames, max_workers=2, shared_memory=True))
@@ -0,0 +1,52 @@
+# tests/test_benchmarks.py
+import copy
+import json
+from benchmarks.synthetic import make_ohlcv, make_rules
+from benchmarks.run import run_suite, compare, main
+from nlp_to_dsl import nlp_to_dsl
+from parser import parse_dsl
+
+
+def test_synthetic_bars_are_deterministic_prefixes():
+    a = make_ohlcv(5000, seed=3)
+    assert a.equals(make_ohlcv(5000, seed=3))
+    assert make_ohlcv(1200, seed=3).equals(a.iloc[:1200])
+    assert not a.equals(make_ohlcv(5000, seed=4))
+    assert (a["high"] >= a[["open", "close"]].max(axis=1)).all()
+    assert (a["low"] <= a[["open", "close"]].min(axis=1)).all()
+
+
+def test_rule_corpus_parses():
+    for rule in make_rules(40):
+        parse_dsl(nlp_to_dsl(rule))
+
+
+def test_suite_report_and_compare(tmp_path):
+    report = run_suite(sizes=[500, 2000], stages=["parse_dsl", "compiled_signals", "run_backtest"],
+                       repeat=1, n_rules=20, loop_limit=1000)
+    json.dumps(report)
+    by_key = {(r["stage"], r["rows"]): r for r in report["results"]}
+    assert set(by_key) == {("parse_dsl", 20), ("compiled_signals", 500), ("compiled_signals", 2000),
+                           ("run_backtest", 500), ("run_backtest", 2000)}
+    assert "skipped" in by_key[("run_backtest", 2000)]
+    rec = by_key[("compiled_signals", 2000)]
+    assert rec["seconds"] > 0 and rec["rows_per_sec"] > 0 and rec["peak_bytes"] > 0
+
+    slower = copy.deepcopy(report)
+    for r in slower["results"]:
+        if r["stage"] == "parse_dsl":
+            r["seconds"] *= 2
+    flagged = {(r["stage"], r["rows"]) for r in compare(report, slower, threshold=0.5) if r["regression"]}
+    assert flagged == {("parse_dsl", 20)}
+
+    base, new = tmp_path / "base.json", tmp_path / "new.json"
+    base.write_text(json.dumps(report))
+    new.write_text(json.dumps(slower))
+    assert main(["--compare", str(base), str(base)]) == 0
+    assert main(["--compare", str(base), str(new), "--threshold", "0.5"]) == 1
+
+
+def test_chunked_evaluation_stays_within_its_slowdown_guard():
+    report = run_suite(sizes=[300_000], stages=["compiled_signals", "chunked_signals"], repeat=2)
+    rec = next(r for r in report["results"] if r["stage"] == "chunked_signals")
+    assert rec["slowdown"] > 0 and not rec["guard_exceeded"]
@@ -0,0 +1,85 @@
+# tests/test_bitsignals.py
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals, EvalMemo
+# generate_signals(packed=True) uses src.bitsignals; patch BLOCK there
+import src.bitsignals as bitsignals
+from src.bitsignals import BitSignal
+
+
+@pytest.mark.parametrize("n", [0, 1, 63, 64, 65, 1000])
+def test_algebra_matches_numpy(n):
+    rng = np.random.default_rng(n)
+    a, b = rng.random(n) < 0.5, rng.random(n) < 0.1
+    x, y = BitSignal.from_bool(a), BitSignal.from_bool(b)
+    assert (x.to_bool() == a).all() and len(x) == n
+    assert ((x & y).to_bool() == (a & b)).all()
+    assert ((x | y).to_bool() == (a | b)).all()
+    assert ((x ^ y).to_bool() == (a ^ b)).all()
+    assert ((~x).to_bool() == ~a).all() and (~x).count() == n - a.sum()
+    for fill in (False, True):
+        expected = np.concatenate(([fill], a[:-1])) if n else a
+        assert (x.shift(fill).to_bool() == expected).all()
+    assert x.count() == a.sum() and x.any() == a.any() and x.all() == a.all()
+    assert x.first() == (int(np.argmax(a)) if a.any() else -1)
+    assert (x.indices() == np.flatnonzero(a)).all()
+    assert BitSignal.from_indices(np.flatnonzero(b), n).equals(y)
+    assert BitSignal.full(n, True).count() == n and not BitSignal.full(n, False).any()
+    assert x.nbytes == 8 * ((n + 63) // 64)
+
+
+def _frame(n, seed=4):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    df = pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close,
+                       "volume": rng.integers(1, 10, n) * 100_000},
+                      index=pd.date_range("2020-01-01", periods=n, freq="h"))
+    # data gaps exercise the back-filled previous values of crossovers
+    df.iloc[rng.choice(n, n // 50, replace=False), df.columns.get_loc("close")] = np.nan
+    return df
+
+
+OPERANDS = ["close", "volume", "sma(close,5)", "ema(close,8)", "rsi(close,14)", "sma(close,5)@4h",
+            "30", "70", "100", "1000000"]
+
+
+def _predicate(rng):
+    left, right = rng.choice(OPERANDS), rng.choice(OPERANDS)
+    if rng.random() < 0.4:
+        return f"{left} {rng.choice(['crosses_above', 'crosses_below'])} {right}"
+    return f"{left} {rng.choice(['>', '<', '>=', '<=', '==', '!='])} {right}"
+
+
+def _expr(rng, depth=0):
+    if depth > 2 or rng.random() < 0.35:
+        return _predicate(rng)
+    return f"{_expr(rng, depth + 1)} {rng.choice(['AND', 'OR'])} {_expr(rng, depth + 1)}"
+
+
+def test_packed_signals_are_identical(monkeypatch):
+    monkeypatch.setattr(bitsignals, "BLOCK", 128)       # many blocks, partial last block
+    df = _frame(2_001)
+    rng = random.Random(3)
+    for _ in range(200):
+        dsl = f"ENTRY: {_expr(rng)} EXIT: {_expr(rng) if rng.random() < 0.9 else '0'}"
+        ast = parse_dsl(dsl)
+        packed = generate_signals(ast, df, packed=True)
+        pd.testing.assert_frame_equal(packed.to_frame(), generate_signals(ast, df), obj=dsl)
+
+
+def test_memory_and_short_circuit():
+    df = _frame(1_000_000)
+    ast = parse_dsl("ENTRY: close crosses_above sma(close,20) AND volume > 500000 "
+                    "EXIT: volume > 1000000000 AND rsi(close,14) > 70")
+    memo = EvalMemo()
+    packed = generate_signals(ast, df, memo=memo, packed=True)
+    dense = generate_signals(ast, df)
+    assert dense.memory_usage(index=False).sum() == 8 * packed.nbytes
+    assert packed.counts() == {"entry": int(dense["entry"].sum()), "exit": 0}
+    assert packed.entry.first() == int(np.argmax(dense["entry"].to_numpy()))
+    # the exit's volume filter is False everywhere, so rsi was never computed
+    assert not any(k[0] == "function" and k[1] == "rsi" for k in memo.values)
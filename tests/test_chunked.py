@@ -0,0 +1,91 @@
+# tests/test_chunked.py
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals, rsi, sma
+from chunked import ChunkedEvaluator, generate_signals_chunked, iter_blocks
+from columnar_store import ColumnStore
+
+SCRIPTS = [
+    "ENTRY: close > sma(close,20) AND volume > 1000000 EXIT: rsi(close,14) < 30",
+    "ENTRY: close crosses_above sma(close,10) EXIT: close crosses_below sma(close,10)",
+    "ENTRY: ema(close,5) crosses_above ema(close,20) EXIT: ema(close,3) crosses_below sma(close,50)",
+    "ENTRY: sma(close,5) > sma(close,20) OR rsi(close,7) >= 70 EXIT: close <= low",
+    "ENTRY: 0 EXIT: close != open",
+]
+
+
+@pytest.fixture
+def long_df():
+    rng = np.random.default_rng(11)
+    n = 1200
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    close[[400, 401, 402, 900]] = np.nan        # gaps exercise the carried state
+    return pd.DataFrame({
+        "open": close + rng.normal(0, 0.5, n),
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": rng.integers(500_000, 1_500_000, n),
+    }, index=pd.date_range("2020-01-01", periods=n, freq="min"))
+
+
+@pytest.mark.parametrize("dsl", SCRIPTS)
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 401, 5000])
+def test_stitched_blocks_match_full_run(dsl, chunk_size, long_df):
+    ast = parse_dsl(dsl)
+    blocks = list(generate_signals_chunked(ast, long_df, chunk_size=chunk_size))
+    assert max(len(b) for b in blocks) <= chunk_size
+    pd.testing.assert_frame_equal(pd.concat(blocks), generate_signals(ast, long_df))
+
+
+def test_tails_are_bounded_by_the_window():
+    # indicators carry their own state; only crossover operands keep one bar
+    assert sum(ChunkedEvaluator(parse_dsl(SCRIPTS[0])).tail_sizes) == 0
+    ev = ChunkedEvaluator(parse_dsl(SCRIPTS[1]))
+    assert sorted(ev.tail_sizes, reverse=True)[:2] == [1, 1] and sum(ev.tail_sizes) == 2
+
+
+@pytest.mark.parametrize("period", [1, 2, 20, 333])
+@pytest.mark.parametrize("chunk_size", [1, 7, 401])
+def test_sma_resumes_exactly(long_df, period, chunk_size):
+    close = long_df["close"].to_numpy().copy()
+    close[600:640] = close[600]                 # a run of one repeated value
+    close[700:705] = -0.0
+    sma_step = ChunkedEvaluator(parse_dsl(f"ENTRY: sma(close,{period}) > 0 EXIT: 0"))._filters[1]
+    values = [sma_step.run(close[i:i + chunk_size]) for i in range(0, len(close), chunk_size)]
+    np.testing.assert_array_equal(np.concatenate(values), sma(pd.Series(close), period).to_numpy())
+
+
+def test_ema_resumes_exactly(long_df):
+    ast = parse_dsl("ENTRY: ema(close,12) > 0 EXIT: 0")
+    ev = ChunkedEvaluator(ast)
+    values = []
+    for block, _ in iter_blocks(long_df, 250, ["close"]):
+        ev.push(block)
+        values.append(ev._filters[1].last)
+    full = long_df["close"].ewm(span=12, adjust=False).mean()
+    assert values[-1] == full.dropna().iloc[-1]
+
+
+def test_rsi_resumes_exactly(long_df):
+    state = ChunkedEvaluator(parse_dsl("ENTRY: rsi(close,14) > 50 EXIT: 0"))._filters[1]
+    values = [state.run(block["close"]) for block, _ in iter_blocks(long_df, 9, ["close"])]
+    np.testing.assert_array_equal(np.concatenate(values), rsi(long_df["close"], 14).to_numpy())
+
+
+def test_blocks_from_memory_maps_and_readers(tmp_path, long_df):
+    ast = parse_dsl(SCRIPTS[1])
+    store = ColumnStore(tmp_path / "store")
+    store.write("AAA", long_df)
+    expected = generate_signals(ast, long_df)
+
+    mapped = pd.concat(generate_signals_chunked(ast, store.columns("AAA"), chunk_size=500))
+    np.testing.assert_array_equal(mapped.to_numpy(), expected.to_numpy())
+
+    long_df.to_csv(tmp_path / "AAA.csv")
+    reader = pd.read_csv(tmp_path / "AAA.csv", index_col=0, parse_dates=True,
+                         float_precision="round_trip", chunksize=400)
+    streamed = pd.concat(generate_signals_chunked(ast, reader))
+    np.testing.assert_array_equal(streamed.to_numpy(), expected.to_numpy())
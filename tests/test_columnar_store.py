@@ -0,0 +1,124 @@
+# tests/test_columnar_store.py
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals
+from compiler import compile_script
+from backtest import run_backtest
+from batch import run_universe
+from columnar_store import ColumnStore
+
+DSL = "ENTRY: close crosses_above sma(close,10) AND volume > 300000 EXIT: rsi(close,14) > 70"
+
+
+def _frame(n=400, seed=0, **index_kw):
+    rng = np.random.default_rng(seed)
+    close = 50 + np.cumsum(rng.normal(0, 1, n))
+    index = pd.date_range("2024-01-01", periods=n, freq="min", **index_kw)
+    return pd.DataFrame({
+        "open": close, "high": close + 1, "low": close - 1, "close": close,
+        "volume": rng.integers(1, 10, n) * 100_000,
+    }, index=index)
+
+
+def _is_mapped(array):
+    base = array
+    while isinstance(base, np.ndarray):
+        base = base.base
+    return isinstance(base, mmap.mmap)
+
+
+def test_round_trip_is_exact_and_memory_mapped(tmp_path):
+    df = _frame()
+    store = ColumnStore(tmp_path)
+    store.write("AAA", df)
+
+    cols = store.columns("AAA")
+    assert all(isinstance(a, np.memmap) and not a.flags.writeable for a in cols.values())
+    loaded = store.load("AAA")
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+    # the DataFrame is a view over the maps, not a private copy
+    assert all(_is_mapped(loaded[c].to_numpy()) for c in loaded.columns)
+
+
+def test_metadata_survives_reopen(tmp_path):
+    store = ColumnStore(tmp_path)
+    store.write("AAA", _frame(seed=1))
+    store.write("BBB", _frame(50, seed=2, tz="UTC").reset_index(drop=True))
+
+    reopened = ColumnStore(tmp_path)
+    assert reopened.symbols() == ["AAA", "BBB"]
+    assert reopened.info("AAA")["rows"] == 400
+    assert reopened.info("BBB")["index"] == {"kind": "range"}
+    assert isinstance(reopened.load("BBB").index, pd.RangeIndex)
+    with pytest.raises(KeyError):
+        reopened.columns("CCC")
+
+    # a rewrite changes the symbol's version, the other symbols keep theirs
+    versions = {s: reopened.version(s) for s in ("AAA", "BBB")}
+    store.write("AAA", _frame(300, seed=3))
+    assert reopened.version("AAA") != versions["AAA"] and reopened.version("BBB") == versions["BBB"]
+    assert reopened.version("CCC") is None
+
+
+def test_timezone_index(tmp_path):
+    df = _frame(20, tz="America/New_York")
+    store = ColumnStore(tmp_path)
+    store.write("TZ", df)
+    pd.testing.assert_index_equal(store.index("TZ"), df.index, exact=False)
+
+
+def test_timezone_index_across_dst_changes(tmp_path):
+    store = ColumnStore(tmp_path)
+    for start in ("2024-11-02 22:00", "2024-03-09 22:00"):     # fall-back and spring-forward
+        df = _frame(12 * 60, seed=4).set_index(pd.date_range(start, periods=12 * 60, freq="min", tz="UTC")
+                                               .tz_convert("America/New_York"))
+        store.write("NY", df)
+        loaded = ColumnStore(tmp_path).load("NY")
+        pd.testing.assert_index_equal(loaded.index, df.index, exact=False)
+        assert str(loaded.index.tz) == "America/New_York"
+
+
+def test_signals_and_backtest_from_store(tmp_path):
+    df = _frame(seed=3)
+    store = ColumnStore(tmp_path)
+    store.write("AAA", df)
+    ast = parse_dsl(DSL)
+
+    expected = generate_signals(ast, df)
+    pd.testing.assert_frame_equal(generate_signals(ast, store.load("AAA")), expected, check_freq=False)
+    entry, exit_ = compile_script(ast).evaluate(store.columns("AAA", ["close", "volume"]))
+    np.testing.assert_array_equal(entry, expected["entry"].to_numpy())
+    np.testing.assert_array_equal(exit_, expected["exit"].to_numpy())
+    assert run_backtest(store.load("AAA"), expected) == run_backtest(df, expected)
+
+
+def test_store_is_a_batch_source(tmp_path):
+    store = ColumnStore(tmp_path)
+    for k in range(3):
+        store.write(f"SYM{k}", _frame(seed=k))
+    rows = list(run_universe([DSL], store, max_workers=2))
+    assert sorted(r["symbol"] for r in rows) == ["SYM0", "SYM1", "SYM2"]
+    for r in rows:
+        df = store.load(r["symbol"])
+        res = run_backtest(df, generate_signals(parse_dsl(DSL), df))
+        assert r["total_return"] == res["total_return"]
+
+
+def _write_symbols(args):
+    root, worker = args
+    store = ColumnStore(root)
+    for k in range(5):
+        store.write(f"W{worker}_{k}", _frame(30, seed=k))
+    return worker
+
+
+def test_concurrent_writers_keep_every_symbol(tmp_path):
+    ColumnStore(tmp_path)
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_write_symbols, [(tmp_path, w) for w in range(8)]))
+    assert ColumnStore(tmp_path).symbols() == sorted(f"W{w}_{k}" for w in range(8) for k in range(5))
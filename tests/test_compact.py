@@ -0,0 +1,98 @@
+# tests/test_compact.py
+import sys
+
+import numpy as np
+import pandas as pd
+from parser import parse_dsl
+from codegen import generate_signals, sma, ema, rsi
+from backtest import run_backtest, run_backtest_arrays
+# compact_signals checks for src.compiler.CompiledScript
+from src.compiler import compile_script
+from compact import PackedSignals, compact_columns, compact_signals, run_backtest_compact
+
+DSL = ("ENTRY: close crosses_above sma(close,20) AND rsi(close,14) < 60 AND volume > 300000 "
+       "EXIT: close crosses_below ema(close,10) OR rsi(close,14) > 75")
+
+
+def _bars(n=200_000, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({"open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+                         "volume": rng.integers(1, 10, n) * 100_000},
+                        index=pd.date_range("2000-01-01", periods=n, freq="min"))
+
+
+def test_pack_round_trip():
+    rng = np.random.default_rng(0)
+    entry, exit_ = rng.random(1001) < 0.3, rng.random(1001) < 0.1
+    packed = PackedSignals.pack(entry, exit_)
+    e, x = packed.unpack()
+    assert (e == entry).all() and (x == exit_).all()
+    assert packed.nbytes == 2 * 16 * 8             # 1001 bars: 16 words of 64 bars
+    assert packed.counts() == {"entry": int(entry.sum()), "exit": int(exit_.sum())}
+
+
+def test_deviation_from_float64_is_bounded():
+    df = _bars()
+    ast = parse_dsl(DSL)
+    expected = generate_signals(ast, df)
+    packed = compact_signals(ast, df)
+
+    # indicators: float32 rounding only, not accumulated drift
+    close32 = pd.Series(compact_columns(df)["close"])
+    for fn, period in ((sma, 20), (ema, 10), (rsi, 14)):
+        ref = fn(df["close"], period).to_numpy()
+        got = fn(close32, period).to_numpy().astype(np.float32)
+        ok = ~np.isnan(ref)
+        assert (np.isnan(got) == ~ok).all()
+        if fn is rsi:
+            # bar-to-bar differences amplify the price rounding; still far below 0.01 RSI points
+            assert np.max(np.abs(got[ok] - ref[ok])) < 1e-3
+        else:
+            assert np.max(np.abs(got[ok] - ref[ok]) / np.abs(ref[ok])) < 1e-6
+
+    # signals flip only on near-ties: a handful of bars out of 200k
+    entry, exit_ = packed.unpack()
+    flips = (entry != expected["entry"].to_numpy()).sum() + (exit_ != expected["exit"].to_numpy()).sum()
+    assert flips <= 10
+
+    # same signals, float32 prices: pnl deviates by price rounding only
+    ref = run_backtest(df.iloc[:20_000], expected.iloc[:20_000])
+    got = run_backtest_compact(df.iloc[:20_000], PackedSignals.pack(expected["entry"].to_numpy()[:20_000],
+                                                                    expected["exit"].to_numpy()[:20_000]))
+    assert got["number_of_trades"] == ref["number_of_trades"]
+    assert isinstance(got["equity_curve"], np.ndarray) and got["equity_curve"].dtype == np.float64
+    np.testing.assert_allclose(got["equity_curve"], ref["equity_curve"], atol=1e-4 * len(ref["trades"]))
+    assert abs(got["total_return"] - ref["total_return"]) < 1e-4 * len(ref["trades"])
+
+
+def test_memory_reduction():
+    df = _bars()
+    n = len(df)
+    ast = parse_dsl(DSL)
+    expected = generate_signals(ast, df)
+    packed = compact_signals(ast, df)
+    columns = compact_columns(df, ["close", "volume"])
+
+    # inputs: 4 bytes per value instead of 8
+    assert sum(a.nbytes for a in columns.values()) * 2 == df[["close", "volume"]].memory_usage(index=False).sum()
+    # signals: 1 bit per bar instead of 1 byte
+    assert expected.memory_usage(index=False).sum() == 2 * n
+    assert packed.nbytes == 2 * ((n + 63) // 64) * 8
+    # equity curve: one float64 buffer instead of a list of boxed floats (~4x)
+    listed = run_backtest_arrays(df["close"].to_numpy(), *packed.unpack(), df.index)["equity_curve"]
+    array = run_backtest_compact(df, packed)["equity_curve"]
+    list_bytes = sys.getsizeof(listed) + sum(sys.getsizeof(v) for v in listed)
+    assert array.nbytes * 3 < list_bytes
+
+
+def test_timeframes_and_plain_mappings():
+    df = _bars(5_000)
+    ast = parse_dsl("ENTRY: close > sma(close,5)@1h EXIT: close < sma(close,3)@1h")
+    expected = generate_signals(ast, df)
+    pd.testing.assert_frame_equal(compact_signals(ast, df).to_frame(), expected)
+
+    plan = compile_script(parse_dsl(DSL))
+    from_mapping = compact_signals(plan, compact_columns(df))
+    assert from_mapping.index is None
+    assert from_mapping.entry.equals(compact_signals(plan, df).entry)
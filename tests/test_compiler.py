@@ -0,0 +1,95 @@
+# tests/test_compiler.py
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals, generate_signal_function
+from compiler import compile_script
+
+SCRIPTS = [
+    "ENTRY: close > sma(close,20) AND volume > 1000000 EXIT: rsi(close,14) < 30",
+    "ENTRY: close crosses_above sma(close,10) EXIT: close crosses_below sma(close,10)",
+    "ENTRY: sma(close,5) > sma(close,20) OR rsi(close,7) >= 70 EXIT: close <= low",
+    "ENTRY: 0 EXIT: close != open",
+]
+
+
+@pytest.fixture
+def random_df():
+    rng = np.random.default_rng(7)
+    n = 300
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        "open": close + rng.normal(0, 0.5, n),
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": rng.integers(500_000, 1_500_000, n),
+    }, index=pd.date_range("2024-01-01", periods=n, freq="D"))
+
+
+@pytest.mark.parametrize("dsl", SCRIPTS)
+def test_compiled_matches_eval_node(dsl, random_df):
+    ast = parse_dsl(dsl)
+    expected = generate_signals(ast, random_df)
+    compiled = compile_script(ast)
+    pd.testing.assert_frame_equal(compiled(random_df), expected)
+
+
+def test_compiled_function_is_reusable(random_df, sample_df):
+    fn = generate_signal_function(parse_dsl(SCRIPTS[0]))
+    for df in (random_df, sample_df, random_df.iloc[50:]):
+        pd.testing.assert_frame_equal(fn(df), generate_signals(parse_dsl(SCRIPTS[0]), df))
+
+
+def test_evaluate_on_plain_arrays(random_df):
+    compiled = compile_script(parse_dsl(SCRIPTS[1]))
+    assert compiled.columns == ["close"]
+    entry, exit_ = compiled.evaluate({"close": random_df["close"].to_numpy()})
+    expected = generate_signals(parse_dsl(SCRIPTS[1]), random_df)
+    assert entry.dtype == bool and exit_.dtype == bool
+    np.testing.assert_array_equal(entry, expected["entry"].to_numpy())
+    np.testing.assert_array_equal(exit_, expected["exit"].to_numpy())
+
+
+CROSS_BOTH = """
+ENTRY: sma(close,20) crosses_above sma(close,50) AND volume > 1000000
+EXIT: sma(close,20) crosses_below sma(close,50) OR volume > 1000000
+"""
+
+
+def test_eval_memo_counts_shared_subtrees(random_df, monkeypatch):
+    import codegen
+    calls = []
+    real_sma = codegen.sma
+    monkeypatch.setattr(codegen, "sma", lambda s, p: calls.append(p) or real_sma(s, p))
+
+    memo = codegen.EvalMemo()
+    signals = codegen.generate_signals(parse_dsl(CROSS_BOTH), random_df, memo)
+    assert sorted(calls) == [20, 50]
+    # sma20, sma50 and the volume comparison are reused by EXIT
+    assert memo.hits == 3
+    assert memo.misses == 7
+    assert signals["entry"].dtype == bool
+
+
+def test_eval_memo_is_bound_to_one_frame(random_df):
+    import codegen
+    ast = parse_dsl(CROSS_BOTH)
+    memo = codegen.EvalMemo()
+    codegen.generate_signals(ast, random_df, memo)
+    compile_script(ast).evaluate(random_df, memo)          # the same frame: served from the memo
+    other = random_df * 2
+    with pytest.raises(ValueError, match="another frame"):
+        codegen.generate_signals(ast, other, memo)
+    with pytest.raises(ValueError, match="another frame"):
+        compile_script(ast).evaluate(other, memo)
+
+
+def test_compiled_plan_shares_steps(random_df):
+    compiled = compile_script(parse_dsl(CROSS_BOTH))
+    ops = [s.op for s in compiled.steps]
+    assert ops.count("sma") == 2
+    assert ops.count("field") == 2
+    assert compiled.cse_stats["hits"] > 0
+    pd.testing.assert_frame_equal(compiled(random_df), generate_signals(parse_dsl(CROSS_BOTH), random_df))
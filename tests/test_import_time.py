@@ -0,0 +1,47 @@
+# tests/test_import_time.py
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# cumulative microseconds reported by `python -X importtime`; generous enough for
+# a cold, bytecode-less run, far below what importing lark or pandas costs
+IMPORT_BUDGET_US = 60_000
+HEAVY = ("lark", "pandas", "numpy")
+
+
+def _importtime(module):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue   # header line
+    return times
+
+
+@pytest.mark.parametrize("module", ["src.parser", "src.nlp_to_dsl", "src.strategy_store"])
+def test_import_stays_cheap(module):
+    times = _importtime(module)
+    loaded = {name.split(".")[0] for name in times}
+    assert not loaded & set(HEAVY), f"{module} pulls in {sorted(loaded & set(HEAVY))}"
+    assert times[module] < IMPORT_BUDGET_US
+
+
+def test_backtest_does_not_need_pandas():
+    assert "pandas" not in {name.split(".")[0] for name in _importtime("src.backtest")}
+
+
+def test_shipped_tables_match_grammar():
+    from src import _dsl_parser
+    from src.parser import grammar_hash, get_parser
+    assert _dsl_parser.GRAMMAR_SHA256 == grammar_hash(), "run src.parser.build_standalone()"
+    assert type(get_parser()).__module__ == "src._dsl_parser"
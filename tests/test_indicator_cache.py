@@ -0,0 +1,122 @@
+# tests/test_indicator_cache.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from parser import parse_dsl
+from codegen import generate_signals
+from src.indicator_cache import IndicatorCache, DiskMemo
+
+SCRIPT = ("ENTRY: close > sma(close,20) AND rsi(close,14) < 60 "
+          "EXIT: close crosses_below ema(sma(close,5),10)")
+
+
+def _frame(n, seed=7, symbol="AAA"):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    df = pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close,
+                       "volume": rng.integers(1, 10, n) * 100_000},
+                      index=pd.date_range("2020-01-01", periods=n, freq="h"))
+    df.attrs["symbol"] = symbol
+    return df
+
+
+def _same(a, b):
+    return a["entry"].equals(b["entry"]) and a["exit"].equals(b["exit"])
+
+
+def test_second_run_loads_from_disk(tmp_path):
+    ast, df = parse_dsl(SCRIPT), _frame(500)
+    expected = generate_signals(ast, df)
+
+    cold = IndicatorCache(tmp_path)
+    assert _same(generate_signals(ast, df, memo=DiskMemo(df, cold)), expected)
+    assert cold.stats["misses"] == 4 and cold.stats["hits"] == 0
+
+    warm = IndicatorCache(tmp_path)           # a later run: nothing in memory
+    assert _same(generate_signals(ast, df, memo=DiskMemo(df, warm)), expected)
+    assert warm.stats["misses"] == 0 and warm.stats["hits"] == 4
+
+    # other data, same indicators: new entries
+    other = _frame(500, seed=8)
+    fresh = IndicatorCache(tmp_path)
+    assert _same(generate_signals(ast, other, memo=DiskMemo(other, fresh)), generate_signals(ast, other))
+    assert fresh.stats["hits"] == 0
+
+
+def test_grown_history_is_extended(tmp_path):
+    ast, full = parse_dsl(SCRIPT), _frame(800)
+    cache = IndicatorCache(tmp_path)
+    head = full.iloc[:600]
+    generate_signals(ast, head, memo=DiskMemo(head, cache))
+
+    memo = DiskMemo(full, cache)
+    assert _same(generate_signals(ast, full, memo=memo), generate_signals(ast, full))
+    # ema and rsi resume from their saved state; the two smas are recomputed
+    assert cache.stats["extended"] == 2 and cache.stats["misses"] == 6
+
+    plain = {}
+    generate_signals(ast, full, memo=type("M", (), {"lookup": lambda s, k, c: plain.setdefault(k, c())})())
+    for key, value in memo.values.items():
+        if key[0] == "function":
+            assert np.array_equal(value.to_numpy(), plain[key].to_numpy(), equal_nan=True)
+
+    # a revised history (not a prefix any more) is recomputed
+    revised = full.copy()
+    revised.iloc[10, revised.columns.get_loc("close")] += 1.0
+    revised.attrs["symbol"] = "AAA"
+    cache.stats.update(extended=0, misses=0)
+    assert _same(generate_signals(ast, revised, memo=DiskMemo(revised, cache)), generate_signals(ast, revised))
+    assert cache.stats["extended"] == 0 and cache.stats["misses"] == 4
+
+
+def test_version_key_and_corrupt_entries(tmp_path):
+    ast, df = parse_dsl(SCRIPT), _frame(300)
+    cache = IndicatorCache(tmp_path)
+    generate_signals(ast, df, memo=DiskMemo(df, cache, version="v1"))
+    generate_signals(ast, df, memo=DiskMemo(df, cache, version="v1"))
+    # the outer ema is served by version, so its inner sma is not even needed
+    assert cache.stats["hits"] == 3
+
+    for p in tmp_path.glob("*.pkl"):
+        p.write_bytes(b"not a pickle")
+    cache.stats.update(hits=0, misses=0)
+    assert _same(generate_signals(ast, df, memo=DiskMemo(df, cache, version="v1")), generate_signals(ast, df))
+    assert cache.stats["hits"] == 0 and cache.stats["misses"] == 4
+
+
+def test_lru_eviction(tmp_path):
+    df = _frame(2000)
+    cache = IndicatorCache(tmp_path)
+    generate_signals(parse_dsl("ENTRY: close > sma(close,5) EXIT: close < sma(close,5)"), df,
+                     memo=DiskMemo(df, cache))
+    entry_size = max(p.stat().st_size for p in tmp_path.glob("*.pkl"))
+
+    cache = IndicatorCache(tmp_path, max_bytes=3 * entry_size)
+    for period in range(6, 12):
+        ast = parse_dsl(f"ENTRY: close > sma(close,{period}) EXIT: close < sma(close,5)")
+        generate_signals(ast, df, memo=DiskMemo(df, cache))
+    info = cache.info()
+    assert info["bytes"] <= 3 * entry_size and info["evicted"] > 0
+    # sma(close,5) is hit on every run, so it is never the least recently used
+    assert cache.stats["hits"] == 6
+
+
+def _run(args):
+    root, seed = args
+    df = _frame(400, seed=seed % 2)
+    memo = DiskMemo(df, IndicatorCache(root))
+    signals = generate_signals(parse_dsl(SCRIPT), df, memo=memo)
+    return os.getpid(), int(signals["entry"].sum()), int(signals["exit"].sum())
+
+
+def test_concurrent_processes(tmp_path):
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(_run, [(tmp_path, k) for k in range(16)]))
+    for seed in (0, 1):
+        df = _frame(400, seed=seed)
+        signals = generate_signals(parse_dsl(SCRIPT), df)
+        expected = (int(signals["entry"].sum()), int(signals["exit"].sum()))
+        assert {r[1:] for r in results[seed::2]} == {expected}
+    assert not list(tmp_path.glob(".*.tmp"))
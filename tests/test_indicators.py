@@ -30,3 +30,48 @@ def test_rsi_shape(sample_df):
     """)
     signals = cg.generate_signals_from_ast(ast, sample_df)
     assert "entry" in signals.columns
+
+# Wilder's worked example (StockCharts, 14-period RSI)
+WILDER_CLOSES = [44.3389, 44.0902, 44.1497, 43.6124, 44.3278, 44.8264, 45.0955, 45.4245, 45.8433,
+                 46.0826, 45.8931, 46.0328, 45.6140, 46.2820, 46.2820, 46.0028, 46.0328, 46.4116,
+                 46.2222, 45.6439, 46.2122, 46.2521, 45.7137, 46.4515, 45.7835, 45.3548, 44.0288,
+                 44.1783, 44.2181, 44.5672, 43.4205, 42.6628, 43.1314]
+WILDER_RSI = [70.53, 66.32, 66.55, 69.41, 66.36, 57.97, 62.93, 63.26, 56.06, 62.38,
+              54.71, 50.42, 39.99, 41.46, 41.87, 45.46, 37.30, 33.08, 37.77]
+
+
+def test_rsi_reference_values():
+    from codegen import rsi
+    out = rsi(pd.Series(WILDER_CLOSES), 14)
+    assert out.iloc[:14].isna().all()
+    assert [round(v, 2) for v in out.iloc[14:]] == WILDER_RSI
+
+
+def test_rsi_edge_cases():
+    from codegen import rsi
+    assert rsi(pd.Series([1.0, 2, 3, 4, 5]), 2).iloc[-1] == 100
+    assert rsi(pd.Series([5.0, 4, 3, 2, 1]), 2).iloc[-1] == 0
+    assert rsi(pd.Series([3.0] * 5), 2).iloc[-1] == 50
+
+
+def test_ema_matches_recurrence():
+    from codegen import ema
+    x = [float(v) for v in WILDER_CLOSES]
+    alpha = 2 / (10 + 1)
+    expected = [x[0]]
+    for v in x[1:]:
+        expected.append(alpha * v + (1 - alpha) * expected[-1])
+    out = ema(pd.Series(x), 10)
+    assert out.iloc[:9].isna().all()
+    assert all(abs(a - b) < 1e-12 for a, b in zip(out.iloc[9:], expected[9:]))
+
+
+def test_ema_crossover_signals(sample_df):
+    from compiler import compile_script
+    df = sample_df.copy()
+    df["close"] = [50 - i for i in range(25)] + [26 + 2 * i for i in range(25)]    # V shape
+    ast = parse_dsl("ENTRY: ema(close,3) crosses_above ema(close,8) EXIT: ema(close,3) crosses_below ema(close,8)")
+    signals = generate_signals_from_ast(ast, df)
+    assert signals["entry"].sum() == 1 and signals["exit"].sum() == 0
+    assert signals.index[signals["entry"]][0] > df.index[24]
+    assert compile_script(ast)(df).equals(signals)
@@ -0,0 +1,58 @@
+# tests/test_nl_json.py
+import random
+
+import pytest
+from nl_json import nl_to_json, nl_to_json_reference
+from benchmarks.synthetic import make_rules
+from benchmarks.run import run_suite
+
+SENTENCES = [
+    "Buy when price > SMA(close, 20) and volume > 1,000,000",
+    "Buy when the close price is above the 20-day moving average and volume is above 1 million.",
+    "Enter when price crosses above yesterday's high.",
+    "Exit when RSI(close,14) is below 30.",
+    "Trigger entry when volume increases by more than 30% compared to last week.",
+    "sell when sma(close,5) crosses_below sma(close,20)",
+    "rsi(close,14) < 30 and close > sma(close,50)",
+    "Buy when it looks good",
+]
+
+WORDS = ["buy", "sell", "exit", "when", "close", "Price", "open", "high", "low", "volume", "is",
+         "above", "below", "over", "under", ">", "<", ">=", "==", "greater than", "crosses",
+         "crosses_above", "SMA(close,20)", "rsi(close, 14)", "20-day moving average", "the", "and",
+         "30", "1.5", "1M", "30%", "increases by more than", "last week", "yesterday's", "x", "(", ","]
+
+
+def _outcome(fn, text):
+    try:
+        return fn(text)
+    except Exception as e:        # the reference's crashes must be reproduced too
+        return type(e)
+
+
+def test_schema_shapes():
+    cross = nl_to_json("Enter when price crosses above yesterday's high.")["entry"][0]
+    assert cross == {"type": "cross", "dir": "above", "left": {"type": "field", "name": "close"},
+                     "right": {"type": "yesterday_field", "name": "high"}}
+    vol = nl_to_json("Trigger entry when volume increases by more than 30% compared to last week.")["entry"][0]
+    assert vol["right"]["type"] == "binary_expr" and vol["right"]["left"] == 1.3
+    assert nl_to_json("Exit when it looks bad")["exit"] == [{"type": "raw_clause", "text": "Exit when it looks bad"}]
+
+
+@pytest.mark.parametrize("text", SENTENCES)
+def test_matches_reference_on_examples(text):
+    assert nl_to_json(text) == nl_to_json_reference(text)
+
+
+def test_matches_reference_on_corpus_and_fuzz():
+    for text in make_rules(200):
+        assert nl_to_json(text) == nl_to_json_reference(text)
+    rnd = random.Random(0)
+    for _ in range(3000):
+        text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 10)))
+        assert _outcome(nl_to_json, text) == _outcome(nl_to_json_reference, text), text
+
+
+def test_benchmark_stage():
+    report = run_suite(stages=["nl_to_json", "nl_to_json_reference"], repeat=1, n_rules=50)
+    assert {r["stage"] for r in report["results"]} == {"nl_to_json", "nl_to_json_reference"}
@@ -0,0 +1,76 @@
+# tests/test_nlp_batch.py
+import random
+import pytest
+from nlp_to_dsl import nlp_to_dsl
+from nlp_batch import nlp_to_dsl_fast, nlp_to_dsl_batch, nl_cache_info, clear_nl_cache
+
+# every rule quoted in the README, valid or not
+README_RULES = [
+    "Buy when price closes above the 20-day moving average and volume is above 1M.",
+    "Buy when price is above 50",
+    "Buy when price closes above 20-day moving average and volume is above 1M. Exit when RSI(14) goes below 40.",
+    "Buy when price is above 100",
+    "Buy when price is above 20-day SMA",
+    "Buy when price closes above the 20-day moving average and volume is above 1M",
+    "Buy when price is above 50-day moving average",
+    "Exit when RSI(14) goes below 40",
+    "Exit when price is below 100",
+    "Buy when RSI(14) is above 60",
+    "Buy when above 50",
+    "Exit when lower than 30",
+    "Buy if the market seems strong",
+    "Sell when it looks weak",
+    "Buy whenever it feels right. Exit when appropriate.",
+    "price skyrockets above 100",
+    "SMA(20day)",
+    "RS 14",
+    "cloose > 50",
+    "Buy when price is above 50. Exit when price falls below 45.",
+    "Enter when volume is above 500k and price is above 2.5 million",
+]
+
+VOCAB = ["buy", "when", "price", "close", "closes above", "is above", "above", "below", "falls below",
+         "drops below", "sell", "exit", "the", "and", "and also", "sma", "sma(", "RSI(14)", "rsi", "14",
+         "20", "200", "day", "-day", "day moving average", "day sma", "1m", "1M", "2.5 million",
+         "million", "500k", "1.5k", ".", "\n", "(", ")", "volume", "is", "long", "stop", "k", "m", "3.", "0"]
+
+
+@pytest.mark.parametrize("rule", README_RULES)
+def test_readme_examples_identical(rule):
+    assert nlp_to_dsl_fast(rule) == nlp_to_dsl(rule)
+
+
+@pytest.mark.parametrize("rule", [
+    "buy when 5 day 20 day moving average is above 3",     # pass output rewritten by a later pass
+    "buy when volume is above 5k million",
+    "buy when volume is above 500k.1m",
+])
+def test_sequential_only_inputs(rule):
+    assert nlp_to_dsl_fast(rule) == nlp_to_dsl(rule)
+
+
+def test_random_phrases_identical():
+    rng = random.Random(1)
+    for _ in range(5000):
+        text = "".join(rng.choice(VOCAB) + rng.choice(["", " ", " ", "-"]) for _ in range(rng.randint(1, 12)))
+        try:
+            expected = nlp_to_dsl(text)
+        except ValueError:
+            with pytest.raises(ValueError):
+                nlp_to_dsl_fast(text)
+            continue
+        assert nlp_to_dsl_fast(text) == expected, text
+
+
+def test_batch_memoizes_repeats():
+    clear_nl_cache()
+    rules = README_RULES * 10
+    assert nlp_to_dsl_batch(rules) == [nlp_to_dsl(r) for r in rules]
+    info = nl_cache_info()
+    assert info.misses == len(set(README_RULES))
+    assert info.hits == len(rules) - info.misses
+
+
+def test_empty_input_raises():
+    with pytest.raises(ValueError):
+        nlp_to_dsl_batch(["buy when price is above 5", ""])
@@ -0,0 +1,93 @@
+# tests/test_optimizer.py
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals, EvalMemo
+from compiler import compile_script
+from optimizer import optimize_script, estimate_cost
+
+
+@pytest.fixture(scope="module")
+def df():
+    rng = np.random.default_rng(2)
+    n = 1_500
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close,
+                         "volume": rng.integers(1, 10, n) * 100_000},
+                        index=pd.date_range("2020-01-01", periods=n, freq="h"))
+
+
+def _text(node):
+    return optimize_script(parse_dsl(f"ENTRY: {node} EXIT: 0")).entry.to_dict()
+
+
+def test_folding_and_pruning():
+    assert _text("1 > 2") == {"type": "number", "value": 0.0}
+    assert _text("2 >= 2 AND close > 5") == parse_dsl("ENTRY: close > 5").entry.to_dict()
+    assert _text("1 > 2 AND rsi(close,14) < 30") == {"type": "number", "value": 0.0}
+    assert _text("close > 5 OR 3 > 1") == {"type": "number", "value": 1.0}
+    assert _text("sma(close,5) > sma(close,5) OR close > 5") == parse_dsl("ENTRY: close > 5").entry.to_dict()
+    assert _text("close crosses_above close") == {"type": "number", "value": 0.0}
+    assert _text("close > 5 AND close > 5") == parse_dsl("ENTRY: close > 5").entry.to_dict()
+    # `!=` is True exactly where a value is NaN, so it is not decided
+    assert _text("sma(close,5) != sma(close,5)")["type"] == "compare"
+
+    ast = parse_dsl("ENTRY: 0 EXIT: 0")
+    assert optimize_script(ast).to_dict() == ast.to_dict()
+
+
+def test_cheap_operands_run_first_and_short_circuit(df):
+    ast = optimize_script(parse_dsl("ENTRY: rsi(close,14) < 30 AND close crosses_above sma(close,50) AND volume > 1000000000 EXIT: 0"))
+    chain = []
+    node = ast.entry
+    while node.to_dict()["type"] == "bool":
+        chain.append(node.right)
+        node = node.left
+    chain.append(node)
+    costs = [estimate_cost(n) for n in reversed(chain)]
+    assert costs == sorted(costs) and chain[-1].to_dict()["left"] == {"type": "field", "name": "volume"}
+
+    # volume never exceeds 1e9: neither the cross nor rsi is evaluated
+    memo = EvalMemo()
+    signals = generate_signals(ast, df, memo=memo)
+    assert not signals["entry"].any()
+    assert not any(k[0] == "function" for k in memo.values)
+    # the compiled plan skips them too
+    memo = EvalMemo()
+    entry, _ = compile_script(ast).evaluate(df, memo=memo)
+    assert not entry.any() and not memo.values
+
+
+OPERANDS = ["close", "volume", "sma(close,5)", "ema(close,8)", "rsi(close,14)", "sma(close,5)@4h",
+            "1", "2", "30", "70", "100", "1000000"]
+
+
+def _predicate(rng):
+    left, right = rng.choice(OPERANDS), rng.choice(OPERANDS)
+    if rng.random() < 0.25:
+        return f"{left} {rng.choice(['crosses_above', 'crosses_below'])} {right}"
+    return f"{left} {rng.choice(['>', '<', '>=', '<=', '==', '!='])} {right}"
+
+
+def _expr(rng, depth=0):
+    if depth > 2 or rng.random() < 0.35:
+        return _predicate(rng)
+    return f"{_expr(rng, depth + 1)} {rng.choice(['AND', 'OR'])} {_expr(rng, depth + 1)}"
+
+
+def test_signals_are_identical(df):
+    rng = random.Random(7)
+    changed = 0
+    for _ in range(300):
+        dsl = f"ENTRY: {_expr(rng)} EXIT: {_expr(rng) if rng.random() < 0.8 else rng.choice(['0', '1'])}"
+        ast = parse_dsl(dsl)
+        optimized = parse_dsl(dsl, optimize=True)
+        changed += optimized.key() != ast.key()
+        expected = generate_signals(ast, df)
+        pd.testing.assert_frame_equal(generate_signals(optimized, df), expected)
+        pd.testing.assert_frame_equal(compile_script(optimized)(df), expected)
+        pd.testing.assert_frame_equal(compile_script(ast)(df), expected)
+    assert changed > 100
@@ -0,0 +1,78 @@
+# tests/test_panel.py
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals
+from backtest import run_backtest_arrays, position_state
+from src.panel import Panel, panel_signals, run_panel
+
+SCRIPTS = [
+    "ENTRY: close > sma(close,20) AND rsi(close,14) < 60 EXIT: close < sma(close,20)",
+    "ENTRY: close crosses_above ema(close,10) EXIT: close crosses_below ema(close,10) OR rsi(close,7) > 75",
+    "ENTRY: ema(sma(close,5),8) crosses_above sma(close,30) EXIT: volume > 600000",
+    "ENTRY: rsi(close,14) crosses_below 30 EXIT: 1",
+]
+
+
+def _frames(n_symbols=6, n=400):
+    index = pd.date_range("2023-01-02", periods=n, freq="h")
+    frames = {}
+    for k in range(n_symbols):
+        rng = np.random.default_rng(k)
+        close = 50 + np.cumsum(rng.normal(0, 1, n))
+        if k % 3 == 1:
+            close[:37] = np.nan          # listed later
+        if k % 3 == 2:
+            close[[100, 101, 250]] = np.nan   # gaps
+        frames[f"S{k}"] = pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close,
+                                        "volume": rng.integers(1, 10, n) * 100_000}, index=index)
+    return frames
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+def test_signals_match_per_symbol(script):
+    frames = _frames()
+    signals = panel_signals(script, Panel.from_frames(frames))
+    ast = parse_dsl(script)
+    for symbol, df in frames.items():
+        expected = generate_signals(ast, df)
+        got = signals.frame(symbol)
+        assert got["entry"].equals(expected["entry"]) and got["exit"].equals(expected["exit"]), symbol
+
+
+def test_metrics_match_per_symbol():
+    frames = _frames()
+    table = run_panel(SCRIPTS, frames)
+    assert len(table) == len(SCRIPTS) * len(frames)
+    for row in table.itertuples():
+        df = frames[row.symbol]
+        signals = generate_signals(parse_dsl(SCRIPTS[row.strategy]), df)
+        res = run_backtest_arrays(df["close"].to_numpy(), signals["entry"].to_numpy(),
+                                  signals["exit"].to_numpy())
+        # NaN closes give NaN pnl in both engines
+        assert np.array_equal([row.total_return, row.max_drawdown], [res["total_return"], res["max_drawdown"]],
+                              equal_nan=True)
+        assert row.number_of_trades == res["number_of_trades"]
+
+
+def test_position_state_columnwise():
+    rng = np.random.default_rng(3)
+    entry, exit_ = rng.random((300, 8)) < 0.1, rng.random((300, 8)) < 0.1
+    pos = position_state(entry, exit_)
+    for j in range(8):
+        assert (pos[:, j] == position_state(entry[:, j], exit_[:, j])).all()
+
+
+def test_timeframe_nodes_and_alignment():
+    frames = {s: df.fillna(100.0) for s, df in _frames(3).items()}
+    script = "ENTRY: close > sma(close,3)@1d EXIT: close < ema(close,5)@4h"
+    signals = panel_signals(script, Panel.from_frames(frames))
+    for symbol, df in frames.items():
+        df = df.copy()
+        df.attrs["symbol"] = symbol
+        assert signals.frame(symbol).equals(generate_signals(parse_dsl(script), df))
+
+    frames["S0"] = frames["S0"].iloc[1:]
+    with pytest.raises(ValueError, match="shared index"):
+        Panel.from_frames(frames)
@@ -0,0 +1,78 @@
+# tests/test_profiling.py
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals
+from profiling import explain_analyze, annotate, profile_signals
+
+CROSS_BOTH = """
+ENTRY: sma(close,20) crosses_above sma(close,50) AND volume > 1000000
+EXIT: sma(close,20) crosses_below sma(close,50) OR volume > 1000000
+"""
+
+
+@pytest.fixture
+def random_df():
+    rng = np.random.default_rng(5)
+    n = 400
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({"close": close, "volume": rng.integers(500_000, 1_500_000, n)},
+                        index=pd.date_range("2024-01-01", periods=n, freq="h"))
+
+
+def test_profiled_signals_are_unchanged(random_df):
+    ast = parse_dsl(CROSS_BOTH)
+    signals, profile = profile_signals(ast, random_df)
+    pd.testing.assert_frame_equal(signals, generate_signals(ast, random_df))
+    assert profile.stats() == {"hits": 3, "misses": 7, "entries": 7}
+
+
+def test_node_stats(random_df):
+    ast = parse_dsl(CROSS_BOTH)
+    _, profile = profile_signals(ast, random_df)
+    sma20 = profile.stats_for(ast.entry.left.left)
+    assert (sma20.calls, sma20.hits) == (2, 1)
+    assert sma20.out_bytes == 400 * 8
+    root = profile.stats_for(ast.entry)
+    assert root.calls == 1 and root.out_bytes == 400
+    for stats in profile.nodes.values():
+        assert 0 <= stats.self_s <= stats.total_s
+    # self times of the ENTRY subtree add up to its total
+    entry_keys = [ast.entry.key(), ast.entry.left.key(), ast.entry.right.key(),
+                  ast.entry.left.left.key(), ast.entry.left.right.key()]
+    assert sum(profile.nodes[k].self_s for k in entry_keys) == pytest.approx(root.total_s)
+
+
+def test_explain_and_annotate(random_df):
+    ast = parse_dsl(CROSS_BOTH)
+    _, profile = profile_signals(ast, random_df)
+    text = explain_analyze(ast, profile)
+    assert text.splitlines()[0] == "ENTRY:"
+    assert "Function sma(close,20)  (total=" in text
+    assert "Field volume" in text
+
+    annotated = annotate(ast, profile)
+    plain = ast.to_dict()
+    assert "profile" in annotated["entry"] and "profile" in annotated["entry"]["left"]["left"]
+    assert "profile" not in annotated["entry"]["right"]["left"]       # fields are not timed
+
+    def strip(d):
+        if isinstance(d, dict):
+            return {k: strip(v) for k, v in d.items() if k != "profile"}
+        if isinstance(d, list):
+            return [strip(v) for v in d]
+        return d
+    assert strip(annotated) == plain
+
+
+def test_trace_export(random_df, tmp_path):
+    _, profile = profile_signals(parse_dsl(CROSS_BOTH), random_df)
+    path = tmp_path / "eval.trace.json"
+    profile.export_trace(path)
+    events = json.loads(path.read_text())["traceEvents"]
+    assert len(events) == 7
+    assert {e["ph"] for e in events} == {"X"}
+    assert "sma(close,20)" in {e["name"] for e in events}
+
@@ -0,0 +1,67 @@
+# tests/test_serialization.py
+import pytest
+import src.parser as src_parser
+from parser import parse_dsl, parse_cache_info, clear_parse_cache
+from ast_nodes import ScriptAST, node_from_dict
+from strategy_store import StrategyStore
+
+SCRIPTS = [
+    "ENTRY: close > sma(close,20) AND volume > 1000000 EXIT: rsi(close,14) < 30",
+    "ENTRY: ema(close,12) CROSSES_ABOVE ema(close,26) OR close >= 10.5 EXIT: close crosses_below sma(close,5)",
+    "ENTRY: 0",
+]
+
+
+@pytest.mark.parametrize("dsl", SCRIPTS)
+def test_dict_and_bytes_round_trip(dsl):
+    ast = parse_dsl(dsl)
+    assert ScriptAST.from_dict(ast.to_dict()).to_dict() == ast.to_dict()
+    again = ScriptAST.from_bytes(ast.to_bytes())
+    assert again.key() == ast.key()
+    assert again.to_dict() == ast.to_dict()
+
+
+def test_from_dict_rejects_unknown_type():
+    with pytest.raises(ValueError):
+        node_from_dict({"type": "lag", "name": "close"})
+
+
+def test_parse_cache_normalizes_whitespace():
+    clear_parse_cache()
+    a = parse_dsl("ENTRY:\n    close > sma(close,20)\nEXIT:\n    close < 5")
+    b = parse_dsl("ENTRY: close >  sma(close,20)   EXIT: close < 5")
+    assert a is b
+    info = parse_cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert parse_dsl(SCRIPTS[0], use_cache=False) is not parse_dsl(SCRIPTS[0], use_cache=False)
+
+
+def test_store_round_trip_without_parsing(tmp_path, monkeypatch):
+    path = tmp_path / "strategies.bin"
+    assert StrategyStore.write(path, SCRIPTS + [SCRIPTS[0] + "  "]) == len(SCRIPTS)
+    expected = {s: parse_dsl(s).to_dict() for s in SCRIPTS}
+
+    def no_lark(*a, **k):
+        raise AssertionError("store must not parse")
+    monkeypatch.setattr(src_parser, "parse_dsl", no_lark)
+    monkeypatch.setattr(src_parser, "_parse_normalized", no_lark)
+
+    store = StrategyStore(path)
+    assert len(store) == len(SCRIPTS)
+    for s in SCRIPTS:
+        assert s in store
+        assert store.get("\n" + s + "\n").to_dict() == expected[s]
+    with pytest.raises(KeyError):
+        store.get("ENTRY: close > 1")
+
+
+def test_unreadable_stores_ask_for_a_rebuild(tmp_path):
+    path = tmp_path / "strategies.json"
+    StrategyStore.write(path, SCRIPTS)
+    for content in (path.read_bytes()[:20], b"\x00\xff\x93 not json", b"[1, 2]", b"{}",
+                    b'{"version": 1, "keys": {}}'):
+        path.write_bytes(content)
+        with pytest.raises(ValueError, match="rebuild"):
+            StrategyStore(path)
+    with pytest.raises(ValueError):
+        ScriptAST.from_bytes(b"\x00garbage")
@@ -0,0 +1,198 @@
+# tests/test_service.py
+import asyncio
+import json
+import os
+import time
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from parser import parse_dsl
+from codegen import generate_signals
+from backtest import run_backtest
+from batch import DirectorySource
+from service import StrategyService, LocalClient, TCPClient, ServiceBusy, serve
+
+DSL = "ENTRY: close crosses_above sma(close,10) EXIT: rsi(close,14) > 70"
+NL = "Buy when close is above the 20-day moving average. Exit when RSI(14) is below 30."
+
+
+def _frames(n_symbols=3, n=300):
+    frames = {}
+    for k in range(n_symbols):
+        rng = np.random.default_rng(k)
+        close = 50 + np.cumsum(rng.normal(0, 1, n))
+        frames[f"SYM{k}"] = pd.DataFrame({
+            "open": close, "high": close + 1, "low": close - 1, "close": close,
+            "volume": rng.integers(1, 10, n) * 100_000,
+        }, index=pd.date_range("2024-01-01", periods=n, freq="D"))
+    return frames
+
+
+class _Source:
+    """In-memory source whose loads are slow, or kill the worker for symbol CRASH."""
+
+    def __init__(self, frames, delay=0.0):
+        self.frames, self.delay = frames, delay
+
+    def symbols(self):
+        return list(self.frames)
+
+    def load(self, symbol):
+        if symbol == "CRASH":
+            os._exit(1)
+        time.sleep(self.delay)
+        return self.frames[symbol]
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_local_client_matches_direct_backtest():
+    frames = _frames()
+
+    async def go():
+        async with StrategyService(frames, max_workers=0) as service:
+            client = LocalClient(service)
+            reply = await client.evaluate(DSL, "SYM1", trades=True)
+            bad = await client.evaluate("ENTRY: close >", "SYM1")
+            missing = await client.evaluate(DSL, "NOPE")
+            return reply, bad, missing, await client.stats()
+
+    reply, bad, missing, stats = _run(go())
+    df = frames["SYM1"]
+    expected = run_backtest(df, generate_signals(parse_dsl(DSL), df))
+    assert reply["ok"] and reply["result"]["total_return"] == expected["total_return"]
+    assert reply["result"]["number_of_trades"] == expected["number_of_trades"]
+    assert len(reply["result"]["trades"]) == len(expected["trades"])
+    assert not bad["ok"] and not missing["ok"] and "KeyError" in missing["error"]
+    s = stats["result"]
+    assert s["requests"] == 3 and s["completed"] == 1 and s["failed"] == 2
+    assert s["p50_ms"] > 0 and s["p99_ms"] >= s["p50_ms"] and s["queue_depth"] == 0
+
+
+def test_identical_requests_are_coalesced():
+    async def go():
+        async with StrategyService(_frames(), max_workers=0) as service:
+            # NL and the DSL it converts to are the same request
+            texts = [NL] * 5 + [" ".join(NL.split()) for _ in range(5)]
+            results = await asyncio.gather(*(service.evaluate(t, "SYM0") for t in texts))
+            return results, service.stats()
+
+    results, stats = _run(go())
+    assert all(r == results[0] for r in results)
+    assert stats["coalesced"] == 9 and stats["completed"] == 10 and stats["inflight"] == 0
+
+
+def test_backpressure_rejects_when_the_queue_is_full():
+    async def go():
+        async with StrategyService(_frames(), max_workers=0, max_pending=1, max_queue=2) as service:
+            jobs = [service.evaluate(DSL, f"SYM{k % 3}", keep_trades=k > 2) for k in range(6)]
+            return await asyncio.gather(*jobs, return_exceptions=True), service.stats()
+
+    results, stats = _run(go())
+    busy = [r for r in results if isinstance(r, ServiceBusy)]
+    assert len(busy) == 3 and stats["rejected"] == 3 and stats["completed"] == 3
+
+
+def test_tcp_round_trip_on_a_process_pool():
+    async def go():
+        async with StrategyService(_frames(), max_workers=2) as service:
+            server = await serve(service, port=0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                client = await TCPClient.connect(port=port)
+                replies = await asyncio.gather(*(client.evaluate(DSL, f"SYM{k}") for k in range(3)))
+                stats = await client.stats()
+                await client.close()
+            return replies, stats
+
+    replies, stats = _run(go())
+    assert [r["result"]["symbol"] for r in replies] == ["SYM0", "SYM1", "SYM2"]
+    assert stats["ok"] and stats["result"]["completed"] == 3
+
+
+def test_cancelled_caller_leaves_the_job_to_the_others():
+    async def go():
+        async with StrategyService(_Source(_frames(), delay=0.3), max_workers=0, max_pending=1) as service:
+            owner = asyncio.ensure_future(service.evaluate(DSL, "SYM0"))
+            await asyncio.sleep(0.05)
+            waiter = asyncio.ensure_future(service.evaluate(DSL, "SYM0"))
+            await asyncio.sleep(0.05)
+            owner.cancel()
+            await asyncio.sleep(0.05)
+            during = service.stats()           # the pool still runs the job: its slot is taken
+            return owner, await waiter, during, service.stats()
+
+    owner, result, during, after = _run(go())
+    assert owner.cancelled() and result["symbol"] == "SYM0"
+    assert during["running"] == 1 and during["inflight"] == 1
+    assert after["running"] == 0 and after["inflight"] == 0 and after["coalesced"] == 1
+
+
+def test_rewritten_histories_are_reloaded(tmp_path):
+    frames = _frames(1)
+    frames["SYM0"].to_csv(tmp_path / "SYM0.csv")
+
+    async def go():
+        async with StrategyService(DirectorySource(tmp_path), max_workers=0) as service:
+            first = await service.evaluate(DSL, "SYM0")
+            shorter = frames["SYM0"].iloc[:200]
+            shorter.to_csv(tmp_path / "SYM0.csv")
+            stamp = os.stat(tmp_path / "SYM0.csv").st_mtime_ns + 1_000_000
+            os.utime(tmp_path / "SYM0.csv", ns=(stamp, stamp))
+            return first, await service.evaluate(DSL, "SYM0")
+
+    first, second = _run(go())
+    assert first["bars"] == 300 and second["bars"] == 200
+
+
+def test_a_dead_worker_is_replaced():
+    async def go():
+        async with StrategyService(_Source(_frames()), max_workers=1) as service:
+            crashed = await LocalClient(service).evaluate(DSL, "CRASH")
+            return crashed, await service.evaluate(DSL, "SYM1"), service.stats()
+
+    crashed, result, stats = _run(go())
+    assert not crashed["ok"] and "BrokenProcessPool" in crashed["error"]
+    assert result["symbol"] == "SYM1" and stats["restarts"] == 2
+
+
+def test_non_object_frames_get_error_replies():
+    async def go():
+        async with StrategyService(_frames(), max_workers=0) as service:
+            server = await serve(service, port=0)
+            async with server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+                writer.write(b'[]\n"x"\n1\n')
+                replies = [json.loads(await asyncio.wait_for(reader.readline(), 5)) for _ in range(3)]
+                writer.close()
+            return replies
+
+    replies = _run(go())
+    assert all(not r["ok"] and r["id"] is None and "TypeError" in r["error"] for r in replies)
+
+
+def _exists(segment):
+    try:
+        shared_memory.SharedMemory(segment).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def test_process_workers_share_an_in_memory_universe():
+    frames = _frames()
+
+    async def go():
+        async with StrategyService(frames, max_workers=2) as service:
+            segments = [f.segment for f in service._worker_source.frames.values()]
+            assert all(_exists(s) for s in segments)
+            return await service.evaluate(DSL, "SYM2"), segments
+
+    result, segments = _run(go())
+    df = frames["SYM2"]
+    assert result["total_return"] == run_backtest(df, generate_signals(parse_dsl(DSL), df))["total_return"]
+    assert not any(_exists(s) for s in segments)
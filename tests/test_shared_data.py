@@ -0,0 +1,129 @@
+# tests/test_shared_data.py
+import pickle
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals
+from backtest import run_backtest_vectorized
+from batch import run_universe
+from shared_data import SharedFrames, SharedSource, attach
+
+SCRIPTS = [
+    "ENTRY: close > sma(close,20) EXIT: close < sma(close,20)",
+    "ENTRY: close crosses_above sma(close,10) EXIT: rsi(close,14) > 70",
+]
+
+
+def _frames(n_symbols=3, n=250):
+    frames = {}
+    for k in range(n_symbols):
+        rng = np.random.default_rng(k)
+        close = 50 + np.cumsum(rng.normal(0, 1, n))
+        frames[f"SYM{k}"] = pd.DataFrame({
+            "open": close, "high": close + 1, "low": close - 1, "close": close,
+            "volume": rng.integers(1, 10, n) * 100_000,
+        }, index=pd.date_range("2024-01-01", periods=n, freq="D", name="date"))
+    return frames
+
+
+def _exists(segment):
+    try:
+        shared_memory.SharedMemory(segment).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _close_sum(source, symbol):
+    return float(source.load(symbol)["close"].sum())
+
+
+def _tracked_attach(source, symbol):
+    # what attaching asks of the resource tracker (shared with the parent under spawn)
+    calls = []
+    register, unregister = resource_tracker.register, resource_tracker.unregister
+    resource_tracker.register = lambda name, rtype: calls.append(("register", name))
+    resource_tracker.unregister = lambda name, rtype: calls.append(("unregister", name))
+    try:
+        total = _close_sum(source, symbol)
+    finally:
+        resource_tracker.register, resource_tracker.unregister = register, unregister
+    return total, calls
+
+
+def test_attach_is_a_read_only_view():
+    df = _frames(1)["SYM0"]
+    with SharedFrames() as plane:
+        frame = plane.publish("SYM0", df)
+        assert len(pickle.dumps(frame)) < 1000
+        a, b = attach(frame), attach(frame)
+        pd.testing.assert_frame_equal(a, df, check_freq=False)
+        assert a.attrs["symbol"] == "SYM0"
+        assert np.shares_memory(a["close"].to_numpy(), b["close"].to_numpy())
+        with pytest.raises(ValueError):
+            a["close"].to_numpy()[0] = 0.0
+
+        signals = generate_signals(parse_dsl(SCRIPTS[1]), a)
+        pd.testing.assert_frame_equal(signals, generate_signals(parse_dsl(SCRIPTS[1]), df), check_freq=False)
+        assert run_backtest_vectorized(a, signals)["trades"] == run_backtest_vectorized(df, signals)["trades"]
+
+        aware = df.tz_localize("America/New_York").reset_index()
+        aware = aware.drop(columns="date").set_index(aware["date"])
+        pd.testing.assert_frame_equal(attach(plane.publish("TZ", aware)), aware, check_freq=False)
+        plain = df.reset_index(drop=True)
+        pd.testing.assert_frame_equal(attach(plane.publish("PLAIN", plain)), plain)
+        with pytest.raises(TypeError):
+            plane.publish("TEXT", df.assign(name="x"))
+        segments = [f.segment for f in plane.frames.values()]
+    del a, b, signals
+    assert not any(_exists(s) for s in segments)
+
+
+def test_universe_over_shared_memory_matches_copies():
+    frames = _frames()
+    copied = {(r["symbol"], r["strategy"]): r for r in run_universe(SCRIPTS, frames, max_workers=2, shared_memory=False)}
+    shared = {(r["symbol"], r["strategy"]): r for r in
+              run_universe(SCRIPTS, frames, max_workers=2, shared_memory=True, keep_trades=True)}
+    assert set(shared) == set(copied)
+    for key, row in shared.items():
+        assert {k: row[k] for k in copied[key]} == copied[key]
+
+
+def test_segments_outlive_workers_until_the_publisher_closes():
+    frames = _frames(2)
+    plane = SharedFrames()
+    source = plane.publish_source(frames)
+    assert isinstance(source, SharedSource) and plane.nbytes >= sum(df.memory_usage().sum() for df in frames.values())
+
+    # workers that attach and exit (or die) must not unlink the publisher's segments
+    with ProcessPoolExecutor(2) as pool:
+        sums = list(pool.map(_close_sum, [source] * 4, ["SYM0", "SYM1"] * 2))
+    assert sums[:2] == [float(frames[s]["close"].sum()) for s in ("SYM0", "SYM1")]
+    with ProcessPoolExecutor(1) as pool:
+        pool.submit(_close_sum, source, "SYM0").result()
+        pool.submit(__import__("os")._exit, 1)
+    segments = [f.segment for f in source.frames.values()]
+    assert all(_exists(s) for s in segments)
+
+    del plane
+    assert not any(_exists(s) for s in segments)
+
+
+def test_spawned_workers_leave_the_registration_to_the_publisher():
+    frames = _frames(2)
+    plane = SharedFrames()
+    source = plane.publish_source(frames)
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = list(pool.map(_tracked_attach, [source] * 2, ["SYM0", "SYM1"]))
+    assert [total for total, _ in results] == [float(frames[s]["close"].sum()) for s in ("SYM0", "SYM1")]
+    assert all(calls == [] for _, calls in results)
+
+    segments = [f.segment for f in source.frames.values()]
+    assert all(_exists(s) for s in segments)
+    plane.close()
+    assert not any(_exists(s) for s in segments)
@@ -0,0 +1,49 @@
+# tests/test_streaming.py
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals, sma, ema, rsi
+from streaming import StreamingEvaluator, RollingMean, EWMean, RSIState
+
+SCRIPTS = [
+    "ENTRY: close > sma(close,20) AND volume > 1000000 EXIT: rsi(close,14) < 30",
+    "ENTRY: ema(close,12) crosses_above ema(close,26) EXIT: ema(close,12) crosses_below ema(close,26)",
+    "ENTRY: close crosses_above sma(close,3) OR rsi(close,2) > 90 EXIT: close crosses_below ema(close,3)",
+    "ENTRY: sma(close,1) >= close EXIT: 0",
+]
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(11)
+    n = 600
+    close = np.round(100 + np.cumsum(rng.normal(0, 1, n)), 2)
+    close[200:260] = close[200]           # flat stretch
+    return pd.DataFrame({
+        "open": close, "high": close + 1, "low": close - 1, "close": close,
+        "volume": rng.integers(5, 15, n) * 100_000,
+    }, index=pd.date_range("2024-01-01", periods=n, freq="min"))
+
+
+@pytest.mark.parametrize("dsl", SCRIPTS)
+def test_streaming_matches_batch(dsl, bars):
+    ast = parse_dsl(dsl)
+    pd.testing.assert_frame_equal(StreamingEvaluator(ast).run(bars), generate_signals(ast, bars))
+
+
+@pytest.mark.parametrize("period", [1, 2, 3, 14, 50])
+def test_running_state_is_bit_exact(bars, period):
+    x = bars["close"]
+    roll, ewm, rs = RollingMean(period, period), EWMean(period), RSIState(period)
+    got = np.array([[roll.push(v), ewm.push(v), rs.push(v)] for v in x])
+    np.testing.assert_array_equal(got[:, 0], sma(x, period).to_numpy())
+    np.testing.assert_array_equal(got[:, 1], ema(x, period).to_numpy())
+    np.testing.assert_array_equal(got[:, 2], rsi(x, period).to_numpy())
+
+
+def test_push_returns_plain_flags(bars):
+    ev = StreamingEvaluator(parse_dsl(SCRIPTS[0]))
+    out = [ev.push(bar) for bar in bars.head(25).to_dict("records")]
+    assert all(isinstance(e, bool) and isinstance(x, bool) for e, x in out)
+    assert ev.bars == 25
@@ -0,0 +1,94 @@
+# tests/test_sweep.py
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals, sma, rsi
+from backtest import run_backtest, run_backtest_arrays
+from sweep import RollingBank, expand_grid, run_sweep
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(3)
+    n = 400
+    close = np.round(100 + np.cumsum(rng.normal(0, 1, n)), 2)
+    close[100:140] = close[100]          # a flat stretch
+    return pd.DataFrame({"close": close, "volume": rng.integers(1, 5, n) * 1e6})
+
+
+def test_expand_grid_order():
+    assert expand_grid({"a": [1, 2], "b": [10, 20]}) == [
+        {"a": 1, "b": 10}, {"a": 1, "b": 20}, {"a": 2, "b": 10}, {"a": 2, "b": 20}]
+
+
+@pytest.mark.parametrize("n", [1, 2, 5, 20, 41, 399, 500])
+def test_bank_matches_rolling(prices, n):
+    bank = RollingBank(prices)
+    np.testing.assert_array_equal(bank.sma("close", n), sma(prices["close"], n).to_numpy())
+    np.testing.assert_array_equal(bank.rsi("close", n), rsi(prices["close"], n).to_numpy())
+
+
+def test_bank_flat_windows_are_exact(prices):
+    bank = RollingBank(prices)
+    out = bank.sma("close", 20)
+    assert (out[119:140] == prices["close"].iloc[100]).all()
+
+
+def test_bank_skips_missing_bars():
+    x = pd.Series([1.0, np.nan, 2.0, 2.0, np.nan, 2.0, 3.0, 4.0])
+    bank = RollingBank({"close": x.to_numpy()})
+    for n in (1, 2, 3):
+        np.testing.assert_array_equal(bank.sma("close", n), sma(x, n).to_numpy())
+        np.testing.assert_array_equal(bank.rsi("close", n), rsi(x, n).to_numpy())
+
+
+def test_sweep_matches_individual_runs(prices):
+    template = "ENTRY: close > sma(close,{fast}) AND rsi(close,{n}) < {hi} EXIT: close < sma(close,{fast})"
+    grid = {"fast": [5, 10, 30], "n": [7, 14], "hi": [60, 80]}
+    table = run_sweep(template, grid, prices)
+    assert len(table) == 12
+    assert table["total_return"].is_monotonic_decreasing
+
+    for row in table.itertuples():
+        dsl = template.format(fast=row.fast, n=row.n, hi=row.hi)
+        df = prices.set_index(pd.RangeIndex(len(prices)))
+        expected = run_backtest(df, generate_signals(parse_dsl(dsl), df))
+        assert row.number_of_trades == expected["number_of_trades"]
+        assert row.total_return == pytest.approx(expected["total_return"])
+        assert row.max_drawdown == pytest.approx(expected["max_drawdown"])
+
+
+def test_sweep_matches_the_engine_on_long_histories():
+    # a million tick-rounded bars: close often ties its sma, where a global
+    # prefix sum's drift flips thousands of signals
+    rng = np.random.default_rng(11)
+    close = np.round(1000 + np.cumsum(rng.normal(0, 0.1, 1_000_000)), 2)
+    df = pd.DataFrame({"close": close})
+    template = "ENTRY: close > sma(close,{n}) EXIT: close < sma(close,{n})"
+    table = run_sweep(template, {"n": [5, 20]}, df)
+    for row in table.itertuples():
+        signals = generate_signals(parse_dsl(template.format(n=row.n)), df)
+        expected = run_backtest_arrays(close, signals["entry"].to_numpy(), signals["exit"].to_numpy())
+        assert row.number_of_trades == expected["number_of_trades"]
+        assert row.total_return == expected["total_return"] and row.max_drawdown == expected["max_drawdown"]
+
+
+def test_sweep_top(prices):
+    table = run_sweep("ENTRY: close > sma(close,{n}) EXIT: close < sma(close,{n})",
+                      {"n": range(5, 50)}, prices, top=3)
+    assert len(table) == 3
+
+
+def test_sweep_binds_placeholders_under_timeframes():
+    rng = np.random.default_rng(5)
+    close = 100 + np.cumsum(rng.normal(0, 1, 24 * 60))
+    df = pd.DataFrame({"close": close, "volume": np.full(len(close), 1e6)},
+                      index=pd.date_range("2024-01-01", periods=len(close), freq="h"))
+    template = "ENTRY: close > sma(close,{n})@1d EXIT: close < sma(close,{n})@1d"
+    table = run_sweep(template, {"n": [2, 5]}, df)
+    for row in table.itertuples():
+        expected = run_backtest(df, generate_signals(parse_dsl(template.format(n=row.n)), df))
+        assert expected["number_of_trades"] > 0
+        assert row.number_of_trades == expected["number_of_trades"]
+        assert row.total_return == pytest.approx(expected["total_return"])
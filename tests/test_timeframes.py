@@ -0,0 +1,117 @@
+# tests/test_timeframes.py
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl, normalize_timeframe
+from ast_nodes import ScriptAST
+from codegen import generate_signals, sma
+from compiler import compile_script
+from streaming import StreamingEvaluator
+from profiling import profile_signals, explain_analyze
+# the evaluators use src.timeframes; its cache is the one to inspect
+from src.timeframes import resampled, resample_cache_info, clear_resample_cache
+
+DSL = "ENTRY: close crosses_above sma(close,10) AND close > sma(close,3)@1d EXIT: rsi(close,14)@1h > 70"
+
+
+@pytest.fixture
+def intraday():
+    rng = np.random.default_rng(5)
+    n = 5 * 288                                 # five days of 5-minute bars
+    close = 100 + np.cumsum(rng.normal(0, 0.2, n))
+    index = pd.date_range("2024-03-04", periods=n, freq="5min")
+    return pd.DataFrame({"open": close, "high": close + 0.1, "low": close - 0.1, "close": close,
+                         "volume": rng.integers(1, 10, n) * 1000}, index=index)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_resample_cache()
+    yield
+    clear_resample_cache()
+
+
+def test_parse_and_round_trip():
+    ast = parse_dsl("ENTRY: sma(close,20)@1D > close@60MIN EXIT: 0")
+    assert ast.entry.left.key() == ("timeframe", "1d", ("function", "sma", (("field", "close"), ("number", 20.0))))
+    assert ast.entry.right.to_dict() == {"type": "timeframe", "timeframe": "60m", "expr": {"type": "field", "name": "close"}}
+    assert ScriptAST.from_dict(ast.to_dict()).key() == ast.key()
+    assert ScriptAST.from_bytes(ast.to_bytes()).key() == ast.key()
+    assert normalize_timeframe("4H") == "4h"
+    with pytest.raises(ValueError):
+        normalize_timeframe("0d")
+
+
+def test_daily_values_are_not_seen_before_the_day_closes(intraday):
+    daily_close = intraday["close"].resample("D").last()
+    tf = resampled(intraday, "1d")
+    values = pd.Series(tf.align(tf.bars["close"].to_numpy()), index=intraday.index)
+    # the whole first day has no daily bar yet; each later bar sees yesterday's close
+    assert values.iloc[:288].isna().all()
+    expected = daily_close.shift(1).reindex(intraday.index.normalize()).to_numpy()
+    np.testing.assert_array_equal(values.to_numpy()[288:], expected[288:])
+
+
+def test_interpreter_and_compiled_agree(intraday):
+    ast = parse_dsl(DSL)
+    expected = generate_signals(ast, intraday)
+    pd.testing.assert_frame_equal(compile_script(ast)(intraday), expected)
+
+    daily = sma(intraday["close"].resample("D").last(), 3).shift(1)
+    filter_ = intraday["close"].to_numpy() > daily.reindex(intraday.index.normalize()).to_numpy()
+    assert not (expected["entry"].to_numpy() & ~filter_).any()
+
+
+def test_resampled_bars_are_shared(intraday):
+    scripts = [DSL, "ENTRY: close > sma(close,5)@1d EXIT: close < sma(close,2)@1d"]
+    for dsl in scripts:
+        generate_signals(parse_dsl(dsl), intraday)
+        compile_script(parse_dsl(dsl))(intraday)
+    info = resample_cache_info()
+    assert info["misses"] == 2 and info["entries"] == 2          # 1d and 1h, once each
+
+    # another frame of the same symbol shares the entry; a different history does not
+    a, b = intraday.copy(), intraday.copy()
+    a.attrs["symbol"] = b.attrs["symbol"] = "AAA"
+    assert resampled(a, "1d") is resampled(b, "1d")
+    shorter = intraday.iloc[:-1].copy()
+    shorter.attrs["symbol"] = "AAA"
+    assert len(resampled(shorter, "1d").positions) == len(shorter)
+
+
+def test_resample_cache_tracks_contents_and_lifetime(intraday):
+    # corrected values under the same symbol and shape give fresh bars
+    a = intraday.copy()
+    a.attrs["symbol"] = "AAA"
+    first = resampled(a, "1d")
+    b = a.copy()
+    b.iloc[3, b.columns.get_loc("high")] += 50.0
+    fresh = resampled(b, "1d")
+    assert fresh is not first and fresh.bars["high"].iloc[0] == b["high"].iloc[3]
+
+    # a data version replaces the checksum
+    b.attrs["data_version"] = "v1"
+    assert resampled(b, "1d") is resampled(b.copy(), "1d")
+
+    # frames keyed by identity are held weakly
+    clear_resample_cache()
+    anonymous = intraday.copy()
+    resampled(anonymous, "1d")
+    assert resample_cache_info()["entries"] == 1
+    del anonymous
+    assert resample_cache_info()["entries"] == 0
+
+
+def test_unsupported_inputs(intraday):
+    ast = parse_dsl("ENTRY: close > close@1d EXIT: 0")
+    with pytest.raises(ValueError):
+        generate_signals(ast, intraday.reset_index(drop=True))
+    with pytest.raises(ValueError):
+        StreamingEvaluator(ast)
+
+
+def test_explain_shows_scoped_nodes(intraday):
+    _, profile = profile_signals(parse_dsl(DSL), intraday)
+    text = explain_analyze(parse_dsl(DSL), profile)
+    assert "Timeframe 1d  (total=" in text
+    assert "Function sma(close,3)  (total=" in text
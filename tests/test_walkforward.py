@@ -0,0 +1,67 @@
+# tests/test_walkforward.py
+import numpy as np
+import pandas as pd
+import pytest
+from parser import parse_dsl
+from codegen import generate_signals, EvalMemo
+from backtest import run_backtest
+from walkforward import fold_windows, walk_forward
+
+SCRIPTS = [
+    "ENTRY: close crosses_above sma(close,20) EXIT: close crosses_below sma(close,20)",
+    "ENTRY: rsi(close,14) < 30 EXIT: rsi(close,14) > 60",
+    "ENTRY: close > sma(close,50) AND rsi(close,14) < 50 EXIT: close < sma(close,20)",
+]
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(11)
+    n = 3_000
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close,
+                         "volume": rng.integers(1, 10, n) * 100_000},
+                        index=pd.date_range("2010-01-01", periods=n, freq="D"))
+
+
+def test_fold_windows():
+    assert fold_windows(10, 4, 2) == [(0, 4, 6), (2, 6, 8), (4, 8, 10)]
+    assert fold_windows(10, 4, 2, step=3, anchored=True) == [(0, 4, 6), (0, 7, 9)]
+    assert fold_windows(5, 4, 2) == []
+    with pytest.raises(ValueError):
+        fold_windows(10, 4, 2, step=1)
+
+
+def test_folds_match_backtests_on_slices(df):
+    report = walk_forward(SCRIPTS[0], df, train=500, test=250)
+    signals = generate_signals(parse_dsl(SCRIPTS[0]), df)
+    assert len(report["folds"]) == 10
+
+    total = 0.0
+    for fold, (lo, mid, hi) in zip(report["folds"], fold_windows(len(df), 500, 250)):
+        expected = run_backtest(df.iloc[mid:hi], signals.iloc[mid:hi])
+        assert fold["test_metrics"] == {k: expected[k] for k in fold["test_metrics"]}
+        assert fold["test"] == (df.index[mid], df.index[hi - 1])
+        in_sample = run_backtest(df.iloc[lo:mid], signals.iloc[lo:mid])
+        assert fold["train_metrics"]["total_return"] == in_sample["total_return"]
+        total += expected["total_return"]
+        # the chained curve ends each fold at the running out-of-sample total
+        assert report["equity_curve"][df.index[hi - 1]] == pytest.approx(total)
+
+    curve = report["equity_curve"]
+    assert curve.index.equals(df.index[500:3000]) and report["total_return"] == pytest.approx(total)
+    assert report["max_drawdown"] == pytest.approx((curve - curve.cummax()).min())
+
+
+def test_candidates_are_selected_in_sample_and_indicators_computed_once(df):
+    memo = EvalMemo()
+    report = walk_forward(SCRIPTS, df, train=400, test=200, step=300, memo=memo)
+    for fold, (lo, mid, hi) in zip(report["folds"], fold_windows(len(df), 400, 200, 300)):
+        returns = [run_backtest(df.iloc[lo:mid], generate_signals(parse_dsl(s), df).iloc[lo:mid])["total_return"]
+                   for s in SCRIPTS]
+        assert fold["strategy"] == int(np.argmax(returns))
+    assert len({f["strategy"] for f in report["folds"]}) > 1
+    # sma(close,20), rsi(close,14) and sma(close,50) once each; the third script reuses the first two
+    assert memo.stats()["misses"] == 3 and memo.stats()["hits"] == 2
+    # gaps between test windows are not part of the out-of-sample curve
+    assert len(report["equity_curve"]) == 200 * len(report["folds"])